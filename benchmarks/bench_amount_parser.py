@@ -0,0 +1,92 @@
+"""validators.parse_amounts versus get_valid_amount called row by row.
+
+The rows look like a partner file: thousands separators, currency
+symbols, stray whitespace and about 1% garbage. get_valid_amount only
+understands plain numbers, so the per-row path strips symbols and
+separators in Python first. Logging is raised to CRITICAL so neither path
+pays for log output. Run from the project root:
+
+    python benchmarks/bench_amount_parser.py --rows 1000000 --chunksize 100000
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+# Add the project root to the system path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import numpy as np  # noqa: E402
+
+from validators import get_valid_amount, parse_amount_chunks, parse_amounts  # noqa: E402
+
+
+def make_rows(rows: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    out = []
+    for _ in range(rows):
+        if rng.random() < 0.01:
+            out.append(rng.choice(["n/a", "", "1,2,3", "-5.00", "12.3.4"]))
+        else:
+            amount = f"{rng.uniform(0.01, 5_000_000):,.2f}"
+            out.append(rng.choice(["", "$", "€ ", " "]) + amount + rng.choice(["", " "]))
+    return out
+
+
+def parse_row_by_row(rows: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    amounts = np.full(len(rows), np.nan)
+    for i, text in enumerate(rows):
+        value = get_valid_amount(text.replace("$", "").replace("€", "")
+                                 .replace(",", "").strip())
+        if value is not None:
+            amounts[i] = value
+    return amounts, ~np.isnan(amounts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.CRITICAL)
+    rows = make_rows(args.rows, args.seed)
+
+    started = time.perf_counter()
+    per_row, per_row_valid = parse_row_by_row(rows)
+    per_row_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    amounts, valid = parse_amounts(rows)
+    batch_s = time.perf_counter() - started
+
+    chunks = [rows[i:i + args.chunksize] for i in range(0, len(rows), args.chunksize)]
+    started = time.perf_counter()
+    for _ in parse_amount_chunks(chunks):
+        pass
+    chunked_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    parse_amounts(rows, minor_digits=2)
+    minor_s = time.perf_counter() - started
+
+    # "1,2,3" is accepted as 123 by the per-row path; the batch parser
+    # rejects misplaced separators, so compare only where both accept.
+    both = per_row_valid & valid
+    assert np.allclose(per_row[both], amounts[both])
+    print(f"{args.rows} rows, {int((~valid).sum())} invalid")
+    print(f"get_valid_amount per row: {per_row_s * 1000:9.1f} ms")
+    print(f"parse_amounts:            {batch_s * 1000:9.1f} ms  ({per_row_s / batch_s:.0f}x)")
+    print(f"parse_amount_chunks:      {chunked_s * 1000:9.1f} ms  "
+          f"(chunksize {args.chunksize})")
+    print(f"parse_amounts to cents:   {minor_s * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""df.fx.convert versus converting row by row with DataFrame.apply.
+
+Both paths use the same in-memory StaticRateProvider (installed with
+currency_utils.set_rate_provider), so the comparison measures per-row
+overhead rather than network latency. Logging is raised to WARNING so
+neither path pays for per-conversion log lines. Run from the project root:
+
+    python benchmarks/bench_fx_accessor.py --rows 200000 --pairs 50
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+# Add the project root to the system path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import pandas as pd  # noqa: E402
+
+import currency_utils  # noqa: E402
+import fx_accessor  # noqa: E402,F401  (registers df.fx)
+from rate_providers import StaticRateProvider  # noqa: E402
+
+
+def make_frame(rows: int, pairs: int, seed: int) -> tuple[pd.DataFrame, list[str]]:
+    rng = random.Random(seed)
+    from data.currency_registry import get_currency_registry
+    codes = list(get_currency_registry().codes)
+    chosen = [tuple(rng.sample(codes, 2)) for _ in range(pairs)]
+    picks = [rng.choice(chosen) for _ in range(rows)]
+    return pd.DataFrame({
+        "amount": [round(rng.uniform(1, 1000), 2) for _ in range(rows)],
+        "from": [pair[0] for pair in picks],
+        "to": [pair[1] for pair in picks],
+    }), codes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--pairs", type=int, default=50)
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    df, codes = make_frame(args.rows, args.pairs, args.seed)
+    rng = random.Random(args.seed)
+    currency_utils.set_rate_provider(
+        StaticRateProvider("USD", {code: rng.uniform(0.01, 200) for code in codes}))
+
+    started = time.perf_counter()
+    applied = df.apply(lambda row: currency_utils.convert_currency(
+        row["amount"], row["from"], row["to"]), axis=1)
+    apply_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    vectorized = df.fx.convert("amount", "from", "to")["converted"]
+    fx_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    df.fx.convert("amount", "from", "to", chunksize=args.chunksize)
+    chunked_s = time.perf_counter() - started
+
+    assert ((applied - vectorized).abs() < 1e-6 * vectorized.abs()).all()
+    print(f"{args.rows} rows, {args.pairs} pairs")
+    print(f"apply(convert_currency): {apply_s * 1000:9.1f} ms")
+    print(f"df.fx.convert:           {fx_s * 1000:9.1f} ms  ({apply_s / fx_s:.0f}x)")
+    print(f"df.fx.convert chunked:   {chunked_s * 1000:9.1f} ms  "
+          f"(chunksize {args.chunksize})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Measures GUI startup: time until the window is shown, until the currency
+list is populated and until the rate client is ready.
+
+Each run starts a fresh interpreter (python -m gui.gui) with
+GUI_MEASURE_STARTUP=1, which makes the GUI print its own timings and exit.
+Run from the project root:
+
+    python benchmarks/bench_gui_startup.py --runs 5
+
+Set QT_QPA_PLATFORM=offscreen to run without a display.
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+TIMING_LINE = re.compile(r"^(?P<stage>[a-z ]+): (?P<ms>[\d.]+) ms$")
+
+
+def run_once() -> dict[str, float]:
+    env = dict(os.environ, GUI_MEASURE_STARTUP="1")
+    result = subprocess.run(
+        [sys.executable, "-m", "gui.gui"],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, timeout=60,
+    )
+    timings = {}
+    for line in result.stdout.splitlines():
+        match = TIMING_LINE.match(line.strip())
+        if match:
+            timings[match["stage"]] = float(match["ms"])
+    if not timings:
+        raise RuntimeError(f"No timings reported by the GUI:\n{result.stderr}")
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark GUI startup time.")
+    parser.add_argument("--runs", type=int, default=5, help="Number of cold starts")
+    args = parser.parse_args()
+
+    samples: dict[str, list[float]] = {}
+    for _ in range(args.runs):
+        for stage, ms in run_once().items():
+            samples.setdefault(stage, []).append(ms)
+
+    for stage, values in samples.items():
+        print(f"{stage:<20} median {statistics.median(values):8.1f} ms  "
+              f"min {min(values):8.1f} ms  max {max(values):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
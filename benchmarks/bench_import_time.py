@@ -0,0 +1,76 @@
+"""Measures what importing the library modules costs in a fresh interpreter.
+
+For each statement it reports the median wall time over several runs and
+whether the import pulled in dotenv or the logging handlers, or created
+the logs/ directory. Those should all stay off until init_logging() /
+get_settings() are called explicitly. Run from the project root:
+
+    python benchmarks/bench_import_time.py --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+STATEMENTS = {
+    "import currency_utils": "import currency_utils",
+    "import validators": "import validators",
+    "import main": "import main",
+    "currency_utils + init_logging()": (
+        "import currency_utils\n"
+        "from modular_logger.root_logger import init_logging\n"
+        "init_logging()"
+    ),
+}
+
+# Runs inside the child: times the statement and reports side effects.
+PROBE = """
+import json, os, sys, time
+started = time.perf_counter()
+exec(compile({statement!r}, "<bench>", "exec"))
+elapsed_ms = (time.perf_counter() - started) * 1000
+print(json.dumps({{
+    "ms": elapsed_ms,
+    "dotenv": "dotenv" in sys.modules,
+    "logging.handlers": "logging.handlers" in sys.modules,
+    "logs_dir": os.path.isdir("logs"),
+}}))
+"""
+
+
+def run_once(statement: str) -> dict:
+    # A scratch working directory shows whether the import creates logs/.
+    with tempfile.TemporaryDirectory() as cwd:
+        env = dict(os.environ, PYTHONPATH=str(PROJECT_ROOT), LOG_LEVEL="ERROR")
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE.format(statement=statement)],
+            cwd=cwd, env=env, capture_output=True, text=True, timeout=60,
+        )
+    if result.returncode != 0:
+        raise RuntimeError(f"{statement!r} failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark import-time cost.")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'statement':<34} {'median ms':>10}  dotenv  handlers  logs/")
+    for label, statement in STATEMENTS.items():
+        samples = [run_once(statement) for _ in range(args.runs)]
+        last = samples[-1]
+        median_ms = statistics.median(s["ms"] for s in samples)
+        print(f"{label:<34} {median_ms:>10.1f}  {str(last['dotenv']):<6}  "
+              f"{str(last['logging.handlers']):<8}  {last['logs_dir']}")
+
+
+if __name__ == "__main__":
+    main()
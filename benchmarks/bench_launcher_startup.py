@@ -0,0 +1,56 @@
+"""Compares cold and warm (--preload) starts of the in-process launcher.
+
+Each run starts a fresh interpreter, converts a single line in batch mode
+and records:
+    ready         launcher start until the mode is entered (from --timings)
+    first result  wall time of the whole run minus 'ready', i.e. what the
+                  first conversion still has to pay after start-up
+
+Run from the project root (the API must be reachable, or point
+EXCHANGE_RATE_BASE_URL at a local stub):
+
+    python benchmarks/bench_launcher_startup.py --runs 5 --line "10 USD EUR"
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+READY_LINE = re.compile(r"ready after (?P<ms>[\d.]+) ms")
+
+
+def run_once(line: str, warm: bool) -> tuple[float, float]:
+    command = [sys.executable, "launcher.py", "batch", "--timings"]
+    if warm:
+        command.append("--preload")
+    started = time.perf_counter()
+    result = subprocess.run(command, cwd=PROJECT_ROOT, input=f"{line}\n",
+                            capture_output=True, text=True, timeout=120)
+    wall_ms = (time.perf_counter() - started) * 1000
+    match = READY_LINE.search(result.stderr)
+    if not match:
+        raise RuntimeError(f"Launcher did not report timings:\n{result.stderr}")
+    ready_ms = float(match["ms"])
+    return ready_ms, wall_ms - ready_ms
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark launcher start-up.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--line", default="10 USD EUR",
+                        help="Conversion to run in each start")
+    args = parser.parse_args()
+
+    for label, warm in (("cold", False), ("warm", True)):
+        ready, first = zip(*(run_once(args.line, warm) for _ in range(args.runs)))
+        print(f"{label}: ready median {statistics.median(ready):8.1f} ms  "
+              f"first result median {statistics.median(first):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Per-record cost of SamplingFilter on the logging hot path.
+
+Logs the same call site repeatedly through a handler that discards
+records after formatting. It compares no filter, the filter letting
+everything through, and the filter suppressing most records (the
+incident case). Run from the project root:
+
+    python benchmarks/bench_log_sampling.py --records 200000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+# Add the project root to the system path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from modular_logger.filters import SamplingFilter  # noqa: E402
+
+
+class _FormattingNullHandler(logging.Handler):
+    # Formats like a real handler would, then drops the output.
+    def emit(self, record):
+        self.format(record)
+
+
+def time_per_record(log_filter: SamplingFilter | None, records: int) -> float:
+    logger = logging.getLogger(f"bench_log_sampling.{id(log_filter)}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = _FormattingNullHandler()
+    if log_filter is not None:
+        handler.addFilter(log_filter)
+    logger.addHandler(handler)
+
+    started = time.perf_counter()
+    for i in range(records):
+        logger.info("Fetching exchange rate: USD -> EUR (%d)", i)
+    elapsed = time.perf_counter() - started
+    logger.removeHandler(handler)
+    return elapsed / records * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the sampling log filter.")
+    parser.add_argument("--records", type=int, default=200_000)
+    args = parser.parse_args()
+
+    cases = {
+        "no filter": None,
+        "filter, all records pass": SamplingFilter(bursts={"": 0}),
+        "filter, burst 10/s": SamplingFilter(bursts={"": 10}),
+        "filter, 1% sampling": SamplingFilter(sample_rates={"": 0.01}, bursts={"": 0}),
+    }
+    for label, log_filter in cases.items():
+        ns = time_per_record(log_filter, args.records)
+        print(f"{label:<28} {ns:8.0f} ns/record")
+
+
+if __name__ == "__main__":
+    main()
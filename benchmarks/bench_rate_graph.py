@@ -0,0 +1,66 @@
+"""Precompute and per-query cost of the rate graph over the full registry.
+
+Builds a graph from several sparse tables quoted against different bases
+(as mixed providers would return), then times the all-pairs precompute
+and best_rate() / best_path() queries. Run from the project root:
+
+    python benchmarks/bench_rate_graph.py --queries 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add the project root to the system path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from rate_graph import RateGraph  # noqa: E402
+
+
+def build_graph(bases: int, density: float, seed: int) -> RateGraph:
+    rng = random.Random(seed)
+    graph = RateGraph()
+    value = {code: rng.uniform(0.01, 200) for code in graph.codes}  # per-USD
+    for base in rng.sample(graph.codes, bases):
+        table = {code: value[code] / value[base] for code in graph.codes
+                 if code != base and rng.random() < density}
+        graph.add_table(base, table)
+    return graph
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bases", type=int, default=5)
+    parser.add_argument("--density", type=float, default=0.3,
+                        help="Fraction of currencies each table quotes")
+    parser.add_argument("--queries", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    graph = build_graph(args.bases, args.density, args.seed)
+    started = time.perf_counter()
+    graph.precompute()
+    precompute_ms = (time.perf_counter() - started) * 1000
+    print(f"{len(graph.codes)} currencies: precompute {precompute_ms:.1f} ms")
+
+    rng = random.Random(args.seed)
+    pairs = [tuple(rng.sample(graph.codes, 2)) for _ in range(args.queries)]
+    for label, query in (("best_rate", graph.best_rate), ("best_path", graph.best_path)):
+        started = time.perf_counter()
+        for from_currency, to_currency in pairs:
+            query(from_currency, to_currency)
+        per_query_us = (time.perf_counter() - started) / len(pairs) * 1e6
+        print(f"{label}: {per_query_us:.2f} µs/query")
+
+    started = time.perf_counter()
+    cycles = graph.find_arbitrage()
+    print(f"find_arbitrage: {len(cycles)} cycles in "
+          f"{(time.perf_counter() - started) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Per-call cost of the tracing instrumentation at different sample rates.
+
+Times a root span with three children (the shape of one conversion:
+validation, lookup, logging) with tracing off, sampled at 1% and fully
+on. Run from the project root:
+
+    python benchmarks/bench_tracing.py --calls 200000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add the project root to the system path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import tracing  # noqa: E402
+
+
+def time_per_call(sample_rate: float, calls: int) -> float:
+    tracing.configure(sample_rate=sample_rate, max_events=10_000)
+    span = tracing.span
+    started = time.perf_counter()
+    for _ in range(calls):
+        with span("convert_currency", "conversion"):
+            with span("validate.codes", "validation"):
+                pass
+            with span("rate.lookup", "rate", provider="static"):
+                pass
+            with span("log.conversion", "logging"):
+                pass
+    elapsed = time.perf_counter() - started
+    return elapsed / calls * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark tracing overhead.")
+    parser.add_argument("--calls", type=int, default=200_000)
+    args = parser.parse_args()
+
+    for label, rate in {"off (TRACE_SAMPLE_RATE=0)": 0.0, "1% sampled": 0.01,
+                        "every trace recorded": 1.0}.items():
+        ns = time_per_call(rate, args.calls)
+        print(f"{label:<28} {ns:8.0f} ns/conversion (4 spans)")
+    tracing.configure()
+
+
+if __name__ == "__main__":
+    main()
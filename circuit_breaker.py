@@ -0,0 +1,236 @@
+"""Circuit breakers for upstream rate sources.
+
+A CircuitBreaker moves between three states:
+
+- closed: calls go through. failure_threshold consecutive failures open it.
+- open: calls are rejected straight away, without touching the network,
+  until recovery_timeout seconds have passed.
+- half-open: up to half_open_max_calls probe calls are let through. A
+  successful probe closes the breaker; a failed one opens it again.
+
+Breakers are keyed per endpoint (get_breaker), so one failing host does
+not short-circuit the others. Every transition is logged and counted;
+breaker_metrics() returns the counters for all breakers.
+
+BreakerRateProvider wraps a RateProvider with a breaker. While the
+breaker is open it answers from the last good rate seen for the pair, or
+from a fallback provider (e.g. a StaticRateProvider snapshot), and
+otherwise fails fast with error 'circuit-open'.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Callable
+
+from rate_providers import RateProvider, RateQuote
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+CIRCUIT_OPEN_ERROR = "circuit-open"
+
+# Errors caused by the request itself, not by the upstream being unhealthy.
+# These never count towards opening a breaker; nor do HTTP 4xx answers
+# other than 429 (too many requests), whatever error name they carry.
+CLIENT_ERRORS = frozenset({
+    "unsupported-code", "malformed-request", "invalid-key",
+    "inactive-account", "missing-api-key",
+})
+
+
+def is_client_error(quote: RateQuote) -> bool:
+    if quote.error in CLIENT_ERRORS:
+        return True
+    return quote.status is not None and 400 <= quote.status < 500 and quote.status != 429
+
+
+class CircuitBreaker:
+
+    """Thread-safe closed/open/half-open breaker for one endpoint."""
+
+    def __init__(self, name: str, failure_threshold: int = 5,
+                 recovery_timeout: float = 30.0, half_open_max_calls: int = 1,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = max(half_open_max_calls, 1)
+        self._clock = clock
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+        self.transitions: Counter = Counter()
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def allow_request(self) -> bool:
+        """Whether a call may go to the endpoint now. Every allowed call must
+        be followed by record_success() or record_failure().
+        """
+        if self.failure_threshold <= 0:
+            return True
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            if self._state == HALF_OPEN:
+                self._probes = max(self._probes - 1, 0)
+                self._transition(CLOSED, "probe succeeded")
+
+    def record_failure(self) -> None:
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes = max(self._probes - 1, 0)
+                self._open("probe failed")
+                return
+            self._failures += 1
+            if (self._state == CLOSED and self.failure_threshold > 0
+                    and self._failures >= self.failure_threshold):
+                self._open(f"{self._failures} consecutive failures")
+
+    def reset(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probes = 0
+            if self._state != CLOSED:
+                self._transition(CLOSED, "reset")
+
+    def metrics(self) -> dict:
+        with self._lock:
+            self._maybe_half_open()
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "rejected": self.rejected,
+                "transitions": dict(self.transitions),
+            }
+
+    def _maybe_half_open(self) -> None:
+        # Called with the lock held.
+        if (self._state == OPEN
+                and self._clock() - self._opened_at >= self.recovery_timeout):
+            self._probes = 0
+            self._transition(HALF_OPEN, f"{self.recovery_timeout:g}s recovery timeout")
+
+    def _open(self, reason: str) -> None:
+        self._opened_at = self._clock()
+        self._transition(OPEN, reason)
+
+    def _transition(self, new_state: str, reason: str) -> None:
+        old_state, self._state = self._state, new_state
+        self.transitions[f"{old_state}->{new_state}"] += 1
+        log = logger.warning if new_state == OPEN else logger.info
+        log(f"Circuit breaker {self.name}: {old_state} -> {new_state} ({reason})")
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(key: str, **options) -> CircuitBreaker:
+    """Return the breaker for key (e.g. an endpoint URL), creating it with
+    options on first use.
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker(key, **options)
+        return breaker
+
+
+def breaker_metrics() -> dict[str, dict]:
+    """Metrics for every breaker created so far, keyed by endpoint."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.metrics() for breaker in breakers}
+
+
+def all_breakers_open() -> bool:
+    """True if at least one breaker exists and every breaker is open, i.e.
+    retrying now cannot reach any upstream.
+    """
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return bool(breakers) and all(breaker.state == OPEN for breaker in breakers)
+
+
+def reset_breakers() -> None:
+    """Forget all breakers (mainly for tests)."""
+    with _breakers_lock:
+        _breakers.clear()
+
+
+class BreakerRateProvider(RateProvider):
+
+    """Runs a provider behind a circuit breaker.
+
+    While the breaker is open, answers come from the last good rate for
+    the pair, then from fallback, else fail fast with 'circuit-open'.
+    """
+
+    def __init__(self, provider: RateProvider, breaker: CircuitBreaker,
+                 fallback: RateProvider | None = None, serve_stale: bool = True):
+        self.provider = provider
+        self.breaker = breaker
+        self.fallback = fallback
+        self.serve_stale = serve_stale
+        self.name = provider.name
+        self._last_good: dict[tuple[str, str], float] = {}
+        self.served_stale = 0
+        self.served_fallback = 0
+
+    def get_quote(self, from_currency: str, to_currency: str) -> RateQuote:
+        if not self.breaker.allow_request():
+            return self._short_circuit(from_currency, to_currency)
+
+        try:
+            quote = self.provider.get_quote(from_currency, to_currency)
+        except Exception:
+            # Count it, so a half-open probe slot taken above is given back.
+            self.breaker.record_failure()
+            raise
+        if quote.ok:
+            self.breaker.record_success()
+            self._last_good[(from_currency, to_currency)] = quote.rate
+        elif is_client_error(quote):
+            # The upstream answered; it is healthy even if the request was bad.
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+        return quote
+
+    def _short_circuit(self, from_currency: str, to_currency: str) -> RateQuote:
+        if self.serve_stale:
+            rate = self._last_good.get((from_currency, to_currency))
+            if rate is not None:
+                self.served_stale += 1
+                return RateQuote(rate, f"{self.name}:cached", 0.0)
+        if self.fallback is not None:
+            quote = self.fallback.get_quote(from_currency, to_currency)
+            if quote.ok:
+                self.served_fallback += 1
+                return quote
+        logger.debug(f"Circuit open for {self.name}: failing fast "
+                     f"{from_currency} -> {to_currency}")
+        return RateQuote(None, self.name, 0.0, CIRCUIT_OPEN_ERROR)
@@ -1,23 +1,232 @@
+"""Application settings, read once from the environment / .env file.
+
+Nothing is read at import time. get_settings() loads the .env file and
+builds a Settings object on first call and returns the same object after
+that, so importing this module (or anything that imports it) is free.
+
+The old module-level names (API_KEY, EXCHANGE_RATE_BASE_URL, ...) still
+work: they are resolved from get_settings() when first accessed.
+"""
+
 import os
-from dotenv import load_dotenv
+import sys
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+VALID_LOG_LEVELS: set[str] = {"DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"}
+
+
+def _env_int(key: str, default: int) -> int:
+    try:
+        return int(os.getenv(key, default))
+    except (ValueError, TypeError):
+        return default
+
+
+def _env_float(key: str, default: float) -> float:
+    try:
+        return float(os.getenv(key, default))
+    except (ValueError, TypeError):
+        return default
+
+
+def _env_flag(key: str) -> bool:
+    return os.getenv(key, "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+@dataclass(frozen=True)
+class Settings:
+    # Exchange rate API. The key is optional here so that code paths which
+    # never call the API (the GUI start-up, tests) do not need one.
+    api_key: str | None
+    exchange_rate_base_url: str
+    # Maximum number of pooled HTTP connections kept open to the API.
+    http_pool_size: int
+    # 'pair' fetches one rate per lookup; 'latest' keeps whole per-base
+    # tables and only re-polls them once upstream has published an update.
+    rate_source: str
+    rate_min_poll_seconds: float
+    # Shared-memory segment published by `launcher.py publish-rates`; when
+    # set and present, lookups read it before going to the network, unless
+    # its publisher has not been heard from for the max age (0 = no limit).
+    rate_shm_name: str
+    rate_shm_max_age_seconds: float
+    # Address of `launcher.py rate-daemon` (host:port or unix:/path); when
+    # set, lookups ask the daemon before fetching directly.
+    rate_daemon_address: str
+    # Relative change below which subscribers are not sent a rate update.
+    rate_change_threshold: float
+    # Optional secondary rate source (a mirror of the API, or a local JSON
+    # rate file) and how long to wait on the primary before also asking it.
+    rate_secondary_base_url: str
+    rate_static_file: str
+    rate_hedge_after_ms: int
+    # Per-endpoint circuit breaker: consecutive failures before opening
+    # (0 disables), seconds before a probe, and concurrent probes allowed.
+    circuit_failure_threshold: int
+    circuit_recovery_seconds: float
+    circuit_half_open_probes: int
+    # Record upstream HTTP exchanges to a file, or answer from one offline
+    # instead, scaling the recorded latencies (see rate_capture.py).
+    rate_capture_file: str
+    rate_replay_file: str
+    rate_replay_latency_scale: float
+
+    # Logging
+    log_level: str
+    log_dir: Path
+    log_file: Path
+    log_rotation_strategy: str
+    log_backup_count: int
+    log_rotation_size_mb: int
+    log_rotation_time: str
+    # Compression of rotated logs (auto, gzip, zstd or none) and the total
+    # size rotated logs may occupy before the oldest are deleted (0 = no limit).
+    log_compression: str
+    log_retention_total_mb: int
+    # Per-logger sampling of DEBUG/INFO and per-call-site rate limits,
+    # as 'name=value,...' strings (see modular_logger.filters).
+    log_sampling: str
+    log_rate_limit: str
+    log_rate_window: float
+    discord_webhook_url: str
+
+    # Tracing (see tracing.py): fraction of root spans recorded (0 = off),
+    # how many spans are buffered, and where they are written at exit.
+    trace_sample_rate: float
+    trace_max_events: int
+    trace_file: Path
+    # On-demand sampling profiler (see profiler.py): start a run on SIGUSR1
+    # and/or at start-up, how long a run lasts and how often it samples.
+    profile_on_signal: bool
+    profile_at_start: bool
+    profile_seconds: float
+    profile_interval_ms: float
+    # Binary conversion journal (see journal.py); empty = off. Segment size
+    # and how often buffered records are written and fsynced as a group.
+    journal_dir: str
+    journal_segment_mb: int
+    journal_commit_ms: int
+    # Decayed profile of requested pairs (see traffic_profile.py); empty =
+    # off unless an application enables it (then logs/traffic_profile.json).
+    # Half-life of a request, pairs kept, and how often it is saved.
+    traffic_profile_file: str
+    traffic_half_life_hours: float
+    traffic_profile_size: int
+    traffic_save_seconds: float
+    # Start-up warm-up from that profile: how many of the top pairs (or, with
+    # RATE_SOURCE=latest, base tables) to prefetch and the time allowed.
+    warmup_top_k: int
+    warmup_budget_ms: int
+
+    def require_api_key(self) -> str:
+        """Return the API key, raising if it is missing."""
+        if not self.api_key:
+            raise RuntimeError("EXCHANGE_RATE_API_KEY is either missing from "
+                               "environment or .env file")
+        return self.api_key
+
+
+def load_settings() -> Settings:
+    """Read the .env file and environment into a new Settings object."""
+    from dotenv import load_dotenv  # only paid for when settings are needed
+    load_dotenv()
+
+    log_level = os.getenv("LOG_LEVEL", "INFO").upper()
+    if log_level not in VALID_LOG_LEVELS:
+        raise ValueError(f"Invalid LOG_LEVEL: '{log_level}'. Must be one of: "
+                         f"{', '.join(sorted(VALID_LOG_LEVELS))}")
+
+    log_dir = Path(os.getenv("LOG_DIR", "logs"))
+    return Settings(
+        api_key=os.getenv("EXCHANGE_RATE_API_KEY") or None,
+        # Base URL for the exchange rate API — can be overridden in .env or environment
+        exchange_rate_base_url=os.getenv("EXCHANGE_RATE_BASE_URL",
+                                         "https://v6.exchangerate-api.com/v6"),
+        http_pool_size=_env_int("HTTP_POOL_SIZE", 16),
+        rate_source=os.getenv("RATE_SOURCE", "pair").strip().lower(),
+        rate_min_poll_seconds=_env_float("RATE_MIN_POLL_SECONDS", 60.0),
+        rate_shm_name=os.getenv("RATE_SHM_NAME", "").strip(),
+        rate_shm_max_age_seconds=_env_float("RATE_SHM_MAX_AGE_SECONDS", 60.0),
+        rate_daemon_address=os.getenv("RATE_DAEMON_ADDRESS", "").strip(),
+        rate_change_threshold=_env_float("RATE_CHANGE_THRESHOLD", 0.0001),
+        rate_secondary_base_url=os.getenv("RATE_SECONDARY_BASE_URL", "").strip(),
+        rate_static_file=os.getenv("RATE_STATIC_FILE", "").strip(),
+        rate_hedge_after_ms=_env_int("RATE_HEDGE_AFTER_MS", 300),
+        circuit_failure_threshold=_env_int("CIRCUIT_FAILURE_THRESHOLD", 5),
+        circuit_recovery_seconds=_env_float("CIRCUIT_RECOVERY_SECONDS", 30.0),
+        circuit_half_open_probes=_env_int("CIRCUIT_HALF_OPEN_PROBES", 1),
+        rate_capture_file=os.getenv("RATE_CAPTURE_FILE", "").strip(),
+        rate_replay_file=os.getenv("RATE_REPLAY_FILE", "").strip(),
+        rate_replay_latency_scale=_env_float("RATE_REPLAY_LATENCY_SCALE", 1.0),
+        log_level=log_level,
+        log_dir=log_dir,
+        log_file=log_dir / "converter.log",
+        log_rotation_strategy=(os.getenv("LOG_ROTATION_STRATEGY") or "SIZE").upper(),
+        log_backup_count=_env_int("LOG_BACKUP_COUNT", 5),
+        log_rotation_size_mb=_env_int("LOG_ROTATION_SIZE_MB", 5),
+        log_rotation_time=os.getenv("LOG_ROTATION_TIME", "midnight"),
+        log_compression=os.getenv("LOG_COMPRESSION", "auto"),
+        log_retention_total_mb=_env_int("LOG_RETENTION_TOTAL_MB", 100),
+        log_sampling=os.getenv("LOG_SAMPLING", ""),
+        log_rate_limit=os.getenv("LOG_RATE_LIMIT", ""),
+        log_rate_window=_env_float("LOG_RATE_WINDOW", 1.0),
+        discord_webhook_url=os.getenv("DISCORD_WEBHOOK_URL", "").strip(),
+        trace_sample_rate=_env_float("TRACE_SAMPLE_RATE", 0.0),
+        trace_max_events=_env_int("TRACE_MAX_EVENTS", 100_000),
+        trace_file=Path(os.getenv("TRACE_FILE") or log_dir / "trace.json"),
+        profile_on_signal=_env_flag("PROFILE_ON_SIGNAL"),
+        profile_at_start=_env_flag("PROFILE_AT_START"),
+        profile_seconds=_env_float("PROFILE_SECONDS", 30.0),
+        profile_interval_ms=_env_float("PROFILE_INTERVAL_MS", 5.0),
+        journal_dir=os.getenv("JOURNAL_DIR", "").strip(),
+        journal_segment_mb=_env_int("JOURNAL_SEGMENT_MB", 64),
+        journal_commit_ms=_env_int("JOURNAL_COMMIT_MS", 200),
+        traffic_profile_file=os.getenv("TRAFFIC_PROFILE_FILE", "").strip(),
+        traffic_half_life_hours=_env_float("TRAFFIC_HALF_LIFE_HOURS", 24.0),
+        traffic_profile_size=_env_int("TRAFFIC_PROFILE_SIZE", 256),
+        traffic_save_seconds=_env_float("TRAFFIC_SAVE_SECONDS", 60.0),
+        warmup_top_k=_env_int("WARMUP_TOP_K", 32),
+        warmup_budget_ms=_env_int("WARMUP_BUDGET_MS", 3000),
+    )
+
+
+_settings: Settings | None = None
+_settings_lock = threading.Lock()
+
 
-load_dotenv()
-# Read API key and base URL from environment variables, with defaults
-API_KEY = os.getenv("EXCHANGE_RATE_API_KEY")
+def get_settings() -> Settings:
+    """Return the process-wide Settings, loading them on first use."""
+    global _settings
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                _settings = load_settings()
+    return _settings
 
 
-# Explicit, pre-emptive check to see if API key is valid and present.
-if not API_KEY:
-    raise RuntimeError(f"EXCHANGE_RATE_API_KEY is either missing from environment"
-                       f"or .env file")
+def reset_settings() -> None:
+    """Forget the cached settings so the next get_settings() re-reads them."""
+    global _settings
+    with _settings_lock:
+        _settings = None
+    tracing = sys.modules.get("tracing")
+    if tracing is not None:  # it caches TRACE_SAMPLE_RATE
+        tracing.reset()
 
 
-# Base URL for the exchange rate API — can be overridden in .env or environment
-EXCHANGE_RATE_BASE_URL = os.getenv(
-    "EXCHANGE_RATE_BASE_URL",
-    "https://v6.exchangerate-api.com/v6"
-)
+# Legacy module-level names, resolved lazily (PEP 562).
+_LEGACY_NAMES = {
+    "EXCHANGE_RATE_BASE_URL": lambda s: s.exchange_rate_base_url,
+    "HTTP_POOL_SIZE": lambda s: s.http_pool_size,
+    "LOG_LEVEL": lambda s: s.log_level,
+    "LOG_FILE": lambda s: s.log_file,
+    "API_KEY": lambda s: s.require_api_key(),
+}
 
 
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
-LOG_FILE = os.getenv("LOG_FILE", "app.log")
+def __getattr__(name: str):
+    if name in _LEGACY_NAMES:
+        return _LEGACY_NAMES[name](get_settings())
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
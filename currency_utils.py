@@ -1,63 +1,596 @@
+import atexit
 import logging
+import math
+import queue
+import random
+import threading
+import time
 import requests
 import os
-from config import API_KEY, EXCHANGE_RATE_BASE_URL
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from functools import partial
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator
+from config import get_settings
+from requests.adapters import BaseAdapter, HTTPAdapter
 from requests.exceptions import RequestException
-from modular_logger.root_logger import logger
+from circuit_breaker import BreakerRateProvider, all_breakers_open, get_breaker
+from rate_providers import (
+    ExchangeRateApiProvider, FallbackRateProvider, HedgedRateProvider,
+    RateProvider, RateQuote, StaticRateProvider
+)
+from rate_daemon import DaemonRateProvider
+from rate_table import RateTableProvider
+from tracing import propagate, span
 
+if TYPE_CHECKING:  # imported lazily: asyncio is only needed by subscribers
+    from journal import ConversionJournal
+    from traffic_profile import TrafficProfile
+    from rate_subscriptions import (
+        AsyncRateSubscription, CallbackRateSubscription, RateSubscriptionHub,
+        RateUpdate
+    )
 
+# A logger per module, so sampling and rate limits (LOG_SAMPLING,
+# LOG_RATE_LIMIT) can be tuned for this hot path on its own.
+logger = logging.getLogger(__name__)
 
 
-def get_exchange_rate(from_currency: str,
-                      to_currency: str) -> float |None:
-    api_key = API_KEY
-    if not api_key or not from_currency or not to_currency:
-        logger.error("One or more of the required parameters is missing "
-                     "for exchange rate lookup.")
-        return None
+# One shared session so repeated lookups reuse pooled keep-alive connections
+# instead of opening a new connection per request.
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def _build_adapter(settings) -> BaseAdapter:
+    """The session's transport: pooled HTTP, recording it, or replaying a
+    recording offline (RATE_CAPTURE_FILE / RATE_REPLAY_FILE).
+    """
+    pool_size = settings.http_pool_size
+    if settings.rate_replay_file:
+        from rate_capture import ReplayAdapter
+        if settings.rate_capture_file:
+            logger.warning("RATE_REPLAY_FILE is set, so RATE_CAPTURE_FILE is ignored")
+        return ReplayAdapter.from_file(settings.rate_replay_file,
+                                       secrets=[settings.api_key],
+                                       latency_scale=settings.rate_replay_latency_scale)
+    if settings.rate_capture_file:
+        from rate_capture import CaptureWriter, RecordingAdapter
+        logger.info(f"Recording upstream rate traffic to {settings.rate_capture_file}")
+        return RecordingAdapter(CaptureWriter(settings.rate_capture_file),
+                                secrets=[settings.api_key],
+                                pool_connections=pool_size, pool_maxsize=pool_size)
+    return HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
 
 
-    from_currency = from_currency.upper()
-    to_currency = to_currency.upper()
+def _get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = _build_adapter(get_settings())
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
 
-    if not (from_currency.isalpha() and len(from_currency) == 3 and
-            to_currency.isalpha() and len(to_currency) == 3):
-        logger.error(f"Invalid currency codes: {from_currency}, {to_currency}. "
-                     "Expected 3-letter alphabetic ISO codes.")
-        return None
-    url = f"{EXCHANGE_RATE_BASE_URL}/{api_key}/pair/{from_currency}/{to_currency}"
-    logger.info(f"Fetching exchange rate: {from_currency} -> {to_currency} from {url}")
 
+def warm_http_pool(timeout: float = 5) -> None:
+    """Open a pooled keep-alive connection to the API host ahead of the first
+    lookup, so DNS, TCP and TLS setup are not paid by the first conversion.
+    The response itself (usually a 404 for the bare base URL) is irrelevant.
+    """
     try:
-        response = requests.get(url, timeout=5)
-        response.raise_for_status()  # Raises HTTPError for bad responses
-        data = response.json()
-    except RequestException as req_err:
-        logger.exception(f"HTTP request has failed: {req_err}")
-        return None
-
-    if data.get("result") == "success":
-        rate = data["conversion_rate"]
-        logger.info(f"Rate found: 1 {from_currency} = {rate} {to_currency}")
-        return rate
+        _get_session().head(get_settings().exchange_rate_base_url, timeout=timeout)
+    except RequestException as e:
+        logger.warning(f"Could not pre-open a connection to the rate API: {e}")
+
+
+_provider: RateProvider | None = None
+_provider_lock = threading.Lock()
+
+
+def _build_table_provider(settings) -> RateTableProvider:
+    return RateTableProvider(settings.exchange_rate_base_url, settings.api_key,
+                             session_factory=_get_session,
+                             min_poll_interval=settings.rate_min_poll_seconds)
+
+
+def build_rate_provider(settings) -> RateProvider:
+    """Build the provider chain described by settings.
+
+    The exchangerate-api pair endpoint is the primary. If a secondary source
+    is configured (RATE_SECONDARY_BASE_URL, else RATE_STATIC_FILE), requests
+    are hedged to it after RATE_HEDGE_AFTER_MS. RATE_SOURCE=latest swaps the
+    primary for conditionally refreshed /latest tables. Each API endpoint sits
+    behind its own circuit breaker; while it is open, lookups are answered
+    from the last good rate or the RATE_STATIC_FILE snapshot, or fail fast.
+    With RATE_DAEMON_ADDRESS, the host's rate daemon is asked before the
+    network; with RATE_SHM_NAME, the shared-memory table before either.
+    """
+    breaker_options = {
+        "failure_threshold": settings.circuit_failure_threshold,
+        "recovery_timeout": settings.circuit_recovery_seconds,
+        "half_open_max_calls": settings.circuit_half_open_probes,
+    }
+    snapshot = (StaticRateProvider.from_file(settings.rate_static_file)
+                if settings.rate_static_file else None)
+
+    def guarded(provider: ExchangeRateApiProvider | RateTableProvider) -> RateProvider:
+        return BreakerRateProvider(provider,
+                                   get_breaker(provider.base_url, **breaker_options),
+                                   fallback=snapshot)
+
+    if settings.rate_source == "latest":
+        primary = guarded(_build_table_provider(settings))
     else:
-        logger.error(f"Exchange rate API error: "
-                     f"{data.get('error-type', 'Unknown')} | Response: {data}")
-        return None
+        primary = guarded(ExchangeRateApiProvider(settings.exchange_rate_base_url,
+                                                  settings.api_key,
+                                                  session_factory=_get_session))
+    secondary: RateProvider | None = snapshot
+    if settings.rate_secondary_base_url:
+        secondary = guarded(ExchangeRateApiProvider(settings.rate_secondary_base_url,
+                                                    settings.api_key,
+                                                    session_factory=_get_session,
+                                                    name="exchangerate-api-secondary"))
+
+    network = primary
+    if secondary is not None:
+        network = HedgedRateProvider(primary, secondary,
+                                     hedge_after=settings.rate_hedge_after_ms / 1000,
+                                     max_workers=settings.http_pool_size)
+
+    if settings.rate_daemon_address:
+        network = FallbackRateProvider(DaemonRateProvider(settings.rate_daemon_address),
+                                       network)
+
+    if settings.rate_shm_name:
+        # Imported here so numpy is only loaded when the table is shared.
+        from shared_rates import SharedMemoryRateProvider, SharedRateReader
+        try:
+            max_age = settings.rate_shm_max_age_seconds
+            shared = SharedMemoryRateProvider(SharedRateReader(
+                settings.rate_shm_name, max_age=max_age if max_age > 0 else None))
+        except (FileNotFoundError, ValueError) as e:
+            logger.warning(f"Shared rate table {settings.rate_shm_name} "
+                           f"unavailable, using the network only: {e}")
+        else:
+            return FallbackRateProvider(shared, network)
+    return network
+
+
+def get_rate_provider() -> RateProvider:
+    """Return the process-wide provider, building it from settings on first use."""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = build_rate_provider(get_settings())
+    return _provider
+
+
+def set_rate_provider(provider: RateProvider | None) -> None:
+    """Replace the provider (None rebuilds it from settings on next use)."""
+    global _provider
+    with _provider_lock:
+        _provider = provider
+
+
+_hub: "RateSubscriptionHub | None" = None
+
+
+def get_subscription_hub() -> "RateSubscriptionHub":
+    """The process-wide subscription hub, created on first use."""
+    global _hub
+    if _hub is None:
+        with _provider_lock:
+            if _hub is None:
+                from rate_subscriptions import RateSubscriptionHub
+                settings = get_settings()
+                _hub = RateSubscriptionHub(_build_table_provider(settings),
+                                           threshold=settings.rate_change_threshold)
+    return _hub
+
+
+def subscribe(pairs_or_bases, threshold: float | None = None) -> "AsyncRateSubscription":
+    """Async iterator of RateUpdates for pairs ("EUR/USD") or bases ("EUR"),
+    sent only when a rate moves by more than threshold (RATE_CHANGE_THRESHOLD
+    by default). Call from inside a running event loop.
+
+        async with subscribe(["EUR/USD", "GBP"]) as updates:
+            async for update in updates:
+                ...
+    """
+    return get_subscription_hub().subscribe(pairs_or_bases, threshold)
+
+
+def subscribe_callback(pairs_or_bases, callback: Callable[["RateUpdate"], None],
+                       threshold: float | None = None) -> "CallbackRateSubscription":
+    """Like subscribe(), but calls callback(update) on the refresher thread.
+    Call close() on the result to unsubscribe.
+    """
+    return get_subscription_hub().subscribe_callback(pairs_or_bases, callback, threshold)
+
+
+_journal: "ConversionJournal | None" = None
+
+
+def get_journal() -> "ConversionJournal | None":
+    """The process-wide conversion journal, or None unless JOURNAL_DIR is set."""
+    global _journal
+    if _journal is None:
+        settings = get_settings()
+        if not settings.journal_dir:
+            return None
+        with _provider_lock:
+            if _journal is None:
+                from journal import ConversionJournal
+                _journal = ConversionJournal(
+                    settings.journal_dir,
+                    segment_bytes=settings.journal_segment_mb * 1024 * 1024,
+                    commit_interval=settings.journal_commit_ms / 1000)
+    return _journal
+
+
+_traffic: "TrafficProfile | None" = None
+_traffic_path = ""
+_traffic_next_save = 0.0
+# Set by enable_traffic_profile(); profiling is off for library callers.
+_traffic_enabled_path = ""
+
+
+def enable_traffic_profile(path: str | None = None) -> None:
+    """Profile requested pairs in this process, saved to path (default:
+    TRAFFIC_PROFILE_FILE, else traffic_profile.json in the log directory).
+
+    The applications call this at start-up; a library caller opts in with
+    this or TRAFFIC_PROFILE_FILE, since the profile writes a file and
+    saves from a background thread.
+    """
+    global _traffic_enabled_path
+    settings = get_settings()
+    _traffic_enabled_path = str(path or settings.traffic_profile_file
+                                or settings.log_dir / "traffic_profile.json")
+
+
+def get_traffic_profile() -> "TrafficProfile | None":
+    """The process-wide profile of requested pairs, loaded on first use
+    (None unless enabled, see enable_traffic_profile()).
+    """
+    global _traffic, _traffic_path, _traffic_next_save
+    if _traffic is None:
+        settings = get_settings()
+        path = _traffic_enabled_path or settings.traffic_profile_file
+        if not path:
+            return None
+        with _provider_lock:
+            if _traffic is None:
+                from traffic_profile import TrafficProfile
+                _traffic = TrafficProfile.load(
+                    path, half_life=settings.traffic_half_life_hours * 3600,
+                    capacity=settings.traffic_profile_size)
+                _traffic_path = path
+                _traffic_next_save = time.monotonic() + settings.traffic_save_seconds
+                atexit.register(save_traffic_profile)
+    return _traffic
+
+
+def save_traffic_profile() -> None:
+    """Persist the traffic profile (also done periodically and at exit)."""
+    if _traffic is None:
+        return
+    try:
+        _traffic.save(_traffic_path)
+    except OSError as e:
+        logger.warning(f"Could not save the traffic profile: {e}")
+
+
+def _note_traffic(from_currency: str, to_currency: str) -> None:
+    global _traffic_next_save
+    profile = get_traffic_profile()
+    if profile is None:
+        return
+    profile.record(from_currency, to_currency)
+    now = time.monotonic()
+    if now >= _traffic_next_save:
+        # Saved periodically too, since a deploy's SIGTERM skips atexit.
+        _traffic_next_save = now + get_settings().traffic_save_seconds
+        threading.Thread(target=save_traffic_profile, name="traffic-profile-save",
+                         daemon=True).start()
+
+
+def warm_rate_cache(budget: float | None = None, top: int | None = None) -> int:
+    """Prefetch the most requested rates concurrently, before serving traffic.
+
+    With RATE_SOURCE=latest this fetches the tables of the WARMUP_TOP_K most
+    requested bases; otherwise it looks up the top pairs, which opens pooled
+    connections and seeds the circuit breakers' last good rates (the pair
+    source keeps no other cache). Gives up after budget seconds
+    (WARMUP_BUDGET_MS). Returns the number of successful lookups.
+    """
+    settings = get_settings()
+    budget = settings.warmup_budget_ms / 1000 if budget is None else budget
+    top = settings.warmup_top_k if top is None else top
+    profile = get_traffic_profile()
+    if profile is None or budget <= 0 or top <= 0:
+        return 0
+    if settings.rate_source == "latest":
+        # Any pair out of a base fetches that base's whole table.
+        first_pair: dict[str, tuple[str, str]] = {}
+        for pair in profile.counts():
+            first_pair.setdefault(pair[0], pair)
+        targets = [first_pair[base] for base in profile.top_bases(top)]
+    else:
+        targets = profile.top_pairs(top)
+    if not targets:
+        return 0
+
+    provider = get_rate_provider()
+    started = time.perf_counter()
+    with span("warm_rate_cache", "rate", targets=len(targets)):
+        executor = ThreadPoolExecutor(max_workers=min(settings.http_pool_size, len(targets)),
+                                      thread_name_prefix="rate-warmup")
+        # Straight to the provider: warm-up lookups must not count as traffic.
+        futures = [executor.submit(propagate(provider.get_quote), from_code, to_code)
+                   for from_code, to_code in targets]
+        done, pending = wait(futures, timeout=budget)
+        executor.shutdown(wait=False, cancel_futures=True)
+    warmed = sum(1 for future in done
+                 if future.exception() is None and future.result().ok)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logger.info(f"Warmed {warmed} of {len(targets)} hot rates in {elapsed_ms:.0f} ms"
+                + (f" ({len(pending)} still pending at the {budget:g}s budget)"
+                   if pending else ""))
+    return warmed
+
+
+# Provider of the calling thread's latest quote, for the journal.
+_last_quote = threading.local()
+
+
+def _last_provider() -> str:
+    return getattr(_last_quote, "provider", "")
+
+
+def get_exchange_quote(from_currency: str, to_currency: str) -> RateQuote | None:
+    """Like get_exchange_rate, but returns the full RateQuote (which provider
+    answered and how long it took). None means the input was invalid.
+    """
+    _last_quote.provider = ""
+    with span("get_exchange_quote", "conversion") as current:
+        with span("validate.codes", "validation"):
+            if not from_currency or not to_currency:
+                logger.error("One or more of the required parameters is missing "
+                             "for exchange rate lookup.")
+                return None
+
+            from_currency = from_currency.upper()
+            to_currency = to_currency.upper()
+
+            if not (from_currency.isalpha() and len(from_currency) == 3 and
+                    to_currency.isalpha() and len(to_currency) == 3):
+                logger.error(f"Invalid currency codes: {from_currency}, {to_currency}. "
+                             "Expected 3-letter alphabetic ISO codes.")
+                return None
+
+        current.set(pair=f"{from_currency}/{to_currency}")
+        _note_traffic(from_currency, to_currency)
+        provider = get_rate_provider()
+        with span("rate.lookup", "rate", provider=provider.name) as lookup:
+            quote = provider.get_quote(from_currency, to_currency)
+            lookup.set(answered_by=quote.provider, error=quote.error)
+        _last_quote.provider = quote.provider
+        return quote
+
+
+def get_exchange_rate(from_currency: str,
+                      to_currency: str) -> float | None:
+    quote = get_exchange_quote(from_currency, to_currency)
+    return quote.rate if quote is not None else None
+
+
+def _record_conversion(amount: float, from_currency: str, to_currency: str,
+                       rate: float | None, converted: float | None,
+                       provider: str = "") -> None:
+    """Journal a conversion (or a failed one) and log it.
+
+    With the journal on, the journal is the audit record and the per
+    conversion log line drops to DEBUG.
+    """
+    journal = get_journal()
+    if journal is not None:
+        try:
+            journal.record(amount, from_currency, to_currency, rate, converted, provider)
+        except ValueError as e:  # closed at interpreter exit
+            logger.warning(f"Conversion not journaled: {e}")
+    if converted is None:
+        return
+    with span("log.conversion", "logging"):
+        logger.log(logging.INFO if journal is None else logging.DEBUG,
+                   f"Conversion: {amount:.2f} {from_currency.upper()} "
+                   f"→ {converted:.2f} {to_currency.upper()}")
 
 
 def convert_currency(amount: float, from_currency: str,
                      to_currency: str) -> float | None:
-    if not isinstance(amount, (int, float)) or amount <= 0:
-        logger.error(f"Invalid amount for conversion: {amount}")
-        return None
-    logger.debug(f"Converting {amount} {from_currency} to {to_currency}")
-    rate = get_exchange_rate(from_currency, to_currency)
-
-    if rate is not None:
-        converted = amount * rate
-        logger.info(f"Converted amount: {converted:.2f} {to_currency}")
-        return converted
-    else:
-        logger.warning("Conversion failed due to missing exchange rate.")
-        return None
+    with span("convert_currency", "conversion"):
+        with span("validate.amount", "validation"):
+            if not isinstance(amount, (int, float)) or amount <= 0:
+                logger.error(f"Invalid amount for conversion: {amount}")
+                return None
+        logger.debug(f"Converting {amount} {from_currency} to {to_currency}")
+        rate = get_exchange_rate(from_currency, to_currency)
+
+        if rate is not None:
+            converted = amount * rate
+            _record_conversion(amount, from_currency, to_currency, rate, converted,
+                               _last_provider())
+            return converted
+        else:
+            logger.warning("Conversion failed due to missing exchange rate.")
+            _record_conversion(amount, from_currency, to_currency, None, None,
+                               _last_provider())
+            return None
+
+
+def backoff_delay(attempt: int, base_delay: float = 0.25,
+                  max_delay: float = 8.0) -> float:
+    """Exponential backoff with full jitter for the given retry attempt (0-based).
+
+    Randomising the whole interval stops many failing callers from
+    retrying in lock-step against an upstream that is already struggling.
+    """
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+def get_exchange_rate_with_backoff(from_currency: str, to_currency: str,
+                                   max_retries: int = 3,
+                                   base_delay: float = 0.25,
+                                   max_delay: float = 8.0) -> float | None:
+    """get_exchange_rate, retried with backoff_delay() between failed attempts.
+
+    Only the calling thread sleeps, so in a batch one failing pair does not
+    hold up lookups for any other pair. Nothing is retried while the
+    upstream's circuit breaker is open.
+    """
+    for attempt in range(max_retries + 1):
+        rate = get_exchange_rate(from_currency, to_currency)
+        if rate is not None:
+            return rate
+        if all_breakers_open():
+            logger.warning(f"Not retrying {from_currency} -> {to_currency}: "
+                           "every upstream circuit is open")
+            return None
+        if attempt < max_retries:
+            delay = backoff_delay(attempt, base_delay, max_delay)
+            logger.warning(f"Retrying {from_currency} -> {to_currency} in "
+                           f"{delay:.2f}s (attempt {attempt + 1} of {max_retries})")
+            time.sleep(delay)
+    return None
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    index: int  # position of the conversion in the input
+    amount: float
+    from_currency: str
+    to_currency: str
+    converted: float | None
+    error: str | None = None
+
+
+@dataclass(frozen=True)
+class _FeedFinished:
+    submitted: int
+    error: BaseException | None = None
+
+
+def _is_currency_code(code: str) -> bool:
+    return isinstance(code, str) and code.isalpha() and len(code) == 3
+
+
+def convert_batch(conversions: Iterable[tuple[float, str, str]],
+                  max_workers: int = 8,
+                  max_in_flight: int | None = None,
+                  max_retries: int = 3,
+                  base_delay: float = 0.25,
+                  max_delay: float = 8.0) -> Iterator[BatchResult]:
+    """Convert (amount, from, to) tuples concurrently, yielding each result
+    as soon as it completes (so not necessarily in input order).
+
+    - At most max_workers rate lookups run at once.
+    - At most max_in_flight conversions are pending, so memory stays
+      bounded however long the input is. conversions is consumed lazily
+      on a feeder thread and may be an endless stream such as stdin.
+    - Each distinct pair is fetched once and the rate is reused for the rest
+      of the batch. A pair that fails is retried with jittered backoff, and
+      after a final failure it is forgotten so later lines try again.
+    """
+    max_in_flight = max_in_flight or max_workers * 4
+    results: queue.Queue = queue.Queue()
+    in_flight = threading.BoundedSemaphore(max_in_flight)
+    rate_futures: dict[tuple[str, str], Future] = {}
+    # Re-entrant: add_done_callback runs the callback immediately, in this
+    # thread, when the future has already finished.
+    rate_futures_lock = threading.RLock()
+
+    def lookup(from_currency: str, to_currency: str) -> tuple[float | None, str]:
+        rate = get_exchange_rate_with_backoff(from_currency, to_currency,
+                                              max_retries, base_delay, max_delay)
+        return rate, _last_provider()
+
+    def forget_failure(pair: tuple[str, str], future: Future) -> None:
+        if future.exception() is None and future.result()[0] is not None:
+            return
+        with rate_futures_lock:
+            if rate_futures.get(pair) is future:
+                del rate_futures[pair]
+
+    def finish(index: int, amount: float, from_currency: str,
+               to_currency: str, future: Future) -> None:
+        try:
+            rate, provider = future.result()
+            error = None if rate is not None else "exchange rate unavailable"
+        except Exception as e:
+            rate, provider, error = None, "", f"unexpected error: {e}"
+        converted = amount * rate if rate is not None else None
+        _record_conversion(amount, from_currency, to_currency, rate, converted, provider)
+        results.put(BatchResult(index, amount, from_currency,
+                                to_currency, converted, error))
+        in_flight.release()
+
+    def feed(executor: ThreadPoolExecutor) -> None:
+        submitted = 0
+        try:
+            for index, (amount, from_currency, to_currency) in enumerate(conversions):
+                in_flight.acquire()
+                submitted += 1
+                from_currency = str(from_currency).upper()
+                to_currency = str(to_currency).upper()
+
+                error = None
+                if (not isinstance(amount, (int, float)) or not math.isfinite(amount)
+                        or amount <= 0):
+                    error = "invalid amount"
+                elif not (_is_currency_code(from_currency)
+                          and _is_currency_code(to_currency)):
+                    error = "invalid currency code"
+                if error:
+                    results.put(BatchResult(index, amount, from_currency,
+                                            to_currency, None, error))
+                    in_flight.release()
+                    continue
+
+                pair = (from_currency, to_currency)
+                with rate_futures_lock:
+                    future = rate_futures.get(pair)
+                    if future is None:
+                        future = executor.submit(propagate(lookup), from_currency,
+                                                 to_currency)
+                        rate_futures[pair] = future
+                        future.add_done_callback(partial(forget_failure, pair))
+                future.add_done_callback(
+                    partial(finish, index, amount, from_currency, to_currency))
+        except BaseException as e:
+            results.put(_FeedFinished(submitted, e))
+        else:
+            results.put(_FeedFinished(submitted))
+
+    with ThreadPoolExecutor(max_workers=max_workers,
+                            thread_name_prefix="convert-batch") as executor:
+        feeder = threading.Thread(target=propagate(feed), args=(executor,),
+                                  name="convert-batch-feeder", daemon=True)
+        feeder.start()
+
+        expected: int | None = None
+        yielded = 0
+        while expected is None or yielded < expected:
+            item = results.get()
+            if isinstance(item, _FeedFinished):
+                if item.error is not None:
+                    raise item.error
+                expected = item.submitted
+                continue
+            yielded += 1
+            yield item
@@ -0,0 +1,71 @@
+"""Lightweight currency registry built straight from the bundled CSV.
+
+Unlike valid_currencies_dict, this does not import pandas, so it is cheap
+enough to load while a window or prompt is already on screen.
+Each currency keeps a stable ordinal (its row position in the CSV),
+which lets other modules store currencies as small integers.
+"""
+
+import csv
+from dataclasses import dataclass
+from functools import lru_cache
+
+from parse_currencies_from_csv import resource_path
+
+CURRENCY_CSV_PATH = "data/physical_currency_list.csv"
+
+
+@dataclass(frozen=True)
+class Currency:
+    code: str
+    name: str
+
+
+class CurrencyRegistry:
+    """Ordered, read-only collection of currencies with code lookups."""
+
+    def __init__(self, currencies: list[Currency]):
+        self.currencies: tuple[Currency, ...] = tuple(currencies)
+        self._ordinals: dict[str, int] = {
+            currency.code: ordinal for ordinal, currency in enumerate(self.currencies)
+        }
+
+    def __len__(self) -> int:
+        return len(self.currencies)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self._ordinals
+
+    def __iter__(self):
+        return iter(self.currencies)
+
+    @property
+    def codes(self) -> tuple[str, ...]:
+        return tuple(currency.code for currency in self.currencies)
+
+    def ordinal(self, code: str) -> int:
+        """Return the stable position of code, raising KeyError if unknown."""
+        return self._ordinals[code]
+
+    def name_of(self, code: str) -> str:
+        return self.currencies[self._ordinals[code]].name
+
+
+def load_currency_registry(csv_path: str | None = None) -> CurrencyRegistry:
+    """Read the currency CSV (code in column 0, name in column 1)."""
+    path = csv_path or resource_path(CURRENCY_CSV_PATH)
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)  # skip the header row
+        currencies = [
+            Currency(code=row[0].strip().upper(), name=row[1].strip())
+            for row in reader
+            if len(row) >= 2 and row[0].strip()
+        ]
+    return CurrencyRegistry(currencies)
+
+
+@lru_cache(maxsize=1)
+def get_currency_registry() -> CurrencyRegistry:
+    """Return the process-wide registry, loading it on first use."""
+    return load_currency_registry()
@@ -1,9 +1,14 @@
 import argparse
+import logging
+import sqlite3
 import sys
 
-from flake8_report_creator import run_flake8
-from parser import parse_flake8_report
-from visualizer import plot_error_code_chart, plot_top_files_chart
+from flake8_report_creator import run_flake8_incremental
+from parser import summarize_flake8_report
+from summary import text_summary, write_html_summary
+from trend_index import TrendIndex
+from utils import list_flake8_reports
+from visualizer import plot_report_charts
 
 
 def main() -> None:
@@ -14,11 +19,26 @@ def main() -> None:
     """
     parser = argparse.ArgumentParser(description="Run Flake8 and analyze results.")
     parser.add_argument("path", nargs="?", default=".", help="Directory or file to lint")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="flake8 processes to run in parallel (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Lint every file, ignoring cached per-file results")
+    parser.add_argument("--trends", type=int, nargs="?", const=20, metavar="RUNS",
+                        help="Show issue trends over the last RUNS reports (default 20) "
+                             "instead of linting")
+    parser.add_argument("--output", choices=("charts", "text", "html"), default="charts",
+                        help="charts (default), text only, or an HTML summary; "
+                             "text and html never load the plotting libraries")
     args = parser.parse_args()
 
+    if args.trends is not None:
+        show_trends(args.trends)
+        return
+
     try:
-        report_path = run_flake8(args.path)
-        error_counts, file_errors = parse_flake8_report(report_path)
+        report_path, stats = run_flake8_incremental(args.path, jobs=args.jobs,
+                                                    use_cache=not args.no_cache)
+        summary = summarize_flake8_report(report_path)
     except FileNotFoundError:
         print(f"❌ The path '{args.path}' does not exist.")
         sys.exit(1)
@@ -26,16 +46,62 @@ def main() -> None:
         print(f"⚠️ An error occurred: {e}")
         sys.exit(2)
 
-    print("\n📌 Error Summary by Code:")
-    for code, count in sorted(error_counts.items(), key=lambda x: -x[1]):
-        print(f"{code}: {count} occurrences")
+    print(f"⚡ {stats.files} files, {stats.linted} linted, {stats.cached} from cache "
+          f"(hit rate {stats.hit_rate:.0%}) in {stats.wall_time:.2f}s, "
+          f"~{stats.saved_time:.2f}s saved")
+
+    # A broken index must never fail the lint run itself.
+    try:
+        with TrendIndex() as index:
+            index.record(report_path, summary, files_scanned=stats.files)
+    except sqlite3.Error as e:
+        logging.warning(f"Could not update the trend index: {e}")
+
+    print()
+    print(text_summary(summary.error_counts, summary.file_counts))
+
+    if args.output == "html":
+        html_path = write_html_summary(summary.error_counts, summary.file_counts)
+        print(f"\n📝 HTML summary written to {html_path}")
+    elif args.output == "charts":
+        statuses = plot_report_charts(summary.error_counts, summary.file_counts)
+        for name, status in statuses.items():
+            print(f"📊 {name}: {status}")
+
+
+def show_trends(limit: int) -> None:
+
+    """
+    Print total issues per run for the last limit runs, and which error
+    codes changed most between the first and last of them. Reports not
+    yet in the trend index are indexed first; the rest are not re-read.
+    """
+    with TrendIndex() as index:
+        index.backfill(list_flake8_reports())
+        runs = index.runs(limit)
+        if not runs:
+            print("No flake8 reports found.")
+            return
 
-    print("\n📁 Top Files with Most Errors:")
-    for file, codes in sorted(file_errors.items(), key=lambda x: -len(x[1]))[:10]:
-        print(f"{file}: {len(codes)} issues")
+        print(f"\n📈 Issues over the last {len(runs)} runs:")
+        previous = None
+        for run in runs:
+            change = "" if previous is None else f" ({run.total - previous:+d})"
+            print(f"{run.run_at:%Y-%m-%d %H:%M:%S}  {run.total:6d} issues{change}  "
+                  f"in {run.files_with_issues} files")
+            previous = run.total
 
-    plot_error_code_chart(error_counts)
-    plot_top_files_chart(file_errors)
+        if len(runs) > 1:
+            first = index.code_counts(runs[0].report)
+            last = index.code_counts(runs[-1].report)
+            changes = {code: last.get(code, 0) - first.get(code, 0)
+                       for code in first.keys() | last.keys()}
+            moved = sorted((item for item in changes.items() if item[1]),
+                           key=lambda x: (-abs(x[1]), x[0]))[:10]
+            if moved:
+                print("\n🔀 Biggest changes by code:")
+                for code, change in moved:
+                    print(f"{code}: {first.get(code, 0)} -> {last.get(code, 0)} ({change:+d})")
 
 
 if __name__ == "__main__":
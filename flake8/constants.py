@@ -4,3 +4,37 @@ from pathlib import Path
 # --- Constants for directories ---
 FLAKE8_REPORTS_DIR = Path("flake8_reports")
 FLAKE8_GRAPHS_DIR = Path("flake8_graphs")
+
+# --- Incremental runner ---
+# Per-file results cache, keyed by file content hash.
+FLAKE8_CACHE_FILE = FLAKE8_REPORTS_DIR / ".flake8_cache.json"
+# Command used to lint a shard of files (paths are appended).
+FLAKE8_COMMAND = ["flake8"]
+# Config files whose contents change flake8's results; part of the cache key.
+# flake8 itself uses the first of these (in its order: setup.cfg, tox.ini,
+# .flake8) with a [flake8] section, searching up from the working directory.
+FLAKE8_CONFIG_FILES = (".flake8", "setup.cfg", "tox.ini")
+FLAKE8_CONFIG_SEARCH_ORDER = ("setup.cfg", "tox.ini", ".flake8")
+# Paths not linted when the config sets no `exclude` (flake8's own default
+# excludes, plus virtualenvs); `extend-exclude` adds to these.
+FLAKE8_DEFAULT_EXCLUDE = (".svn", "CVS", ".bzr", ".hg", ".git", "__pycache__",
+                          ".tox", ".nox", ".eggs", "*.egg", ".venv", "venv", "env")
+
+# One flake8 output line: path:row:col: CODE message. The path is matched
+# lazily up to the first ":<digits>:<digits>: ", so Windows drive letters
+# (C:\...) and colons inside paths are kept intact.
+FLAKE8_LINE_PATTERN = r"^(?P<path>.+?):(?P<row>\d+):(?P<col>\d+): (?P<code>\S+)\s?(?P<message>.*)$"
+
+# --- Reports and the trend index ---
+# Report files are named flake8-report_<timestamp>.txt.
+FLAKE8_REPORT_PREFIX = "flake8-report_"
+FLAKE8_REPORT_GLOB = f"{FLAKE8_REPORT_PREFIX}*.txt"
+FLAKE8_REPORT_TIMESTAMP_FORMAT = "%Y-%m-%d_%H-%M-%S"
+# Append-only SQLite index of per-run aggregates, for trends over many runs.
+FLAKE8_TREND_INDEX = FLAKE8_REPORTS_DIR / "flake8_trends.sqlite3"
+
+# --- Charts ---
+FLAKE8_CHART_FORMATS = ("png", "pdf", "svg")
+FLAKE8_CHART_DPI = 300
+# Hash of each chart's input data at its last render; unchanged charts are skipped.
+FLAKE8_RENDER_CACHE = FLAKE8_GRAPHS_DIR / ".render_cache.json"
@@ -7,50 +7,299 @@ Chosen because more robust and cross-platform than plain strings.
 logger is the custom logging function used in place of print statements for more
 robust and informative debugging.
 FLAKE8_REPORTS_DIR is a pre-defined constant imported to avoid usage of hard-coded
-strings."""
+strings.
 
+The run is incremental and parallel:
+- the files to lint are sharded across a pool of flake8 processes,
+- each file's results are cached under a hash of its contents (plus the
+  flake8 version and config), so unchanged files are not linted again,
+- results are merged into one report in a stable order (sorted by path,
+  then flake8's own line order), whatever order the shards finish in."""
+
+import configparser
+import fnmatch
+import hashlib
+import json
+import logging
+import os
+import re
 import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from constants import FLAKE8_REPORTS_DIR
+from constants import (FLAKE8_CACHE_FILE, FLAKE8_COMMAND, FLAKE8_CONFIG_FILES,
+                       FLAKE8_CONFIG_SEARCH_ORDER, FLAKE8_DEFAULT_EXCLUDE,
+                       FLAKE8_LINE_PATTERN, FLAKE8_REPORT_PREFIX,
+                       FLAKE8_REPORT_TIMESTAMP_FORMAT, FLAKE8_REPORTS_DIR)
+
+logger = logging.getLogger(__name__)
+
+LINE_RE = re.compile(FLAKE8_LINE_PATTERN)
+CACHE_VERSION = 1
+MIN_SHARD_FILES = 25
+
+
+@dataclass
+class RunStats:
+    files: int = 0
+    cached: int = 0
+    linted: int = 0
+    wall_time: float = 0.0  # seconds this run took
+    saved_time: float = 0.0  # estimated seconds the cache hits would have cost
+
+    @property
+    def hit_rate(self) -> float:
+        return self.cached / self.files if self.files else 0.0
+
+
+# --- Finding files and fingerprinting them ---
+
+def find_config() -> Path | None:
+    """The config file flake8 would read when run from here."""
+    directory = Path.cwd()
+    while True:
+        for name in FLAKE8_CONFIG_SEARCH_ORDER:
+            config = configparser.RawConfigParser()
+            try:
+                config.read(directory / name, encoding="utf-8")
+            except (UnicodeDecodeError, configparser.Error):
+                continue
+            if config.has_section("flake8"):
+                return directory / name
+        if directory.parent == directory:
+            return None
+        directory = directory.parent
+
+
+def exclude_patterns() -> list[str]:
+    """flake8's exclude patterns: the config's `exclude` (or the defaults)
+    plus its `extend-exclude`. Patterns containing a path separator are
+    made absolute relative to the config file, as flake8 does."""
+    config_path = find_config()
+    config = configparser.RawConfigParser()
+    if config_path is not None:
+        config.read(config_path, encoding="utf-8")
+
+    def option(name: str) -> list[str] | None:
+        for key in (name, name.replace("-", "_")):
+            if config.has_option("flake8", key):
+                return [p for p in re.split(r"[,\s]+", config.get("flake8", key)) if p]
+        return None
+
+    patterns = option("exclude")
+    if patterns is None:
+        patterns = list(FLAKE8_DEFAULT_EXCLUDE)
+    patterns += option("extend-exclude") or []
+    parent = config_path.parent if config_path is not None else Path.cwd()
+    separators = os.sep + (os.altsep or "")
+    return [os.path.abspath(parent / p) if p == "." or any(c in p for c in separators)
+            else p.rstrip(separators) for p in patterns]
+
+
+def _is_excluded(path: str, patterns: list[str]) -> bool:
+    # flake8's matching: the base name, then the absolute path.
+    name = os.path.basename(path)
+    if name not in {".", ".."} and any(fnmatch.fnmatch(name, p) for p in patterns):
+        return True
+    absolute = os.path.abspath(path)
+    return any(fnmatch.fnmatch(absolute, p) for p in patterns)
+
+
+def discover_python_files(path=".") -> list[Path]:
+    """Every .py file under path (or path itself), sorted, skipping what
+    flake8's exclude settings skip.
+
+    Files named on flake8's command line are linted even if excluded, so
+    the exclusion has to happen here rather than in flake8."""
+    root = Path(path)
+    if not root.exists():
+        raise FileNotFoundError(path)
+    patterns = exclude_patterns()
+    if _is_excluded(str(root), patterns):
+        return []
+    if root.is_file():
+        return [root]
+    files = []
+    for directory, subdirs, filenames in os.walk(root):
+        # Pruning in place stops os.walk descending into excluded directories.
+        subdirs[:] = [d for d in subdirs
+                      if not _is_excluded(os.path.join(directory, d), patterns)]
+        files.extend(Path(directory) / name for name in filenames
+                     if name.endswith(".py")
+                     and not _is_excluded(os.path.join(directory, name), patterns))
+    return sorted(files)
+
+
+def config_fingerprint(path=".") -> str:
+    """Changes whenever flake8's version or its config changes, which
+    invalidates every cached result."""
+    version = subprocess.run([*FLAKE8_COMMAND, "--version"], capture_output=True,
+                             text=True).stdout.strip()
+    digest = hashlib.sha256(version.encode("utf-8"))
+    base = Path(path) if Path(path).is_dir() else Path(path).parent
+    for directory in dict.fromkeys([Path("."), base]):
+        for name in FLAKE8_CONFIG_FILES:
+            config = directory / name
+            if config.is_file():
+                digest.update(name.encode("utf-8"))
+                digest.update(config.read_bytes())
+    return digest.hexdigest()
+
+
+def _file_hash(file: Path, stat: os.stat_result, cached: dict | None) -> str:
+    # Unchanged size and mtime: trust the cached hash instead of re-reading.
+    if cached and cached.get("mtime_ns") == stat.st_mtime_ns \
+            and cached.get("size") == stat.st_size:
+        return cached["sha256"]
+    return hashlib.sha256(file.read_bytes()).hexdigest()
+
+
+# --- The cache file ---
+
+def load_cache(fingerprint: str) -> dict:
+    try:
+        with FLAKE8_CACHE_FILE.open("r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    if cache.get("version") != CACHE_VERSION or cache.get("fingerprint") != fingerprint:
+        logger.info("flake8 or its config changed; ignoring the result cache")
+        return {}
+    return cache.get("files", {})
+
+
+def save_cache(fingerprint: str, files: dict) -> None:
+    # Written to a temporary file then renamed, so an interrupted run never
+    # leaves a half-written cache behind.
+    partial = FLAKE8_CACHE_FILE.with_suffix(".tmp")
+    with partial.open("w", encoding="utf-8") as f:
+        json.dump({"version": CACHE_VERSION, "fingerprint": fingerprint,
+                   "files": files}, f)
+    os.replace(partial, FLAKE8_CACHE_FILE)
+
+
+# --- Linting shards ---
+
+def lint_shard(files: list[str]) -> tuple[dict[str, list[str]] | None, float]:
+    """Run one flake8 process over files.
+
+    Returns ({file: output lines}, seconds), or (None, seconds) if flake8
+    itself failed, in which case nothing from this shard is cached."""
+    started = time.perf_counter()
+    # --jobs=1: the shards already run in parallel, so each flake8 process
+    # must not start its own pool on top.
+    # stdout holds the report lines and stderr any error messages, both as text.
+    result = subprocess.run([*FLAKE8_COMMAND, "--jobs=1", *files],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - started
+    # Return code 0 means no issues
+    # Return code 1 means linting issues (normal)
+    # Return 2 means there has been an internal/fatal error.
+    if result.returncode > 1:
+        logger.error(f"flake8 failed with exit code {result.returncode}: "
+                     f"{result.stderr.strip()}")
+        return None, elapsed
+    if result.stderr:
+        logger.warning(f"flake8 stderr: {result.stderr}")
+
+    lines: dict[str, list[str]] = {file: [] for file in files}
+    for line in result.stdout.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            lines.setdefault(match["path"], []).append(line)
+    return lines, elapsed
+
+
+def _shards(files: list[str], jobs: int) -> list[list[str]]:
+    # Every shard pays for a flake8 start-up, so shards get at least
+    # MIN_SHARD_FILES files; with enough files, a few shards per worker keeps
+    # every worker busy until the end.
+    wanted = -(-len(files) // MIN_SHARD_FILES)  # ceiling division
+    count = min(len(files), jobs * 4 if jobs > 1 else 1, max(jobs, wanted))
+    # Round-robin over the sorted list spreads big directories across shards.
+    return [files[i::count] for i in range(count)]
 
 
 # --- Run flake8 and create report, storing to specified directory ---
 
-# path argument is optional, with the default being "." which is the current
-# directory.
-def run_flake8(path=".") -> Path:
+def run_flake8_incremental(path=".", jobs: int | None = None,
+                           use_cache: bool = True) -> tuple[Path, RunStats]:
+    """Lint path and write a timestamped report. Returns (report path, stats)."""
+    started = time.perf_counter()
+    FLAKE8_REPORTS_DIR.mkdir(parents=True, exist_ok=True)
 
     # gets the current date and time
-    # this ensures that there is duplication of the generated files.
-    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    report_path = FLAKE8_REPORTS_DIR / f"flake8-report_{timestamp}.txt"
+    # this ensures that there is no duplication of the generated files.
+    timestamp = datetime.now().strftime(FLAKE8_REPORT_TIMESTAMP_FORMAT)
+    report_path = FLAKE8_REPORTS_DIR / f"{FLAKE8_REPORT_PREFIX}{timestamp}.txt"
 
     # Informational message to user to confirm that analysis being undertaken
     # with specified directory.
     logger.info(f"Running flake8 on path {path}...")
 
+    files = [str(file) for file in discover_python_files(path)]
+    fingerprint = config_fingerprint(path)
+    cache = load_cache(fingerprint) if use_cache else {}
+    stats = RunStats(files=len(files))
+
+    results: dict[str, list[str]] = {}
+    entries: dict[str, dict] = {}
+    to_lint = []
+    cached_seconds = 0.0
+    for file in files:
+        stat = os.stat(file)
+        cached = cache.get(file)
+        sha256 = _file_hash(Path(file), stat, cached)
+        entries[file] = {"sha256": sha256, "mtime_ns": stat.st_mtime_ns,
+                         "size": stat.st_size}
+        if cached and cached.get("sha256") == sha256:
+            results[file] = cached["lines"]
+            entries[file].update(lines=cached["lines"], seconds=cached.get("seconds", 0.0))
+            stats.cached += 1
+            cached_seconds += cached.get("seconds", 0.0)
+        else:
+            to_lint.append(file)
+
+    jobs = jobs or os.cpu_count() or 1
+    shards = _shards(to_lint, jobs)
+    with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="flake8") as executor:
+        for shard, (lines, elapsed) in zip(shards, executor.map(lint_shard, shards)):
+            if lines is None:
+                for file in shard:
+                    entries.pop(file, None)
+                continue
+            per_file = elapsed / len(shard)
+            for file in shard:
+                results[file] = lines.get(file, [])
+                entries[file].update(lines=results[file], seconds=per_file)
+    stats.linted = len(to_lint)
+    # Per-file seconds are flake8 process time; spread over the workers,
+    # that is roughly the wall time the cache hits saved.
+    stats.saved_time = cached_seconds / jobs
+
     # Open report file in write mode, with ensures the file is closed properly.
     with report_path.open("w", encoding="utf-8") as f:
+        for file in files:
+            for line in results.get(file, []):
+                f.write(line + "\n")
 
-        """flake8 command is ran as a subprocess, targeting the specified path.
-        Entirety of this block runs the actual linting."""
-        result = subprocess.run(["flake8", path],
-                                stdout=f, # sends output to the report file
-                                stderr=subprocess.PIPE, # capture error messages
-                                text=True) # ensure the output is treated as text.
-    # Checks if there is a severe error with the linting.
-    # Return code 0 means no issues
-    # Return code 1 means linting issues (normal)
-    # Return 2 means there has been an internal/fatal error.
-    if result.returncode > 1:
-        # logs error message if flake8 crashed or returned unexpected status.
-        logger.error(f"flake8 failed with exit code {result.returncode}")
-    elif result.stderr:
-        logger.warning(f"flake8 stderr: {result.stderr}")
-        # If stderr has any output but the return code is acceptable
-        # (likely 1), this line catches and logs it.
-    else:
-        logger.info(f"✅ Flake8 report saved to: {report_path}")
-        # If no errors generated, then document success.
+    if use_cache:
+        # Only files seen this run are kept, so deleted files drop out.
+        save_cache(fingerprint, {file: entry for file, entry in entries.items()
+                                 if "lines" in entry})
+
+    stats.wall_time = time.perf_counter() - started
+    logger.info(f"✅ Flake8 report saved to: {report_path} "
+                f"({stats.files} files, {stats.cached} cached, "
+                f"hit rate {stats.hit_rate:.0%}, {stats.wall_time:.2f}s, "
+                f"~{stats.saved_time:.2f}s saved)")
+    return report_path, stats
+
+
+# path argument is optional, with the default being "." which is the current
+# directory.
+def run_flake8(path=".", jobs: int | None = None, use_cache: bool = True) -> Path:
+    report_path, _ = run_flake8_incremental(path, jobs=jobs, use_cache=use_cache)
     return report_path
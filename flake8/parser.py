@@ -1,29 +1,49 @@
-"""Import defaultdict, as it is useful for sorting and grouping."""
-from collections import defaultdict
 
+"""Counter is used to tally error codes and issues per file; re is used to
+match flake8 output lines.
 
-# This functions parses the flake8 report located in file_path argument
-def parse_flake8_report(file_path):
+The report is read one line at a time and only counts are kept (never the
+individual issues), so memory stays flat however large the report is.
+Lines are matched with FLAKE8_LINE_PATTERN rather than split on ":", so
+Windows paths such as C:\\project\\app.py are parsed correctly."""
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Iterable
+from constants import FLAKE8_LINE_PATTERN
 
-    # dictionary to count how many times Flake8 errors occur.
-    # defaultdict(int) is used to ensure both dictionaries
-    # start with a default value of 0.
-    error_counts = defaultdict(int)
-    file_errors = defaultdict(list)
+LINE_RE = re.compile(FLAKE8_LINE_PATTERN)
 
+
+@dataclass
+class ReportSummary:
+    error_counts: Counter = field(default_factory=Counter)  # code -> issues
+    file_counts: Counter = field(default_factory=Counter)  # file -> issues
+    total: int = 0
+    skipped: int = 0  # lines that were not flake8 output
+
+    def add_lines(self, lines: Iterable[str]) -> "ReportSummary":
+        for line in lines:
+            match = LINE_RE.match(line.rstrip("\r\n"))
+            # no match means it is not a valid Flake8 output line.
+            if match is None:
+                if line.strip():
+                    self.skipped += 1
+                continue
+            self.error_counts[match["code"]] += 1
+            self.file_counts[match["path"].strip()] += 1
+            self.total += 1
+        return self
+
+
+def summarize_flake8_report(file_path) -> ReportSummary:
+    # Iterating the file object reads it line by line.
     with open(file_path, "r", encoding="utf-8") as f:
-        for line in f:
-                parts = line.split(":")
-                # if len is less than 4 then it is not a valid Flake8 output.
-                if len(parts) < 4:
-                    continue
-                # filename is derived from first part of the file.
-                # any whitespace is removed with .strip()
-                filename = parts[0].strip()
-                code_message = parts[3].strip()
-                # extract ONLY the error message from the string.
-                code = code_message.split()[0] if code_message else ""
-
-                error_counts[code] += 1 # increment error_count by 1
-                file_errors[filename].append(code)
-    return error_counts, file_errors
\ No newline at end of file
+        return ReportSummary().add_lines(f)
+
+
+# This functions parses the flake8 report located in file_path argument.
+# Returns (issues per error code, issues per file).
+def parse_flake8_report(file_path) -> tuple[Counter, Counter]:
+    summary = summarize_flake8_report(file_path)
+    return summary.error_counts, summary.file_counts
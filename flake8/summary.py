@@ -0,0 +1,76 @@
+"""Text and HTML summaries of a flake8 report.
+
+Numbers only: nothing here imports matplotlib or seaborn, so a summary is
+cheap to produce in CI or anywhere the charts are not wanted."""
+
+import html
+from pathlib import Path
+from constants import FLAKE8_GRAPHS_DIR
+
+TOP_FILES = 10
+
+
+def text_summary(error_counts: dict, file_counts: dict, top: int = TOP_FILES) -> str:
+    lines = ["📌 Error Summary by Code:"]
+    for code, count in sorted(error_counts.items(), key=lambda x: (-x[1], x[0])):
+        lines.append(f"{code}: {count} occurrences")
+    lines.append("")
+    lines.append("📁 Top Files with Most Errors:")
+    for file, count in sorted(file_counts.items(), key=lambda x: (-x[1], x[0]))[:top]:
+        lines.append(f"{file}: {count} issues")
+    return "\n".join(lines)
+
+
+def _bar_rows(items) -> str:
+    # Bars are plain CSS widths relative to the largest count.
+    largest = max((count for _, count in items), default=0) or 1
+    return "\n".join(
+        f"<tr><td>{html.escape(str(label))}</td><td class=\"n\">{count}</td>"
+        f"<td><div class=\"bar\" style=\"width:{100 * count / largest:.1f}%\"></div></td></tr>"
+        for label, count in items)
+
+
+def html_summary(error_counts: dict, file_counts: dict, top: int = TOP_FILES,
+                 title: str = "Flake8 report") -> str:
+    total = sum(error_counts.values())
+    codes = sorted(error_counts.items(), key=lambda x: (-x[1], x[0]))
+    files = sorted(file_counts.items(), key=lambda x: (-x[1], x[0]))[:top]
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{html.escape(title)}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; margin-bottom: 2em; }}
+td, th {{ padding: 2px 8px; text-align: left; }}
+td.n {{ text-align: right; }}
+td:last-child {{ width: 300px; }}
+.bar {{ background: skyblue; height: 0.9em; }}
+</style>
+</head>
+<body>
+<h1>{html.escape(title)}</h1>
+<p>{total} issues in {len(file_counts)} files.</p>
+<h2>Issues by code</h2>
+<table>
+<tr><th>Code</th><th>Issues</th><th></th></tr>
+{_bar_rows(codes)}
+</table>
+<h2>Top {len(files)} files</h2>
+<table>
+<tr><th>File</th><th>Issues</th><th></th></tr>
+{_bar_rows(files)}
+</table>
+</body>
+</html>
+"""
+
+
+def write_html_summary(error_counts: dict, file_counts: dict,
+                       output_dir: Path = FLAKE8_GRAPHS_DIR,
+                       name: str = "flake8_summary.html") -> Path:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / name
+    path.write_text(html_summary(error_counts, file_counts), encoding="utf-8")
+    return path
@@ -0,0 +1,123 @@
+
+"""sqlite3 (standard library) stores the index in one small file; no server.
+
+The trend index keeps one row of aggregates per flake8 run (total issues,
+files with issues, issues per error code), so trends across hundreds of
+runs are read from the index instead of re-parsing every report.
+Rows are only ever added: a report already in the index is skipped, so
+indexing the same reports again is harmless."""
+
+import logging
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable
+from constants import FLAKE8_TREND_INDEX
+from parser import ReportSummary, summarize_flake8_report
+from utils import report_timestamp
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    report TEXT NOT NULL UNIQUE,
+    run_at TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    files_with_issues INTEGER NOT NULL,
+    files_scanned INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_run_at ON runs (run_at);
+CREATE TABLE IF NOT EXISTS run_codes (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    code TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (run_id, code)
+) WITHOUT ROWID;
+"""
+
+
+@dataclass(frozen=True)
+class RunRecord:
+    report: str  # report file name
+    run_at: datetime
+    total: int
+    files_with_issues: int
+    files_scanned: int | None  # None for runs indexed from an old report
+
+
+class TrendIndex:
+
+    """Append-only per-run aggregates in an SQLite file."""
+
+    def __init__(self, path: Path | str = FLAKE8_TREND_INDEX):
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        self._conn.executescript(SCHEMA)
+
+    def __enter__(self) -> "TrendIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def indexed_reports(self) -> set[str]:
+        return {row[0] for row in self._conn.execute("SELECT report FROM runs")}
+
+    def record(self, report: Path, summary: ReportSummary,
+               run_at: datetime | None = None,
+               files_scanned: int | None = None) -> bool:
+        """Add one run. Returns False if this report was already indexed."""
+        report = Path(report)
+        run_at = run_at or report_timestamp(report)
+        with self._conn:  # one transaction: the run and its codes, or neither
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO runs (report, run_at, total, files_with_issues, "
+                "files_scanned) VALUES (?, ?, ?, ?, ?)",
+                (report.name, run_at.isoformat(sep=" "), summary.total,
+                 len(summary.file_counts), files_scanned))
+            if cursor.rowcount == 0:
+                return False
+            self._conn.executemany(
+                "INSERT INTO run_codes (run_id, code, count) VALUES (?, ?, ?)",
+                ((cursor.lastrowid, code, count)
+                 for code, count in summary.error_counts.items()))
+        return True
+
+    def backfill(self, reports: Iterable[Path]) -> int:
+        """Index every report not already in the index; returns how many
+        were added. Only those reports are parsed."""
+        indexed = self.indexed_reports()
+        added = 0
+        for report in reports:
+            if report.name in indexed:
+                continue
+            try:
+                summary = summarize_flake8_report(report)
+            except (OSError, UnicodeDecodeError) as e:
+                logger.warning(f"Skipping unreadable report {report}: {e}")
+                continue
+            added += self.record(report, summary)
+        if added:
+            logger.info(f"Indexed {added} flake8 reports")
+        return added
+
+    def runs(self, limit: int | None = None) -> list[RunRecord]:
+        """The most recent runs (all if limit is None), oldest first."""
+        rows = self._conn.execute(
+            "SELECT report, run_at, total, files_with_issues, files_scanned "
+            "FROM runs ORDER BY run_at DESC, id DESC LIMIT ?",
+            (-1 if limit is None else limit,)).fetchall()
+        return [RunRecord(report, datetime.fromisoformat(run_at), total, files, scanned)
+                for report, run_at, total, files, scanned in reversed(rows)]
+
+    def code_counts(self, report: str) -> dict[str, int]:
+        """Issues per error code for one indexed run."""
+        return dict(self._conn.execute(
+            "SELECT code, count FROM run_codes JOIN runs ON runs.id = run_codes.run_id "
+            "WHERE runs.report = ?", (report,)))
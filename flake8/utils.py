@@ -1,11 +1,28 @@
+from datetime import datetime
 from pathlib import Path
-from constants import FLAKE8_REPORTS_DIR
+from constants import (FLAKE8_REPORT_GLOB, FLAKE8_REPORT_PREFIX,
+                       FLAKE8_REPORT_TIMESTAMP_FORMAT, FLAKE8_REPORTS_DIR)
+
+
+def list_flake8_reports(reports_dir: Path | None = None) -> list[Path]:
+    """Every report in reports_dir, oldest first."""
+    reports_dir = FLAKE8_REPORTS_DIR if reports_dir is None else reports_dir
+    return sorted(reports_dir.glob(FLAKE8_REPORT_GLOB), key=report_timestamp)
+
+
+def report_timestamp(report: Path) -> datetime:
+    """When the report was written, from its name (or its mtime if the name
+    carries no timestamp)."""
+    stamp = report.stem[len(FLAKE8_REPORT_PREFIX):]
+    try:
+        return datetime.strptime(stamp, FLAKE8_REPORT_TIMESTAMP_FORMAT)
+    except ValueError:
+        return datetime.fromtimestamp(report.stat().st_mtime)
 
 
 def get_latest_flake8_report() -> Path | None:
 
-    files = list(FLAKE8_REPORTS_DIR.glob("flake8_report_*.txt"))
+    files = list(FLAKE8_REPORTS_DIR.glob(FLAKE8_REPORT_GLOB))
     if not files:
         return None
     return max(files, key=lambda f: f.stat().st_mtime)
-
@@ -1,47 +1,48 @@
-import matplotlib.pyplot as plt
+"""Charts of a flake8 report, rendered off the main process.
+
+Each chart is first reduced to a ChartSpec (plain labels and values), then
+drawn in a process pool with matplotlib's non-interactive Agg backend, one
+figure per worker. A chart is skipped when the hash of its spec (and the
+output formats and dpi) matches its previous render and the files still
+exist, so re-running on unchanged counts costs nothing.
+
+matplotlib (and seaborn, if installed) is only imported inside the
+workers, or when a chart is shown interactively; summary.py covers the
+numbers-only case without either.
+"""
+import hashlib
+import json
+import logging
+import os
 import textwrap
-import seaborn as sns
-from constants import FLAKE8_GRAPHS_DIR
-from logger_setup import setup_logger
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
 from datetime import datetime
 from pathlib import Path
+from constants import (FLAKE8_CHART_DPI, FLAKE8_CHART_FORMATS, FLAKE8_GRAPHS_DIR,
+                       FLAKE8_RENDER_CACHE)
 
 
-sns.set_theme(style="whitegrid")
-logger = setup_logger()
-
-
-def save_plot(name: str,
-              output_dir: Path = FLAKE8_GRAPHS_DIR,
-              formats: list = None,
-              add_timestamp: bool = False):
-
-    """
-    Saves the current Matplotlib figure in multiple formats.
-
-    Parameters:
-        name (str): Base name of the file (no extension).
-        output_dir (Path): Output directory (default: FLAKE8_GRAPHS_DIR).
-        formats (list): List of file extensions to save (e.g., ['png', 'svg']).
-        add_timestamp (bool): Whether to append a timestamp to the filename.
-    """
-    output_dir.mkdir(parents=True, exist_ok=True)
-    if formats is None:
-        formats = ['png', 'pdf', 'svg']
+logger = logging.getLogger(__name__)
 
-    if add_timestamp:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        name = f"{name}_{timestamp}"
+RENDERED, CACHED, FAILED = "rendered", "cached", "failed"
 
 
-    for ext in formats:
-        filename = output_dir / f"{name}.{ext}"
-        try:
-            plt.savefig(filename, dpi=300)
-            logger.info(f"Saved plot: {filename}")
-        except Exception as e:
-            logger.error(f"Failed to save plot '{filename}': {e}")
+@dataclass(frozen=True)
+class ChartSpec:
+    name: str  # output file name, without extension
+    kind: str  # "bar" or "barh"
+    labels: tuple
+    values: tuple
+    title: str
+    xlabel: str = ""
+    ylabel: str = ""
+    color: str = "skyblue"
+    figsize: tuple = (10, 6)
 
+    def digest(self, formats, dpi) -> str:
+        payload = json.dumps([asdict(self), list(formats), dpi], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
 
 def wrap_labels(labels, width=40):
@@ -49,19 +50,18 @@ def wrap_labels(labels, width=40):
     return ['\n'.join(textwrap.wrap(label, width)) for label in labels]
 
 
-def plot_error_code_chart(error_counts: dict, show: bool = False,
-                          filter_codes: set = None):
-    """
-    Plots a bar chart showing the frequency of each Flake8 error code.
+# --- Chart data (no plotting) ---
+
+def error_code_chart(error_counts: dict, filter_codes: set = None) -> ChartSpec | None:
+    """Spec for a bar chart of how often each Flake8 error code occurs.
 
     Parameters:
         error_counts (dict): Mapping of error codes to their occurrence counts.
-        show (bool): If True, displays the plot interactively.
         filter_codes (set or None): Optional set of error codes to include.
     """
     if not error_counts:
         logger.warning("No error counts to plot.")
-        return
+        return None
 
     # Apply filtering if specified
     filtered = {code: count for code, count in error_counts.items()
@@ -69,76 +69,222 @@ def plot_error_code_chart(error_counts: dict, show: bool = False,
 
     if not filtered:
         logger.warning("No error counts match the filter criteria.")
-        return
-
-    try:
-        codes, counts = zip(*sorted(filtered.items()))
-
-        plt.figure(figsize=(10, 6))
-        plt.bar(codes, counts, color='skyblue')
-        plt.xlabel("Error Code")
-        plt.ylabel("Occurrences")
-        plt.title("Flake8 Error Code Frequency")
-        plt.xticks(rotation=45)
-        plt.tight_layout()
+        return None
 
-        save_plot("flake8_error_codes")
+    codes, counts = zip(*sorted(filtered.items()))
+    return ChartSpec("flake8_error_codes", "bar", codes, counts,
+                     "Flake8 Error Code Frequency", "Error Code", "Occurrences")
 
-        if show:
-            plt.show()
-        plt.close()
-    except Exception as e:
-        logger.error(f"Failed to plot error codes: {e}")
 
-def plot_top_files_chart(file_errors: dict, show: bool = False,
-                         filter_files: set = None, min_issues: int = 1):
-    """
-    Plots a horizontal bar chart of the top 10 files with the most Flake8 issues.
+def top_files_chart(file_counts: dict, filter_files: set = None,
+                    min_issues: int = 1) -> ChartSpec | None:
+    """Spec for a horizontal bar chart of the top 10 files with the most issues.
 
     Parameters:
-        file_errors (dict): Mapping of file names to lists of error messages.
-        show (bool): If True, displays the plot interactively.
+        file_counts (dict): Mapping of file names to their number of issues.
         filter_files (set or None): Optional set of filenames to include.
         min_issues (int): Minimum number of issues a file must have to be included.
     """
-    if not file_errors:
+    if not file_counts:
         logger.warning("No data to plot for top files.")
-        return
+        return None
 
     # Filter files by name and issue count
     filtered = {
-        f: errs for f, errs in file_errors.items()
-        if (filter_files is None or f in filter_files) and len(errs) >= min_issues
+        f: count for f, count in file_counts.items()
+        if (filter_files is None or f in filter_files) and count >= min_issues
     }
 
     if not filtered:
         logger.warning("No files meet the filter criteria.")
-        return
+        return None
 
-    sorted_data = sorted(
-        ((f, len(errs)) for f, errs in filtered.items()),
-        key=lambda x: -x[1]
-    )[:10]
+    # Ties are broken by name so the same counts always give the same chart.
+    top = sorted(filtered.items(), key=lambda x: (-x[1], x[0]))[:10]
+    top_files, top_counts = zip(*top)
+    return ChartSpec("flake8_top_files", "barh", tuple(wrap_labels(top_files, width=50)),
+                     top_counts, "Top 10 Files with Most Flake8 Issues",
+                     "Number of Issues", color="salmon", figsize=(12, 6))
 
-    if not sorted_data:
-        logger.warning("No data to plot for top files after sorting.")
-        return
 
+# --- Drawing (worker side) ---
+
+def _pyplot(interactive: bool = False):
+    import matplotlib
+    if not interactive:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
     try:
-        top_files, top_counts = zip(*sorted_data)
-        wrapped_files = wrap_labels(top_files, width=50)
-
-        plt.figure(figsize=(12, 6))
-        plt.barh(wrapped_files, top_counts, color='salmon')
-        plt.title("Top 10 Files with Most Flake8 Issues")
-        plt.xlabel("Number of Issues")
-        plt.gca().invert_yaxis()
-        plt.tight_layout()
-
-        save_plot("flake8_top_files")
-
-        if show:
-            plt.show()
-        plt.close()
-    except Exception as e:
-        logger.error(f"Failed to plot top files chart: {e}")
+        import seaborn as sns
+        sns.set_theme(style="whitegrid")
+    except ImportError:
+        plt.style.use("fast")
+    return plt
+
+
+def _draw(plt, spec: ChartSpec):
+    figure = plt.figure(figsize=spec.figsize)
+    axes = figure.gca()
+    if spec.kind == "barh":
+        axes.barh(spec.labels, spec.values, color=spec.color)
+        axes.invert_yaxis()
+    else:
+        axes.bar(spec.labels, spec.values, color=spec.color)
+        axes.tick_params(axis="x", labelrotation=45)
+    axes.set_title(spec.title)
+    axes.set_xlabel(spec.xlabel)
+    axes.set_ylabel(spec.ylabel)
+    figure.tight_layout()
+    return figure
+
+
+def _render(spec: ChartSpec, output_dir: str, formats: tuple, dpi: int) -> list[str]:
+    # Runs in a worker process: one figure, saved in every format.
+    plt = _pyplot()
+    figure = _draw(plt, spec)
+    paths = []
+    try:
+        for ext in formats:
+            path = os.path.join(output_dir, f"{spec.name}.{ext}")
+            figure.savefig(path, dpi=dpi)
+            paths.append(path)
+    finally:
+        plt.close(figure)
+    return paths
+
+
+# --- Render cache ---
+
+def _load_render_cache() -> dict:
+    try:
+        with FLAKE8_RENDER_CACHE.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_render_cache(cache: dict) -> None:
+    FLAKE8_RENDER_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    partial = FLAKE8_RENDER_CACHE.with_suffix(".tmp")
+    with partial.open("w", encoding="utf-8") as f:
+        json.dump(cache, f)
+    os.replace(partial, FLAKE8_RENDER_CACHE)
+
+
+def render_charts(specs, output_dir: Path = FLAKE8_GRAPHS_DIR,
+                  formats: tuple = FLAKE8_CHART_FORMATS, dpi: int = FLAKE8_CHART_DPI,
+                  max_workers: int | None = None, force: bool = False) -> dict[str, str]:
+    """Render every spec (None entries are ignored) in parallel, skipping
+    charts whose data has not changed. Returns {chart name: status}."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    cache = _load_render_cache()
+    key = str(output_dir.resolve())
+    previous = cache.get(key, {})
+
+    statuses: dict[str, str] = {}
+    todo = []
+    for spec in filter(None, specs):
+        digest = spec.digest(formats, dpi)
+        outputs_exist = all((output_dir / f"{spec.name}.{ext}").exists() for ext in formats)
+        if not force and previous.get(spec.name) == digest and outputs_exist:
+            logger.info(f"Chart {spec.name} unchanged; skipping render")
+            statuses[spec.name] = CACHED
+        else:
+            todo.append((spec, digest))
+
+    if todo:
+        workers = max_workers or min(len(todo), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [(spec, digest,
+                        executor.submit(_render, spec, str(output_dir), tuple(formats), dpi))
+                       for spec, digest in todo]
+            for spec, digest, future in futures:
+                try:
+                    for path in future.result():
+                        logger.info(f"Saved plot: {path}")
+                except Exception as e:
+                    logger.error(f"Failed to render chart '{spec.name}': {e}")
+                    previous.pop(spec.name, None)
+                    statuses[spec.name] = FAILED
+                    continue
+                previous[spec.name] = digest
+                statuses[spec.name] = RENDERED
+        cache[key] = previous
+        _save_render_cache(cache)
+    return statuses
+
+
+def show_charts(specs) -> None:
+    """Display the charts interactively in this process."""
+    specs = [spec for spec in specs if spec is not None]
+    if not specs:
+        return
+    plt = _pyplot(interactive=True)
+    for spec in specs:
+        _draw(plt, spec)
+    plt.show()
+    plt.close("all")
+
+
+# --- Previous entry points ---
+
+def save_plot(name: str,
+              output_dir: Path = FLAKE8_GRAPHS_DIR,
+              formats: list = None,
+              add_timestamp: bool = False):
+
+    """
+    Saves the current Matplotlib figure in multiple formats.
+
+    Parameters:
+        name (str): Base name of the file (no extension).
+        output_dir (Path): Output directory (default: FLAKE8_GRAPHS_DIR).
+        formats (list): List of file extensions to save (e.g., ['png', 'svg']).
+        add_timestamp (bool): Whether to append a timestamp to the filename.
+    """
+    import matplotlib.pyplot as plt
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if formats is None:
+        formats = list(FLAKE8_CHART_FORMATS)
+
+    if add_timestamp:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        name = f"{name}_{timestamp}"
+
+    for ext in formats:
+        filename = output_dir / f"{name}.{ext}"
+        try:
+            plt.savefig(filename, dpi=FLAKE8_CHART_DPI)
+            logger.info(f"Saved plot: {filename}")
+        except Exception as e:
+            logger.error(f"Failed to save plot '{filename}': {e}")
+
+
+def plot_error_code_chart(error_counts: dict, show: bool = False,
+                          filter_codes: set = None):
+    """Render the error code chart (see error_code_chart)."""
+    spec = error_code_chart(error_counts, filter_codes)
+    render_charts([spec])
+    if show:
+        show_charts([spec])
+
+
+def plot_top_files_chart(file_counts: dict, show: bool = False,
+                         filter_files: set = None, min_issues: int = 1):
+    """Render the top files chart (see top_files_chart)."""
+    spec = top_files_chart(file_counts, filter_files, min_issues)
+    render_charts([spec])
+    if show:
+        show_charts([spec])
+
+
+def plot_report_charts(error_counts: dict, file_counts: dict,
+                       show: bool = False) -> dict[str, str]:
+    """Render both charts at once, one worker each."""
+    specs = [error_code_chart(error_counts), top_files_chart(file_counts)]
+    statuses = render_charts(specs)
+    if show:
+        show_charts(specs)
+    return statuses
@@ -0,0 +1,175 @@
+"""Vectorized currency conversion for pandas DataFrames.
+
+Importing this module registers a `fx` accessor on every DataFrame:
+
+    import fx_accessor  # noqa: F401  (registers df.fx)
+
+    out = df.fx.convert("amount", "from", "to", out_col="converted")
+
+Instead of calling convert_currency() once per row (df.apply), the rows
+are grouped by currency pair, each distinct pair's rate is resolved once
+(concurrently, through the same rate source get_exchange_rate() uses),
+and the amounts are multiplied by a rate array in one vectorized step.
+Rows whose rate cannot be resolved, or whose amount is not a positive
+number, get NaN.
+
+For data too large for one pass, convert_chunks() converts an iterable of
+DataFrames (e.g. pd.read_csv(..., chunksize=...)) and resolves each pair
+only once across all chunks; convert(chunksize=...) does the same over
+slices of one DataFrame, writing each slice's results straight into the
+output columns so only one slice's intermediates exist at a time.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+RateLookup = Callable[[str, str], Optional[float]]
+
+
+def _default_lookup() -> RateLookup:
+    from currency_utils import get_exchange_rate
+    return get_exchange_rate
+
+
+def _max_workers() -> int:
+    from config import get_settings
+    return get_settings().http_pool_size
+
+
+def resolve_rates(pairs: Iterable[tuple[str, str]], get_rate: RateLookup,
+                  cache: dict[tuple[str, str], float], max_workers: int = 16) -> None:
+    """Fill cache with the rate for every pair not already in it (NaN if
+    unresolved). Lookups run concurrently.
+    """
+    missing = []
+    for pair in dict.fromkeys(pairs):
+        if pair in cache:
+            continue
+        if pair[0] == pair[1]:
+            cache[pair] = 1.0
+        else:
+            missing.append(pair)
+    if not missing:
+        return
+    with ThreadPoolExecutor(max_workers=max(min(max_workers, len(missing)), 1),
+                            thread_name_prefix="fx-rates") as executor:
+        rates = executor.map(lambda pair: get_rate(*pair), missing)
+        for pair, rate in zip(missing, rates):
+            cache[pair] = np.nan if rate is None else float(rate)
+
+
+def _row_rates(df: pd.DataFrame, from_col: str, to_col: str, get_rate: RateLookup,
+               cache: dict[tuple[str, str], float],
+               max_workers: int) -> tuple[np.ndarray, int, int]:
+    """Rate per row, plus the number of distinct and unresolved pairs."""
+    # Factorize each column first so only distinct values are normalised,
+    # then combine the two codes into one integer key per row.
+    from_index, from_values = pd.factorize(df[from_col], use_na_sentinel=False)
+    to_index, to_values = pd.factorize(df[to_col], use_na_sentinel=False)
+    from_codes = [str(value).strip().upper() for value in from_values]
+    to_codes = [str(value).strip().upper() for value in to_values]
+    pair_index, keys = pd.factorize(from_index * max(len(to_codes), 1) + to_index)
+    pairs = [(from_codes[key // len(to_codes)], to_codes[key % len(to_codes)])
+             for key in keys]
+
+    resolve_rates(pairs, get_rate, cache, max_workers)
+    pair_rates = np.array([cache[pair] for pair in pairs], dtype=float)
+    if not len(pair_rates):
+        return np.full(len(df), np.nan), 0, 0
+    return pair_rates.take(pair_index), len(pairs), int(np.isnan(pair_rates).sum())
+
+
+def _convert_values(df: pd.DataFrame, amount_col: str, from_col: str, to_col: str,
+                    get_rate: RateLookup, cache: dict[tuple[str, str], float],
+                    max_workers: int) -> tuple[np.ndarray, np.ndarray]:
+    """Converted amount and rate per row of df."""
+    rates, pair_count, unresolved = _row_rates(df, from_col, to_col, get_rate,
+                                               cache, max_workers)
+    amounts = pd.to_numeric(df[amount_col], errors="coerce").to_numpy(dtype=float)
+    amounts = np.where(amounts > 0, amounts, np.nan)
+    logger.info(f"Converted {len(df)} rows across {pair_count} currency pairs"
+                + (f" ({unresolved} pairs unresolved)" if unresolved else ""))
+    return amounts * rates, rates
+
+
+def _convert_frame(df: pd.DataFrame, amount_col: str, from_col: str, to_col: str,
+                   out_col: str, rate_col: Optional[str], get_rate: RateLookup,
+                   cache: dict[tuple[str, str], float], max_workers: int) -> pd.DataFrame:
+    converted, rates = _convert_values(df, amount_col, from_col, to_col, get_rate,
+                                       cache, max_workers)
+    out = df.copy()
+    out[out_col] = converted
+    if rate_col:
+        out[rate_col] = rates
+    return out
+
+
+def convert_chunks(chunks: Iterable[pd.DataFrame], amount_col: str, from_col: str,
+                   to_col: str, out_col: str = "converted",
+                   rate_col: Optional[str] = None,
+                   get_rate: Optional[RateLookup] = None,
+                   max_workers: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """Convert each DataFrame in chunks, resolving every pair only once."""
+    get_rate = get_rate or _default_lookup()
+    max_workers = max_workers or _max_workers()
+    cache: dict[tuple[str, str], float] = {}
+    for chunk in chunks:
+        yield _convert_frame(chunk, amount_col, from_col, to_col, out_col,
+                             rate_col, get_rate, cache, max_workers)
+
+
+@pd.api.extensions.register_dataframe_accessor("fx")
+class FxAccessor:
+
+    """df.fx: currency conversion over whole columns."""
+
+    def __init__(self, df: pd.DataFrame):
+        self._df = df
+
+    def convert(self, amount_col: str, from_col: str, to_col: str,
+                out_col: str = "converted", rate_col: Optional[str] = None,
+                get_rate: Optional[RateLookup] = None,
+                chunksize: Optional[int] = None) -> pd.DataFrame:
+        """Return a copy of the DataFrame with out_col = amount in to_col's
+        currency (NaN where it cannot be converted), and optionally the rate
+        used in rate_col.
+
+        get_rate(from, to) defaults to currency_utils.get_exchange_rate; a
+        RateProvider's get_rate works too. chunksize bounds how many rows
+        are processed at once.
+        """
+        df = self._df
+        get_rate = get_rate or _default_lookup()
+        max_workers = _max_workers()
+        cache: dict[tuple[str, str], float] = {}
+        if not chunksize or len(df) <= chunksize:
+            return _convert_frame(df, amount_col, from_col, to_col, out_col,
+                                  rate_col, get_rate, cache, max_workers)
+
+        converted = np.empty(len(df))
+        rates = np.empty(len(df)) if rate_col else None
+        for start in range(0, len(df), chunksize):
+            stop = start + chunksize
+            converted[start:stop], chunk_rates = _convert_values(
+                df.iloc[start:stop], amount_col, from_col, to_col, get_rate,
+                cache, max_workers)
+            if rates is not None:
+                rates[start:stop] = chunk_rates
+        out = df.copy()
+        out[out_col] = converted
+        if rate_col:
+            out[rate_col] = rates
+        return out
+
+    def rates(self, from_col: str, to_col: str,
+              get_rate: Optional[RateLookup] = None) -> pd.Series:
+        """Rate for each row's pair (NaN where unresolved)."""
+        rates, _, _ = _row_rates(self._df, from_col, to_col,
+                                 get_rate or _default_lookup(), {}, _max_workers())
+        return pd.Series(rates, index=self._df.index, name="rate")
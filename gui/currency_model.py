@@ -0,0 +1,136 @@
+"""Qt item models that back the currency dropdowns.
+
+CurrencyListModel: a single list model over the currency registry.
+Both combo boxes share one instance, so the item data exists once
+instead of once per QComboBox.
+
+CurrencyFilterProxyModel: filters the shared model by a search string,
+matching against both the ISO code and the currency name.
+
+CurrencyComboBox: an editable QComboBox that shows the shared model and
+offers type-to-search through a filter proxy in its completer popup.
+"""
+
+from PyQt6.QtCore import (
+    QAbstractListModel, QModelIndex, QSortFilterProxyModel, Qt
+)
+from PyQt6.QtWidgets import QComboBox, QCompleter
+
+from data.currency_registry import Currency
+
+# Custom roles so views can ask for the raw code or name of a row.
+CODE_ROLE = Qt.ItemDataRole.UserRole
+NAME_ROLE = Qt.ItemDataRole.UserRole + 1
+
+
+class CurrencyListModel(QAbstractListModel):
+
+    """Read-only list of currencies, displayed as 'CODE — Name'."""
+
+    def __init__(self, currencies=(), parent=None):
+        super().__init__(parent)
+        self._currencies: list[Currency] = list(currencies)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        # A flat list has no children below its top-level rows.
+        return 0 if parent.isValid() else len(self._currencies)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._currencies):
+            return None
+        currency = self._currencies[index.row()]
+        # Editable combo boxes read their text through EditRole.
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return f"{currency.code} — {currency.name}"
+        if role == CODE_ROLE:
+            return currency.code
+        if role in (NAME_ROLE, Qt.ItemDataRole.ToolTipRole):
+            return currency.name
+        return None
+
+    def set_currencies(self, currencies) -> None:
+        """Replace the contents in one reset, e.g. once the registry loads."""
+        self.beginResetModel()
+        self._currencies = list(currencies)
+        self.endResetModel()
+
+    def row_of(self, code: str) -> int:
+        """Return the row holding code, or -1 if it is not present."""
+        for row, currency in enumerate(self._currencies):
+            if currency.code == code:
+                return row
+        return -1
+
+
+class CurrencyFilterProxyModel(QSortFilterProxyModel):
+
+    """Case-insensitive substring filter over code and name."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._needle = ""
+
+    def set_search_text(self, text: str) -> None:
+        needle = text.strip().casefold()
+        if needle != self._needle:
+            self._needle = needle
+            self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        if not self._needle:
+            return True
+        model = self.sourceModel()
+        index = model.index(source_row, 0, source_parent)
+        code = (model.data(index, CODE_ROLE) or "").casefold()
+        name = (model.data(index, NAME_ROLE) or "").casefold()
+        return self._needle in code or self._needle in name
+
+
+class CurrencyComboBox(QComboBox):
+
+    """Editable combo box with type-to-search on code and name.
+
+    The combo itself shows the shared model; typing filters a per-combo
+    proxy that feeds the completer popup, so the two dropdowns never
+    disturb each other's search.
+    """
+
+    def __init__(self, model: CurrencyListModel, parent=None):
+        super().__init__(parent)
+        self.setModel(model)
+        self.setEditable(True)
+        self.setInsertPolicy(QComboBox.InsertPolicy.NoInsert)
+
+        self._proxy = CurrencyFilterProxyModel(self)
+        self._proxy.setSourceModel(model)
+
+        completer = QCompleter(self._proxy, self)
+        # The proxy already filters, so the completer shows every row it gets.
+        completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        completer.activated.connect(self._select_text)
+        self.setCompleter(completer)
+
+        self.lineEdit().textEdited.connect(self._proxy.set_search_text)
+
+    def current_code(self) -> str | None:
+        """ISO code of the selected currency, or None while nothing is loaded."""
+        return self.currentData(CODE_ROLE)
+
+    def set_current_code(self, code: str) -> None:
+        row = self.model().row_of(code)
+        if row >= 0:
+            self.setCurrentIndex(row)
+
+    def _select_text(self, text: str) -> None:
+        row = self.findText(text)
+        if row >= 0:
+            self.setCurrentIndex(row)
+        self._proxy.set_search_text("")
+
+    def focusOutEvent(self, event):
+        # Drop any half-typed search and show the real selection again.
+        self._proxy.set_search_text("")
+        if self.currentIndex() >= 0:
+            self.setEditText(self.itemText(self.currentIndex()))
+        super().focusOutEvent(event)
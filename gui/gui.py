@@ -18,19 +18,26 @@ QComboBox: dropdown selection boxes.
 
 """
 
+import os
 import sys
-from PyQt6.QtWidgets import (
+import time
+
+# Taken before the Qt imports so the startup measurement covers them too.
+_STARTUP_T0 = time.perf_counter()
+
+from PyQt6.QtWidgets import (  # noqa: E402
     QApplication, QWidget, QLabel, QLineEdit, QPushButton,
-    QVBoxLayout, QHBoxLayout, QMessageBox, QComboBox
+    QVBoxLayout, QHBoxLayout, QMessageBox
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
-from PyQt6.QtGui import QDoubleValidator
-from currency_utils import convert_currency  # imports custom logic of functions from currency_utils
-from config import API_KEY
-from PyQt6.QtGui import QCursor
-from data.valid_currencies import valid_currencies_dict
-# used to fetch from tuple of currencies to populate
-# the dropdown menu in the GUI.
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal  # noqa: E402
+from PyQt6.QtGui import QDoubleValidator  # noqa: E402
+from PyQt6.QtGui import QCursor  # noqa: E402
+from gui.currency_model import CurrencyComboBox, CurrencyListModel  # noqa: E402
+# The currency registry and currency_utils (rate client, logging) are
+# loaded by WarmupWorker in the background, so they are not imported here.
+
+# Set GUI_MEASURE_STARTUP=1 to print startup timings and exit once warm.
+MEASURE_STARTUP = os.getenv("GUI_MEASURE_STARTUP") == "1"
 
 
 class ConversionWorker(QThread):
@@ -39,6 +46,39 @@ class ConversionWorker(QThread):
     error = pyqtSignal(str)
 
 
+class WarmupWorker(QThread):
+
+    """Loads the currency registry, then the rate client, off the UI thread,
+    and finally prefetches the most requested rates.
+
+    registry_loaded carries the list of currencies for the shared model.
+    client_ready fires once currency_utils has been imported and is usable.
+    """
+
+    registry_loaded = pyqtSignal(list)
+    client_ready = pyqtSignal()
+    error = pyqtSignal(str)
+
+    def run(self):
+        try:
+            from data.currency_registry import get_currency_registry
+            self.registry_loaded.emit(list(get_currency_registry()))
+
+            from modular_logger.root_logger import init_logging
+            init_logging()
+            import currency_utils  # warms requests and the rate client
+            currency_utils.enable_traffic_profile()
+            self.client_ready.emit()
+            # Prefetch the usual rates while the user is still typing.
+            currency_utils.warm_rate_cache()
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+def _elapsed_ms() -> float:
+    return (time.perf_counter() - _STARTUP_T0) * 1000
+
+
 """we have set a Fixed Size of 300 by 200 pixels
 The size is fixed, and not resizeable at this time. """
 
@@ -67,19 +107,21 @@ class CurrencyConverterGUI(QWidget):
         # Currency Selection
         """Label "From Currency:.
 Dropdown combo box for selecting the currency to convert from.
-Populates combo box with the valid currency codes imported earlier.
-Sets the default selected currency to the second item (index 1)
-to avoid it being the same as "from" by default.
+Populated with the currency registry once it has loaded in the background.
+The "to" currency defaults to a different currency than "from"
+(see on_registry_loaded).
 
 """
+        # Both combo boxes share one model; it starts empty and is filled
+        # by WarmupWorker so the window can appear immediately.
+        self.currency_model = CurrencyListModel(parent=self)
+        self._client_ready = False
+
         self.from_label = QLabel("From Currency:")
-        self.from_combo = QComboBox()
-        self.from_combo.addItems(valid_currencies_dict)
+        self.from_combo = CurrencyComboBox(self.currency_model)
 
         self.to_label = QLabel("To Currency:")
-        self.to_combo = QComboBox()
-        self.to_combo.addItems(valid_currencies_dict)
-        self.to_combo.setCurrentIndex(1)
+        self.to_combo = CurrencyComboBox(self.currency_model)
 
         # Convert Button
         self.convert_button = QPushButton("Convert")
@@ -114,13 +156,57 @@ to avoid it being the same as "from" by default.
         self.from_combo.currentIndexChanged.connect(self.validate_input)
         self.to_combo.currentIndexChanged.connect(self.validate_input)
 
+        self.result_label.setText("Loading currencies...")
+        self.warmup_worker = WarmupWorker(self)
+        self.warmup_worker.registry_loaded.connect(self.on_registry_loaded)
+        self.warmup_worker.client_ready.connect(self.on_client_ready)
+        self.warmup_worker.error.connect(self.on_warmup_error)
+
+    def start_warmup(self):
+        self.warmup_worker.start()
+
+    def on_registry_loaded(self, currencies):
+        self.currency_model.set_currencies(currencies)
+        self.from_combo.setCurrentIndex(0)
+        self.to_combo.setCurrentIndex(1 if len(currencies) > 1 else 0)
+        if MEASURE_STARTUP:
+            print(f"currencies loaded: {_elapsed_ms():.1f} ms")
+
+    def on_client_ready(self):
+        self._client_ready = True
+        self.result_label.setText("")
+        self.validate_input()
+        # Settings are loaded by now, so arming the profiler costs nothing extra.
+        from profiler import install_profiler_hook
+        if install_profiler_hook():
+            # Python only runs signal handlers between bytecodes, and the Qt
+            # event loop is native code, so wake the interpreter now and then.
+            self._signal_timer = QTimer(self)
+            self._signal_timer.timeout.connect(lambda: None)
+            self._signal_timer.start(250)
+        if MEASURE_STARTUP:
+            print(f"rate client ready: {_elapsed_ms():.1f} ms")
+            QApplication.quit()
+
+    def on_warmup_error(self, message):
+        self.result_label.setText("")
+        if MEASURE_STARTUP:
+            # A modal dialog would block the measured run until dismissed.
+            print(f"Failed to load the converter: {message}", file=sys.stderr)
+            QApplication.quit()
+            return
+        QMessageBox.critical(self, "Startup Error", f"Failed to load the converter:\n{message}")
+
     def validate_input(self):
         amount_text = self.amount_input.text().strip()
         is_valid = False
 
         try:
             amount = float(amount_text)
-            if amount > 0 and self.from_combo.currentText() != self.to_combo.currentText():
+            from_code = self.from_combo.current_code()
+            to_code = self.to_combo.current_code()
+            if (self._client_ready and amount > 0 and from_code and to_code
+                    and from_code != to_code):
                 is_valid = True
         except ValueError:
             pass
@@ -145,8 +231,8 @@ to avoid it being the same as "from" by default.
             self.setCursor(QCursor(Qt.CursorShape.ArrowCursor))  # Restore normal cursor
             return
 
-        from_curr = self.from_combo.currentText()
-        to_curr = self.to_combo.currentText()
+        from_curr = self.from_combo.current_code()
+        to_curr = self.to_combo.current_code()
 
         if from_curr == to_curr:
             QMessageBox.information(
@@ -158,7 +244,9 @@ to avoid it being the same as "from" by default.
             return
 
         try:
-            converted = convert_currency(API_KEY, amount, from_curr, to_curr)
+            # Already imported by WarmupWorker, so this is a cheap lookup.
+            from currency_utils import convert_currency
+            converted = convert_currency(amount, from_curr, to_curr)
             if converted is not None:
                 self.result_label.setText(
                     f"💱 {amount:.2f} {from_curr} = {converted:.2f} {to_curr}"
@@ -176,8 +264,16 @@ to avoid it being the same as "from" by default.
             self.convert_button.setEnabled(True)
 
 
-if __name__ == "__main__":
+def main() -> int:
     app = QApplication(sys.argv)
     window = CurrencyConverterGUI()
     window.show()
-    sys.exit(app.exec())
+    if MEASURE_STARTUP:
+        # Runs once the event loop has processed the first show/paint.
+        QTimer.singleShot(0, lambda: print(f"window shown: {_elapsed_ms():.1f} ms"))
+    window.start_warmup()
+    return app.exec()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,449 @@
+"""Append-only binary journal of conversions, for audit.
+
+Each conversion is one fixed-width 40-byte record:
+
+    ts        float64  unix time
+    from      uint16   currency registry ordinal (0xFFFF: not in the registry)
+    to        uint16
+    provider  uint16   line number in providers.txt (0: unknown)
+    flags     uint16   FAILED when no rate was available
+    amount    float64
+    rate      float64  NaN when failed
+    result    float64  NaN when failed
+
+Records go into segment files journal-00000001.fxj, journal-00000002.fxj,
+... (a new one every JOURNAL_SEGMENT_MB), each starting with a 64-byte
+header that records the record size and a hash of the registry codes, so
+ordinals are never decoded against a different registry.
+
+record() only appends to an in-memory buffer. A writer thread commits the
+buffer every JOURNAL_COMMIT_MS with one write and one fsync for the whole
+group (group commit); sync() waits until everything recorded so far is on
+disk. A commit that fails is taken back and retried. A crash loses at most
+the last commit interval, and a torn final record is ignored by the reader
+and cut off by the next commit.
+
+Several processes may write to one directory. Commits, rollovers and new
+provider names are serialised by an exclusive lock on journal.lock, so
+records land whole at the end of the newest segment and every process
+agrees on the provider line numbers.
+
+JournalReader memory-maps every segment as a NumPy structured array, so
+filtering and aggregating millions of records is a few vectorized passes
+with no parsing:
+
+    python launcher.py journal --since "2025-01-01 00:00:00"
+"""
+
+import argparse
+import atexit
+import logging
+import math
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"FXJRNL01"
+VERSION = 1
+HEADER_SIZE = 64
+# magic, version, record size, codes hash, created at
+_HEADER = struct.Struct("<8sIIId")
+_RECORD = struct.Struct("<dHHHHddd")
+RECORD_SIZE = _RECORD.size
+UNKNOWN_CODE = 0xFFFF
+FAILED = 1
+SEGMENT_PATTERN = "journal-*.fxj"
+PROVIDERS_FILE = "providers.txt"
+LOCK_FILE = "journal.lock"
+
+
+def record_dtype():
+    import numpy as np
+    return np.dtype([("ts", "<f8"), ("from", "<u2"), ("to", "<u2"), ("provider", "<u2"),
+                     ("flags", "<u2"), ("amount", "<f8"), ("rate", "<f8"), ("result", "<f8")])
+
+
+def _registry_codes() -> tuple[str, ...]:
+    from data.currency_registry import get_currency_registry
+    return get_currency_registry().codes
+
+
+def _codes_hash(codes: Iterable[str]) -> int:
+    return zlib.crc32(",".join(codes).encode("ascii"))
+
+
+def _segment_path(directory: Path, number: int) -> Path:
+    return directory / f"journal-{number:08d}.fxj"
+
+
+def _segments(directory: Path) -> list[Path]:
+    return sorted(directory.glob(SEGMENT_PATTERN))
+
+
+def _segment_number(path: Path) -> int:
+    return int(path.stem.split("-")[1])
+
+
+@contextmanager
+def _directory_lock(directory: Path):
+    """Exclusive lock shared by every process writing to a journal directory."""
+    with (directory / LOCK_FILE).open("a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gives up after ten seconds
+                    continue
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class ConversionJournal:
+
+    """Writer. Thread-safe; one per process and journal directory."""
+
+    def __init__(self, directory: Path | str, codes: Optional[Iterable[str]] = None,
+                 segment_bytes: int = 64 * 1024 * 1024, commit_interval: float = 0.2):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.codes = tuple(codes) if codes is not None else _registry_codes()
+        self._ordinals = {code: i for i, code in enumerate(self.codes)}
+        self._codes_hash = _codes_hash(self.codes)
+        self.segment_bytes = max(segment_bytes, HEADER_SIZE + RECORD_SIZE)
+        self.commit_interval = commit_interval
+
+        self._providers = self._load_providers()
+        self._providers_lock = threading.Lock()
+        self._pending: list[bytes] = []
+        self._recorded = 0  # records handed to record()
+        self._committed = 0  # records written and fsynced
+        self._failures = 0  # commits that raised OSError
+        self._cond = threading.Condition()
+        self._flush_now = threading.Event()
+        self._closing = False
+        self._file = None
+        with _directory_lock(self.directory):
+            self._current_segment()
+        self._writer = threading.Thread(target=self._run, name="conversion-journal",
+                                        daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    # --- Providers ---
+
+    def _load_providers(self) -> dict[str, int]:
+        path = self.directory / PROVIDERS_FILE
+        if not path.exists():
+            return {}
+        names = path.read_text(encoding="utf-8").splitlines()
+        return {name: i for i, name in enumerate(names, start=1)}
+
+    def _provider_id(self, name: str) -> int:
+        if not name:
+            return 0
+        provider_id = self._providers.get(name)
+        if provider_id is None:
+            with self._providers_lock, _directory_lock(self.directory):
+                # Another process may have added providers since we last
+                # looked, so the id is the line number in the file as it
+                # is now. Rare (a handful of providers per deployment), so
+                # written straight through.
+                self._providers = self._load_providers()
+                provider_id = self._providers.get(name)
+                if provider_id is None:
+                    line = name.replace("\n", " ")
+                    with (self.directory / PROVIDERS_FILE).open("a", encoding="utf-8") as f:
+                        f.write(line + "\n")
+                    provider_id = self._providers[line] = len(self._providers) + 1
+                    self._providers[name] = provider_id
+        return provider_id
+
+    # --- Segments ---
+
+    def _current_segment(self) -> None:
+        """Point self._file at the newest segment, creating one if needed.
+
+        Called with the directory lock held: another process may have
+        appended to or rolled over the journal since our last commit.
+        """
+        existing = _segments(self.directory)
+        if not existing:
+            self._new_segment(1)
+            return
+        path = existing[-1]
+        if self._file is None or Path(self._file.name) != path:
+            self._close_file()
+            f = path.open("a+b")
+            f.seek(0)
+            if not self._valid_header(f.read(HEADER_SIZE)):
+                f.close()
+                logger.warning(f"{path} belongs to another currency registry; "
+                               "starting a new segment")
+                self._new_segment(_segment_number(path) + 1)
+                return
+            self._file = f
+        # Every writer appends whole records under the lock, so a partial
+        # one can only be left by a crash; drop it so appends stay aligned.
+        size = os.fstat(self._file.fileno()).st_size
+        whole = HEADER_SIZE + (size - HEADER_SIZE) // RECORD_SIZE * RECORD_SIZE
+        if whole != size:
+            logger.warning(f"Truncating a torn record at the end of {path}")
+            self._file.truncate(whole)
+
+    def _new_segment(self, number: int) -> None:
+        self._close_file()
+        path = _segment_path(self.directory, number)
+        f = path.open("x+b")
+        header = _HEADER.pack(MAGIC, VERSION, RECORD_SIZE, self._codes_hash, time.time())
+        f.write(header.ljust(HEADER_SIZE, b"\0"))
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
+        self._file = path.open("a+b")
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _valid_header(self, header: bytes) -> bool:
+        if len(header) < HEADER_SIZE:
+            return False
+        magic, version, record_size, codes_hash, _ = _HEADER.unpack_from(header)
+        return (magic == MAGIC and version == VERSION and record_size == RECORD_SIZE
+                and codes_hash == self._codes_hash)
+
+    # --- Writing ---
+
+    def record(self, amount: float, from_currency: str, to_currency: str,
+               rate: float | None, result: float | None, provider: str = "",
+               ts: float | None = None) -> None:
+        """Queue one conversion (rate/result None for a failed one)."""
+        failed = rate is None or result is None
+        packed = _RECORD.pack(
+            time.time() if ts is None else ts,
+            self._ordinals.get(from_currency.upper(), UNKNOWN_CODE),
+            self._ordinals.get(to_currency.upper(), UNKNOWN_CODE),
+            self._provider_id(provider), FAILED if failed else 0, float(amount),
+            math.nan if rate is None else rate, math.nan if result is None else result)
+        with self._cond:
+            if self._closing:
+                raise ValueError("The conversion journal is closed")
+            self._pending.append(packed)
+            self._recorded += 1
+            self._cond.notify_all()
+
+    def sync(self, timeout: float | None = None) -> bool:
+        """Commit now and wait until every record so far is on disk.
+
+        False if that did not happen within timeout, or if the commit
+        failed (the records stay queued and are retried).
+        """
+        with self._cond:
+            target = self._recorded
+            failures = self._failures
+            self._flush_now.set()
+            self._cond.wait_for(
+                lambda: self._committed >= target or self._failures != failures, timeout)
+            return self._committed >= target
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closing)
+                if not self._pending:
+                    return  # closing, nothing left to write
+            # Let a group of records gather, unless someone is waiting.
+            self._flush_now.wait(self.commit_interval)
+            self._flush_now.clear()
+            with self._cond:
+                batch, self._pending = self._pending, []
+            try:
+                self._write(batch)
+            except OSError as e:
+                with self._cond:
+                    self._failures += 1
+                    if self._closing:
+                        logger.error(f"Lost {len(batch)} journal records: {e}")
+                        self._pending = []
+                    else:
+                        logger.error(f"Could not write {len(batch)} journal records, "
+                                     f"retrying: {e}")
+                        self._pending[:0] = batch
+                    self._cond.notify_all()
+                continue
+            with self._cond:
+                self._committed += len(batch)
+                self._cond.notify_all()
+
+    def _write(self, batch: list[bytes]) -> None:
+        with _directory_lock(self.directory):
+            self._current_segment()
+            # Where each segment we append to ended, so a failed commit can
+            # be taken back whole and retried without duplicates.
+            ends = {self._file.name: os.fstat(self._file.fileno()).st_size}
+            try:
+                while batch:
+                    size = os.fstat(self._file.fileno()).st_size
+                    room = (self.segment_bytes - size) // RECORD_SIZE
+                    if room <= 0:
+                        # The full segment is closed by the rollover; make
+                        # what this batch put in it durable first.
+                        os.fsync(self._file.fileno())
+                        self._new_segment(_segment_number(Path(self._file.name)) + 1)
+                        ends[self._file.name] = HEADER_SIZE
+                        continue
+                    chunk, batch = batch[:room], batch[room:]
+                    self._file.write(b"".join(chunk))
+                    self._file.flush()
+                os.fsync(self._file.fileno())
+            except OSError:
+                self._close_file()
+                for name, end in ends.items():
+                    try:
+                        os.truncate(name, end)
+                    except OSError:
+                        pass
+                raise
+
+    def close(self) -> None:
+        with self._cond:
+            if self._closing:
+                return
+            self._closing = True
+            self._flush_now.set()
+            self._cond.notify_all()
+        self._writer.join()
+        self._close_file()
+        atexit.unregister(self.close)
+
+
+class JournalReader:
+
+    """Memory-mapped, read-only view of a journal directory."""
+
+    def __init__(self, directory: Path | str, codes: Optional[Iterable[str]] = None):
+        self.directory = Path(directory)
+        self.codes = tuple(codes) if codes is not None else _registry_codes()
+        self._codes_hash = _codes_hash(self.codes)
+        path = self.directory / PROVIDERS_FILE
+        self.providers = [""] + (path.read_text(encoding="utf-8").splitlines()
+                                 if path.exists() else [])
+
+    def segments(self) -> Iterator:
+        """One read-only np.memmap of records per segment, oldest first."""
+        import numpy as np
+        dtype = record_dtype()
+        for path in _segments(self.directory):
+            with path.open("rb") as f:
+                header = f.read(HEADER_SIZE)
+            if len(header) < HEADER_SIZE:
+                continue
+            magic, version, record_size, codes_hash, _ = _HEADER.unpack_from(header)
+            if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+                logger.warning(f"Skipping {path}: not a version {VERSION} conversion journal")
+                continue
+            if codes_hash != self._codes_hash:
+                logger.warning(f"Skipping {path}: written with a different currency registry")
+                continue
+            # A torn last record (crash mid-write) is left out.
+            count = (path.stat().st_size - HEADER_SIZE) // RECORD_SIZE
+            if count:
+                yield np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE,
+                                shape=(count,))
+
+    def records(self, since: float | None = None, until: float | None = None):
+        """All records with since <= ts < until, as one structured array."""
+        import numpy as np
+        parts = []
+        for segment in self.segments():
+            if since is not None or until is not None:
+                ts = segment["ts"]
+                mask = np.ones(len(segment), dtype=bool)
+                if since is not None:
+                    mask &= ts >= since
+                if until is not None:
+                    mask &= ts < until
+                parts.append(segment[mask])
+            else:
+                parts.append(np.asarray(segment))
+        if not parts:
+            return np.empty(0, dtype=record_dtype())
+        return np.concatenate(parts)
+
+    def code(self, ordinal: int) -> str:
+        return self.codes[ordinal] if ordinal < len(self.codes) else "???"
+
+    def pair_mask(self, records, from_currency: str, to_currency: str):
+        return ((records["from"] == self.codes.index(from_currency.upper()))
+                & (records["to"] == self.codes.index(to_currency.upper())))
+
+    def totals_by_pair(self, records) -> dict[tuple[str, str], tuple[int, float, float]]:
+        """(from, to) -> (conversions, total amount, total result), successful only."""
+        import numpy as np
+        ok = records[(records["flags"] & FAILED) == 0]
+        if not len(ok):
+            return {}
+        keys = ok["from"].astype(np.uint32) << 16 | ok["to"]
+        unique, index = np.unique(keys, return_inverse=True)
+        counts = np.bincount(index)
+        amounts = np.bincount(index, weights=ok["amount"])
+        results = np.bincount(index, weights=ok["result"])
+        return {(self.code(int(key) >> 16), self.code(int(key) & 0xFFFF)):
+                (int(count), float(amount), float(result))
+                for key, count, amount, result in zip(unique, counts, amounts, results)}
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Summarise the journal: conversions and totals per pair."""
+    from config import get_settings
+
+    parser = argparse.ArgumentParser(description="Summarise the conversion journal.")
+    parser.add_argument("--dir", help="Journal directory (default: JOURNAL_DIR)")
+    parser.add_argument("--since", help="Only records at or after 'YYYY-MM-DD HH:MM:SS'")
+    parser.add_argument("--until", help="Only records before 'YYYY-MM-DD HH:MM:SS'")
+    args = parser.parse_args(argv)
+
+    directory = args.dir or get_settings().journal_dir
+    if not directory:
+        print("No journal directory: set JOURNAL_DIR or pass --dir")
+        return 1
+    since = datetime.fromisoformat(args.since).timestamp() if args.since else None
+    until = datetime.fromisoformat(args.until).timestamp() if args.until else None
+
+    reader = JournalReader(directory)
+    records = reader.records(since, until)
+    failed = int(((records["flags"] & FAILED) != 0).sum())
+    print(f"📒 {len(records)} conversions ({failed} failed)")
+    totals = reader.totals_by_pair(records)
+    for (from_code, to_code), (count, amount, result) in sorted(
+            totals.items(), key=lambda item: -item[1][0]):
+        print(f"{from_code} → {to_code}: {count} conversions, "
+              f"{amount:,.2f} {from_code} → {result:,.2f} {to_code}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
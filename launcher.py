@@ -0,0 +1,173 @@
+"""Single entry point for every way of running the converter.
+
+All modes run inside this interpreter (direct calls or runpy), instead of
+re-executing a fresh Python with subprocess. Imports and warmed state
+(pooled HTTP connections, the loaded currency registry) are therefore
+paid for once and kept.
+
+    python launcher.py cli [--preload] [--timings]
+    python launcher.py batch --workers 16 < conversions.txt
+    python launcher.py gui
+    python launcher.py root-logger
+    python launcher.py analyze-logs --since "2025-01-01 00:00:00"
+    python launcher.py publish-rates --base USD
+    python launcher.py rate-daemon --listen 127.0.0.1:8765
+    python launcher.py journal --since "2025-01-01 00:00:00"
+
+Options that are not the launcher's own are forwarded to the mode
+(main.cli for cli and batch).
+"""
+
+import argparse
+import runpy
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+_LAUNCH_T0 = time.perf_counter()
+
+
+def _elapsed_ms(since: float) -> float:
+    return (time.perf_counter() - since) * 1000
+
+
+def _preload_registry() -> None:
+    from data.currency_registry import get_currency_registry
+    get_currency_registry()
+
+
+def _preload_http_pool() -> None:
+    from currency_utils import warm_http_pool
+    warm_http_pool()
+
+
+def _preload_rate_cache() -> None:
+    from currency_utils import enable_traffic_profile, warm_rate_cache
+    enable_traffic_profile()
+    warm_rate_cache()
+
+
+# Name -> callable. The steps are independent and run in parallel.
+PRELOAD_STEPS: dict[str, Callable[[], None]] = {
+    "currency registry": _preload_registry,
+    "http pool": _preload_http_pool,
+    "rate cache": _preload_rate_cache,
+}
+
+
+def preload(steps: Optional[dict[str, Callable[[], None]]] = None) -> dict[str, float]:
+    """Run the warm-up steps concurrently. Returns each step's duration in ms.
+
+    A step that fails is reported on stderr and skipped, because warming
+    up is an optimisation and must never prevent the converter from starting.
+    """
+    steps = PRELOAD_STEPS if steps is None else steps
+    timings: dict[str, float] = {}
+
+    def timed(name: str, step: Callable[[], None]) -> None:
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            print(f"⚠️ Preload step '{name}' failed: {e}", file=sys.stderr)
+        timings[name] = _elapsed_ms(started)
+
+    with ThreadPoolExecutor(max_workers=max(len(steps), 1),
+                            thread_name_prefix="preload") as executor:
+        for name, step in steps.items():
+            executor.submit(timed, name, step)
+    return timings
+
+
+def _run_cli(forwarded: list[str]) -> int:
+    from main import cli
+    return cli(forwarded)
+
+
+def _run_batch(forwarded: list[str]) -> int:
+    from main import cli
+    return cli(["--batch", *forwarded])
+
+
+def _run_gui(forwarded: list[str]) -> int:
+    from gui.gui import main as gui_main
+    sys.argv = [sys.argv[0], *forwarded]  # QApplication reads Qt options from argv
+    return gui_main()
+
+
+def _run_log_analyzer(forwarded: list[str]) -> int:
+    from modular_logger.log_analyzer import main as analyzer_main
+    return analyzer_main(forwarded)
+
+
+def _run_rate_publisher(forwarded: list[str]) -> int:
+    from modular_logger.root_logger import init_logging
+    from profiler import install_profiler_hook
+    from shared_rates import main as publisher_main
+    init_logging()
+    install_profiler_hook()
+    return publisher_main(forwarded)
+
+
+def _run_rate_daemon(forwarded: list[str]) -> int:
+    from modular_logger.root_logger import init_logging
+    from profiler import install_profiler_hook
+    from rate_daemon import main as daemon_main
+    init_logging()
+    install_profiler_hook()
+    return daemon_main(forwarded)
+
+
+def _run_journal(forwarded: list[str]) -> int:
+    from journal import main as journal_main
+    return journal_main(forwarded)
+
+
+def _run_root_logger(forwarded: list[str]) -> int:
+    runpy.run_module("modular_logger.root_logger", run_name="__main__")
+    return 0
+
+
+MODES: dict[str, Callable[[list[str]], int]] = {
+    "cli": _run_cli,
+    "batch": _run_batch,
+    "gui": _run_gui,
+    "root-logger": _run_root_logger,
+    "analyze-logs": _run_log_analyzer,
+    "publish-rates": _run_rate_publisher,
+    "rate-daemon": _run_rate_daemon,
+    "journal": _run_journal,
+}
+
+
+def launch(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the Currency Converter.")
+    parser.add_argument("mode", nargs="?", default="cli", choices=sorted(MODES),
+                        help="What to run (default: cli)")
+    parser.add_argument("--preload", action="store_true",
+                        help="Warm the currency registry, HTTP pool and the "
+                             "most requested rates in parallel before starting")
+    parser.add_argument("--timings", action="store_true",
+                        help="Report start-up timings on stderr")
+    args, forwarded = parser.parse_known_args(argv)
+
+    preload_timings: dict[str, float] = {}
+    preload_started = time.perf_counter()
+    if args.preload:
+        from modular_logger.root_logger import init_logging
+        init_logging()
+        preload_timings = preload()
+
+    if args.timings:
+        kind = "warm" if args.preload else "cold"
+        print(f"⏱️ {kind} start: ready after {_elapsed_ms(_LAUNCH_T0):.1f} ms "
+              f"(preload {_elapsed_ms(preload_started):.1f} ms)", file=sys.stderr)
+        for name, ms in preload_timings.items():
+            print(f"   {name}: {ms:.1f} ms", file=sys.stderr)
+
+    return MODES[args.mode](forwarded)
+
+
+if __name__ == "__main__":
+    sys.exit(launch())
@@ -1,31 +1,34 @@
-from modular_logger.config import API_KEY
-from currency_utils import convert_currency
-from modular_logger.root_logger import logger
+from currency_utils import backoff_delay, convert_batch, convert_currency, enable_traffic_profile
+from modular_logger.root_logger import init_logging, logger
+from profiler import install_profiler_hook
 from validators import get_currency_input, get_valid_amount
+import argparse
+import math
 import requests
 import time
 import sys
-from typing import Optional
+from typing import Iterable, Iterator, Optional, TextIO
 
 
-def main(max_retries: int = 3) -> None:
+def main(max_retries: int = 3) -> int:
+    """Interactive converter. Returns the process exit code."""
     print("=== Currency Converter ===")
     retries: int = 0
 
     def handle_retry() -> None:
         nonlocal retries
+        time.sleep(backoff_delay(retries))
         retries += 1
-        time.sleep(1)
 
-    def quit_program() -> None:
+    def quit_program() -> int:
         print("Goodbye!")
-        sys.exit(0)
+        return 0
 
     while retries < max_retries:
         amount_input = input("Enter amount(positive number) "
                              "or 'q' to quit: ").strip()
         if amount_input.casefold() == 'q':
-            quit_program()
+            return quit_program()
 
         amount: Optional[float] = get_valid_amount(amount_input)
         if amount is None:
@@ -37,7 +40,7 @@ def main(max_retries: int = 3) -> None:
             "From currency code (e.g. USD) "
             "or 'q' to quit: ")
         if from_currency.casefold() == 'q':
-            quit_program()
+            return quit_program()
         if not from_currency:
             print("❌ Invalid 'From' currency entered.")
             handle_retry()
@@ -47,7 +50,7 @@ def main(max_retries: int = 3) -> None:
                                                         "(e.g. GBP or "
                                                         "'q' to quit: ")
         if to_currency.casefold() == 'q':
-            quit_program()
+            return quit_program()
         if not to_currency:
             print("❌ Invalid 'To' currency entered.")
             handle_retry()
@@ -55,7 +58,7 @@ def main(max_retries: int = 3) -> None:
 
         try:
             converted: Optional[float] = (
-                convert_currency(API_KEY, amount,
+                convert_currency(amount,
                                  from_currency,
                                  to_currency))
         except requests.exceptions.Timeout:
@@ -93,12 +96,9 @@ def main(max_retries: int = 3) -> None:
             continue
         else:
             if converted is not None:
+                # convert_currency has already logged the conversion.
                 print(f"\n💱 {amount:.2f} {from_currency} "
                       f"= {converted:.2f} {to_currency}")
-                logger.info(
-                    f"Conversion: {amount:.2f} {from_currency} "
-                    f"→ {converted:.2f} {to_currency}"
-                )
             else:
                 print("⚠️ Conversion failed. "
                       "Please check your API key or currency codes.")
@@ -111,12 +111,91 @@ def main(max_retries: int = 3) -> None:
                      .strip().lower())
 
         if retry != 'y':
-            quit_program()
+            return quit_program()
 
-    else:
-        print("❌ Maximum retries reached. "
-              "Exiting program.")
+    print("❌ Maximum retries reached. "
+          "Exiting program.")
+    return 1
+
+
+def parse_batch_lines(lines: Iterable[str], malformed: Optional[list[int]] = None
+                      ) -> Iterator[tuple[int, float, str, str]]:
+    """Turn 'amount FROM TO' lines into (line number, amount, FROM, TO).
+
+    Blank lines and '#' comments are skipped. Malformed lines (including
+    amounts such as nan or inf) are reported on stderr, added to malformed
+    and skipped, so stdout only ever carries results.
+    """
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = line.split()
+        try:
+            if len(parts) != 3:
+                raise ValueError("expected 'amount FROM TO'")
+            amount = float(parts[0])
+            if not math.isfinite(amount):
+                raise ValueError("amount must be a finite number")
+        except ValueError as e:
+            print(f"ERROR line {line_number}: {line!r}: {e}", file=sys.stderr)
+            if malformed is not None:
+                malformed.append(line_number)
+            continue
+        yield line_number, amount, parts[1].upper(), parts[2].upper()
+
+
+def run_batch(input_stream: TextIO, output_stream: TextIO,
+              workers: int = 8, max_retries: int = 3) -> int:
+    """Non-interactive mode: read conversions from input_stream, write results
+    to output_stream as each one completes. Results arrive out of order, so
+    each starts with its input line number ('3: 10.00 USD = 9.20 EUR').
+    Returns 0 if every line converted, 1 if any failed or was malformed.
+    """
+    malformed: list[int] = []
+    # Batch index -> input line, for the conversions still in flight.
+    line_numbers: dict[int, int] = {}
+
+    def conversions() -> Iterator[tuple[float, str, str]]:
+        for index, (line_number, *conversion) in enumerate(
+                parse_batch_lines(input_stream, malformed)):
+            line_numbers[index] = line_number
+            yield tuple(conversion)
+
+    failures = 0
+    for result in convert_batch(conversions(), max_workers=workers,
+                                max_retries=max_retries):
+        line_number = line_numbers.pop(result.index)
+        if result.converted is None:
+            failures += 1
+            print(f"ERROR line {line_number}: {result.amount} {result.from_currency} "
+                  f"{result.to_currency}: {result.error}", file=sys.stderr)
+            continue
+        output_stream.write(f"{line_number}: {result.amount:.2f} {result.from_currency} = "
+                            f"{result.converted:.2f} {result.to_currency}\n")
+        output_stream.flush()
+    return 1 if failures or malformed else 0
+
+
+def cli(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Currency Converter")
+    parser.add_argument("--batch", action="store_true",
+                        help="Read 'amount FROM TO' lines from stdin and "
+                             "write results to stdout")
+    parser.add_argument("--workers", type=int, default=8,
+                        help="Concurrent rate lookups in batch mode")
+    parser.add_argument("--max-retries", type=int, default=3,
+                        help="Retries per failing lookup or invalid entry")
+    args = parser.parse_args(argv)
+    init_logging()
+    install_profiler_hook()
+    enable_traffic_profile()
+
+    if args.batch:
+        return run_batch(sys.stdin, sys.stdout, workers=args.workers,
+                         max_retries=args.max_retries)
+    return main(max_retries=args.max_retries)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(cli())
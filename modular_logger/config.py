@@ -1,32 +1,14 @@
-"""Environment configuration and validation."""
+"""Environment configuration for the logging package.
 
-import os
-from dotenv import load_dotenv
-from pathlib import Path
-load_dotenv()
-
-LOG_DIR: Path = Path("logs")  # Name of directory where logs will be stored.
-LOG_FILE: Path = LOG_DIR / "converter.log"  # Name of logs
-
-# Ensure logs directory exists
-LOG_DIR.mkdir(parents=True, exist_ok=True)
+Values come from the shared, lazily loaded settings in the top-level
+config module, so importing this module neither reads .env nor touches
+the filesystem. The logs directory is created by init_logging() /
+setup_logger() when a file handler is actually needed.
+"""
 
-# Required API key
-API_KEY: str = os.getenv("EXCHANGE_RATE_API_KEY")
-if not API_KEY:
-    raise ValueError("Missing EXCHANGE_RATE_API_KEY in environment.")
-
-# Logging level validation
-LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()  # determines level of
-# verbosity of the log levels
-VALID_LOG_LEVELS: set[str] = {"DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"}
-# Specify permitted log levels.
-if LOG_LEVEL not in VALID_LOG_LEVELS:
-    raise ValueError(f"Invalid LOG_LEVEL: '{LOG_LEVEL}'. Must be one of: "
-                     f"{', '.join(VALID_LOG_LEVELS)}")
+import os
 
-# Optional: Discord webhook for logging
-DISCORD_WEBHOOK_URL: str = os.getenv("DISCORD_WEBHOOK_URL", "").strip()
+from config import VALID_LOG_LEVELS, get_settings  # noqa: F401  (re-exported)
 
 
 def get_env_int(key: str, default: int) -> int:
@@ -35,3 +17,20 @@ def get_env_int(key: str, default: int) -> int:
         return int(os.getenv(key, default))
     except (ValueError, TypeError):
         return default
+
+
+# These names used to be read (and validated) at import time. They are now
+# resolved from the settings on first access (PEP 562).
+_SETTINGS_NAMES = {
+    "API_KEY": lambda s: s.require_api_key(),
+    "LOG_LEVEL": lambda s: s.log_level,
+    "LOG_DIR": lambda s: s.log_dir,
+    "LOG_FILE": lambda s: s.log_file,
+    "DISCORD_WEBHOOK_URL": lambda s: s.discord_webhook_url,
+}
+
+
+def __getattr__(name: str):
+    if name in _SETTINGS_NAMES:
+        return _SETTINGS_NAMES[name](get_settings())
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
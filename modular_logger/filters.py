@@ -0,0 +1,213 @@
+"""Log filters that keep hot-path logging cheap during incidents.
+
+SamplingFilter combines two mechanisms:
+
+- Per-template rate limiting. Records are grouped by call site (logger
+  name, file and line). Most messages here are f-strings, so the call
+  site, not the message text, is what identifies "the same" message.
+  Each call site may emit `burst` records per `window` seconds; further
+  records in that window are suppressed.
+- Probabilistic sampling of DEBUG/INFO records, with a rate per logger
+  name. WARNING and above are never sampled away, only rate limited.
+
+When a call site comes back after suppression, a single
+"suppressed N similar records" summary is emitted first, so the volume
+is still visible. Once start_flushing() has been called (init_logging and
+setup_logger do), a background thread also emits the summary of every
+window that has ended, so the tail of a burst is reported even if the
+call site goes quiet; close() stops it and flushes what is left.
+
+Both limits are configured per logger name through the environment,
+using comma-separated name=value pairs; the longest matching prefix
+wins, and "*" sets the default:
+
+    LOG_SAMPLING="currency_utils=0.1,validators=0.5"
+    LOG_RATE_LIMIT="*=100,currency_utils=5"
+    LOG_RATE_WINDOW=1.0
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Any
+
+DEFAULT_SAMPLE_RATE = 1.0
+DEFAULT_BURST = 100
+
+# Marks records created by the filter itself so they are never filtered.
+_SUMMARY_ATTR = "_sampling_summary"
+# Caches the decision on the record, so every handler sharing this filter
+# agrees and the state is only updated once per record.
+_DECISION_ATTR = "_sampling_decision"
+
+
+def parse_logger_values(spec: str | None, default: float) -> dict[str, float]:
+    """Parse 'name=value,name=value' into {name: value}; '*' is the default."""
+    values = {"": default}
+    for item in (spec or "").split(","):
+        name, sep, value = item.partition("=")
+        if not sep:
+            continue
+        name = name.strip()
+        try:
+            values["" if name == "*" else name] = float(value)
+        except ValueError:
+            continue
+    return values
+
+
+def _lookup(values: dict[str, float], logger_name: str) -> float:
+    """Value for the longest dotted prefix of logger_name present in values."""
+    name = logger_name
+    while True:
+        if name in values:
+            return values[name]
+        if "." not in name:
+            return values[""]
+        name = name.rsplit(".", 1)[0]
+
+
+class _CallSite:
+    __slots__ = ("window_start", "count", "suppressed", "last")
+
+    def __init__(self, now: float):
+        self.window_start = now
+        self.count = 0
+        self.suppressed = 0
+        # What the summary needs from the last suppressed record: levelno,
+        # levelname, funcName, filename, msg and args. Not the record itself,
+        # whose exc_info would keep a traceback and its frames alive.
+        self.last: tuple[Any, ...] | None = None
+
+
+class SamplingFilter(logging.Filter):
+
+    """Rate-limits each call site and samples low-severity records."""
+
+    def __init__(self, sample_rates: dict[str, float] | None = None,
+                 bursts: dict[str, float] | None = None,
+                 window: float = 1.0):
+        super().__init__()
+        self.sample_rates = sample_rates or {"": DEFAULT_SAMPLE_RATE}
+        self.bursts = bursts or {"": DEFAULT_BURST}
+        self.window = window
+        self._sites: dict[tuple, _CallSite] = {}
+        # Per logger name: (sample rate, burst), resolved once.
+        self._limits: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._flusher: threading.Thread | None = None
+
+    @classmethod
+    def from_settings(cls, settings) -> "SamplingFilter":
+        return cls(
+            sample_rates=parse_logger_values(settings.log_sampling, DEFAULT_SAMPLE_RATE),
+            bursts=parse_logger_values(settings.log_rate_limit, DEFAULT_BURST),
+            window=settings.log_rate_window,
+        )
+
+    def _limits_for(self, logger_name: str) -> tuple[float, float]:
+        limits = self._limits.get(logger_name)
+        if limits is None:
+            limits = (_lookup(self.sample_rates, logger_name),
+                      _lookup(self.bursts, logger_name))
+            self._limits[logger_name] = limits
+        return limits
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        decision = getattr(record, _DECISION_ATTR, None)
+        if decision is not None:
+            return decision
+        if getattr(record, _SUMMARY_ATTR, False):
+            return True
+
+        sample_rate, burst = self._limits_for(record.name)
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        pending_summary = None
+
+        with self._lock:
+            site = self._sites.get(key)
+            if site is None:
+                site = self._sites[key] = _CallSite(now)
+            elif now - site.window_start >= self.window:
+                if site.suppressed:
+                    pending_summary = (key, site.last, site.suppressed,
+                                       now - site.window_start)
+                site.window_start, site.count, site.suppressed = now, 0, 0
+
+            keep = True
+            if record.levelno < logging.WARNING and sample_rate < 1.0:
+                keep = random.random() < sample_rate
+            if keep and burst > 0:
+                site.count += 1
+                keep = site.count <= burst
+            if not keep:
+                site.suppressed += 1
+                site.last = (record.levelno, record.levelname, record.funcName,
+                             record.filename, record.msg, record.args)
+
+        if pending_summary is not None:
+            self._emit_summary(*pending_summary)
+        setattr(record, _DECISION_ATTR, keep)
+        return keep
+
+    def flush_summaries(self, ended_only: bool = False) -> None:
+        """Emit summaries for every call site with suppressed records, or
+        with ended_only, for those whose window is over (and start a new one).
+        """
+        pending = []
+        with self._lock:
+            now = time.monotonic()
+            for key, site in self._sites.items():
+                if not site.suppressed:
+                    continue
+                elapsed = now - site.window_start
+                if ended_only:
+                    if elapsed < self.window:
+                        continue
+                    site.window_start, site.count = now, 0
+                pending.append((key, site.last, site.suppressed, elapsed))
+                site.suppressed = 0
+        for args in pending:
+            self._emit_summary(*args)
+
+    def start_flushing(self, interval: float | None = None) -> None:
+        """Emit ended windows' summaries every interval (default: window)."""
+        if self._flusher is not None:
+            return
+        interval = max(interval or self.window, 0.01)
+        self._flusher = threading.Thread(target=self._flush_loop, args=(interval,),
+                                         name="log-summaries", daemon=True)
+        self._flusher.start()
+
+    def _flush_loop(self, interval: float) -> None:
+        while not self._stopped.wait(interval):
+            self.flush_summaries(ended_only=True)
+
+    def close(self) -> None:
+        """Stop the background flush and emit every pending summary."""
+        self._stopped.set()
+        self.flush_summaries()
+
+    @staticmethod
+    def _emit_summary(key: tuple, last: tuple, suppressed: int, elapsed: float) -> None:
+        name, pathname, lineno = key
+        levelno, levelname, func_name, filename, msg, args = last
+        try:
+            message = str(msg) % args if args else str(msg)
+        except (TypeError, ValueError):
+            message = str(msg)
+        summary = logging.makeLogRecord({
+            "name": name,
+            "levelno": levelno,
+            "levelname": levelname,
+            "pathname": pathname,
+            "lineno": lineno,
+            "funcName": func_name,
+            "msg": "suppressed %d similar records from %s:%d in %.1fs (last: %s)",
+            "args": (suppressed, filename, lineno, elapsed, message[:200]),
+            _SUMMARY_ATTR: True,
+        })
+        logging.getLogger(name).handle(summary)
@@ -1,33 +1,39 @@
 """Optional logging handlers, including Discord webhook handler."""
 
 import logging
-from modular_logger.config import DISCORD_WEBHOOK_URL
+import sys
+from config import get_settings
 from modular_logger.formatters import file_formatter
 
 
 def get_discord_handler(
-    webhook_url: str = DISCORD_WEBHOOK_URL,
+    webhook_url: str | None = None,
     log_level: int = logging.ERROR,
 ) -> logging.Handler | None:
     """Returns a configured DiscordWebhookHandler if available and valid.
     Falls back to None if the webhook URL is invalid, missing, or if
     the handler cannot be imported or initialized.
     Parameters:
-    - webhook_url (str): The Discord webhook URL.
+    - webhook_url (str | None): The Discord webhook URL.
+      Defaults to DISCORD_WEBHOOK_URL from the settings.
     - log_level (int): Logging level for the handler.
     Returns:
     - logging.Handler | None: Configured handler or None.
 """
 
+    if webhook_url is None:
+        webhook_url = get_settings().discord_webhook_url
+
     # if the webhook is invalid or missing, skip.
     if not webhook_url or not webhook_url.startswith("https://"):
-        print("⚠️ Invalid or missing DISCORD_WEBHOOK_URL. Skipping Discord logging.")
+        print("⚠️ Invalid or missing DISCORD_WEBHOOK_URL. Skipping Discord logging.",
+              file=sys.stderr)
         return None
 
     try:
         from notifications import DiscordWebhookHandler
     except ImportError:
-        print("🔕 DiscordWebhookHandler not available.")
+        print("🔕 DiscordWebhookHandler not available.", file=sys.stderr)
         return None
 
     try:
@@ -36,5 +42,5 @@ def get_discord_handler(
         handler.setFormatter(file_formatter)
         return handler
     except Exception as e:
-        print(f"❌ Failed to initialize DiscordWebhookHandler: {e}")
+        print(f"❌ Failed to initialize DiscordWebhookHandler: {e}", file=sys.stderr)
         return None
@@ -0,0 +1,223 @@
+"""Streaming analytics over the converter logs.
+
+Reads logs/converter.log and its rotated (possibly compressed) segments
+line by line, in either the plain file_formatter layout or the
+JsonFormatter layout, and reports:
+
+- rate-fetch latency percentiles per currency pair,
+- error counts by type (API error-type or HTTP exception class),
+- conversion volume (count and amount) by currency.
+
+Latencies go into a LatencySketch: a log-bucketed histogram with
+bounded relative error, in the spirit of HDR histograms and DDSketch.
+Memory depends on the range of latencies, not on how many lines are
+read, and sketches can be merged, e.g. across hosts or days.
+
+    python -m modular_logger.log_analyzer logs/converter.log \\
+        --since "2025-01-01 00:00:00" --until "2025-01-02 00:00:00"
+"""
+
+import argparse
+import json
+import math
+import re
+import sys
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from modular_logger.rotation import iter_log_lines
+
+# Message shapes written by currency_utils.
+RATE_FOUND = re.compile(
+    r"^Rate found: 1 (?P<from>[A-Z]{3}) = \S+ (?P<to>[A-Z]{3}) in (?P<ms>[\d.]+) ms")
+HTTP_FAILED = re.compile(r"^HTTP request has failed \((?P<type>\w+)\)")
+API_ERROR = re.compile(r"^Exchange rate API error: (?P<type>[^|]+?) \|")
+CONVERSION = re.compile(
+    r"^Conversion: (?P<amount>[\d.]+) (?P<from>[A-Z]{3}) → "
+    r"(?P<converted>[\d.]+) (?P<to>[A-Z]{3})")
+
+
+class LatencySketch:
+
+    """Mergeable latency histogram with relative_error accuracy.
+
+    Bucket i holds values in (gamma**(i-1), gamma**i], so any reported
+    percentile is within relative_error of a value actually observed.
+    """
+
+    def __init__(self, relative_error: float = 0.01):
+        self.relative_error = relative_error
+        self._gamma = (1 + relative_error) / (1 - relative_error)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets: Counter = Counter()
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        value = max(value, 1e-6)
+        self.buckets[math.ceil(math.log(value) / self._log_gamma)] += 1
+        self.count += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "LatencySketch") -> None:
+        if other.relative_error != self.relative_error:
+            raise ValueError("Cannot merge sketches with different accuracy.")
+        self.buckets.update(other.buckets)
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, p: float) -> float | None:
+        """Approximate p-th percentile (0-100), or None if empty."""
+        if not self.count:
+            return None
+        rank = p / 100 * (self.count - 1)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                # Midpoint of the bucket (in relative terms), clamped to
+                # the exact extremes we have seen.
+                estimate = 2 * self._gamma ** index / (self._gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+
+@dataclass
+class LogStats:
+    latency: dict = field(default_factory=lambda: defaultdict(LatencySketch))
+    errors: Counter = field(default_factory=Counter)
+    conversions: Counter = field(default_factory=Counter)
+    volume: Counter = field(default_factory=Counter)
+    lines: int = 0
+    parsed: int = 0
+
+    def merge(self, other: "LogStats") -> None:
+        for pair, sketch in other.latency.items():
+            self.latency[pair].merge(sketch)
+        self.errors.update(other.errors)
+        self.conversions.update(other.conversions)
+        self.volume.update(other.volume)
+        self.lines += other.lines
+        self.parsed += other.parsed
+
+
+def parse_line(line: str) -> tuple[str, str] | None:
+    """Return (timestamp, message) for a plain or JSON record line.
+
+    Continuation lines, e.g. tracebacks, return None.
+    """
+    if line.startswith("{"):
+        try:
+            record = json.loads(line)
+            return record["timestamp"], record["message"]
+        except (ValueError, KeyError, TypeError):
+            return None
+    parts = line.rstrip("\n").split(" | ", 3)
+    if len(parts) != 4:
+        return None
+    return parts[0], parts[3]
+
+
+def analyze_lines(lines: Iterable[str], since: Optional[str] = None,
+                  until: Optional[str] = None) -> LogStats:
+    """Fold log lines into LogStats. since/until are timestamps in the log's
+    own 'YYYY-MM-DD HH:MM:SS' format, compared as strings.
+    """
+    stats = LogStats()
+    for line in lines:
+        stats.lines += 1
+        parsed = parse_line(line)
+        if parsed is None:
+            continue
+        timestamp, message = parsed
+        if (since and timestamp < since) or (until and timestamp >= until):
+            continue
+        stats.parsed += 1
+
+        if message.startswith("Rate found"):
+            match = RATE_FOUND.match(message)
+            if match:
+                stats.latency[f"{match['from']}/{match['to']}"].add(float(match["ms"]))
+        elif message.startswith("Conversion"):
+            match = CONVERSION.match(message)
+            if match:
+                stats.conversions[match["from"]] += 1
+                stats.conversions[match["to"]] += 1
+                stats.volume[match["from"]] += float(match["amount"])
+                stats.volume[match["to"]] += float(match["converted"])
+        elif message.startswith("HTTP request has failed"):
+            match = HTTP_FAILED.match(message)
+            stats.errors[match["type"] if match else "RequestException"] += 1
+        elif message.startswith("Exchange rate API error"):
+            match = API_ERROR.match(message)
+            stats.errors[match["type"].strip() if match else "Unknown"] += 1
+    return stats
+
+
+def report(stats: LogStats, percentiles=(50, 90, 99), top: int = 20) -> dict:
+    """Summarise LogStats as plain data (used for both text and --json)."""
+    pairs = sorted(stats.latency.items(), key=lambda item: -item[1].count)[:top]
+    return {
+        "lines": stats.lines,
+        "records": stats.parsed,
+        "latency_ms": {
+            pair: {"count": sketch.count,
+                   **{f"p{p}": round(sketch.percentile(p), 2) for p in percentiles},
+                   "max": round(sketch.max, 2)}
+            for pair, sketch in pairs
+        },
+        "errors": dict(stats.errors.most_common()),
+        "conversions": {
+            code: {"count": count, "amount": round(stats.volume[code], 2)}
+            for code, count in stats.conversions.most_common(top)
+        },
+    }
+
+
+def _print_report(summary: dict) -> None:
+    print(f"📄 {summary['lines']} lines, {summary['records']} records in range")
+
+    print("\n⏱️ Rate fetch latency (ms):")
+    for pair, row in summary["latency_ms"].items():
+        print(f"{pair:<8} n={row['count']:<7} p50={row['p50']:<8} "
+              f"p90={row['p90']:<8} p99={row['p99']:<8} max={row['max']}")
+
+    print("\n❌ Errors by type:")
+    for error_type, count in summary["errors"].items():
+        print(f"{error_type}: {count}")
+
+    print("\n💱 Conversions by currency:")
+    for code, row in summary["conversions"].items():
+        print(f"{code}: {row['count']} conversions, {row['amount']:.2f} total")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Analyse converter logs.")
+    parser.add_argument("log_file", nargs="?", default="logs/converter.log",
+                        help="Live log file; its rotated segments are included")
+    parser.add_argument("--since", help="Only records at or after this timestamp")
+    parser.add_argument("--until", help="Only records before this timestamp")
+    parser.add_argument("--no-rotated", action="store_true",
+                        help="Ignore rotated segments")
+    parser.add_argument("--top", type=int, default=20,
+                        help="Number of pairs / currencies to show")
+    parser.add_argument("--json", action="store_true", help="Print JSON")
+    args = parser.parse_args(argv)
+
+    lines = iter_log_lines(args.log_file, include_rotated=not args.no_rotated)
+    stats = analyze_lines(lines, since=args.since, until=args.until)
+    summary = report(stats, top=args.top)
+    if args.json:
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+    else:
+        _print_report(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,22 @@
 """Logger factory for named loggers.
 logging: Base logging module.
 StreamHandler: Logs to console (stdout).
-RotatingFileHandler: Rotates logs based on file size.
-TimedRotatingFileHandler: Rotates logs based on time (e.g., daily).
-os is used to read environment variables via os.getenv()
+create_file_handler: Rotates logs based on file size or time (e.g., daily)
+and compresses the rotated files in the background (see rotation.py).
+Settings (level, file, rotation) come from config.get_settings(),
+which is only read when the first logger is set up.
 
 
 """
 
+import atexit
 import logging
 from logging import StreamHandler
-from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
-from modular_logger.config import LOG_LEVEL, LOG_FILE, get_env_int
+from config import get_settings
+from modular_logger.filters import SamplingFilter
 from modular_logger.formatters import JsonFormatter, color_formatter, file_formatter
 from modular_logger.handlers import get_discord_handler
-import os
+from modular_logger.rotation import create_file_handler
 
 
 def setup_logger(name=__name__, use_discord=False, json_format=False) -> logging.Logger:
@@ -28,39 +30,24 @@ def setup_logger(name=__name__, use_discord=False, json_format=False) -> logging
     logger.propagate = False # Prevents log records passing up to parents.
     #
 
-    logger.setLevel(LOG_LEVEL)
+    settings = get_settings()
+
+    logger.setLevel(settings.log_level)
 
     # Console
     # Creates a console output handler.
     # Applies same level as logger (e.g., INFO or DEBUG).
     local_console = StreamHandler()
-    local_console.setLevel(LOG_LEVEL)
+    local_console.setLevel(settings.log_level)
     local_console.setFormatter(JsonFormatter() if json_format else color_formatter)
     logger.addHandler(local_console)
 
     # Read environment variable LOG_ROTATION_STRATEGY
     # to determine how to rotate logs (SIZE or TIME).
-    rotation_strategy = (os.getenv("LOG_ROTATION_STRATEGY") or "SIZE").upper()
-    # Specifies how many rotated log files to keep, here, 5 has been specified.
-    backup_count = get_env_int("LOG_BACKUP_COUNT", 5)
-
-    if rotation_strategy == "SIZE":
-        rotation_max_bytes = get_env_int("LOG_ROTATION_SIZE_MB", 5) * 1024 * 1024
-        file_log_handler = RotatingFileHandler(
-            LOG_FILE,
-            maxBytes=rotation_max_bytes,
-            backupCount=backup_count,
-            encoding="utf-8"
-        )
-    else:
-        # when is a string like "midnight", "H", "D".
-        when = os.getenv("LOG_ROTATION_TIME", "midnight")
-        file_log_handler = TimedRotatingFileHandler(
-            LOG_FILE,
-            when=when,
-            backupCount=backup_count,
-            encoding="utf-8"
-        )
+    # Rotated files are compressed and pruned on a background thread
+    # (LOG_COMPRESSION, LOG_BACKUP_COUNT, LOG_RETENTION_TOTAL_MB).
+    rotation_strategy = settings.log_rotation_strategy
+    file_log_handler = create_file_handler(settings, rotation_strategy)
 
     file_log_handler.setFormatter(JsonFormatter() if json_format else file_formatter)
     logger.addHandler(file_log_handler)
@@ -74,4 +61,11 @@ def setup_logger(name=__name__, use_discord=False, json_format=False) -> logging
         if discord:
             logger.addHandler(discord)
 
+    # Rate-limit and sample hot-path records (LOG_SAMPLING, LOG_RATE_LIMIT).
+    sampling_filter = SamplingFilter.from_settings(settings)
+    for handler in logger.handlers:
+        handler.addFilter(sampling_filter)
+    sampling_filter.start_flushing()
+    atexit.register(sampling_filter.close)
+
     return logger
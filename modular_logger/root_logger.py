@@ -1,60 +1,108 @@
-"""Global root logger setup with console, file, and optional Discord handlers."""
+"""Global root logger setup with console, file, and optional Discord handlers.
 
+Importing this module only creates the named logger; it does not create
+directories, open files or check the Discord webhook. The handlers are
+installed by init_logging(), which entry points (main.py, the GUI, the
+launcher) call once at start-up. It is safe to call more than once.
+Library users who never call it only get Python's default
+"warnings and above to stderr" behaviour.
+"""
+
+import atexit
 import logging
-from logging import StreamHandler
-from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
-from modular_logger.config import LOG_LEVEL, LOG_FILE, get_env_int
-from modular_logger.formatters import color_formatter, file_formatter
-from modular_logger.handlers import get_discord_handler
-import os
-
-# Here, the user will choose between time and size rotations strategies.
-# The default is SIZE, in the event that this is unchosen or invalid.
-# The user can choose between the two strategies via the .env file.
-rotation_strategy = (os.getenv("LOG_ROTATION_STRATEGY") or "SIZE").upper()
-if rotation_strategy not in {"SIZE", "TIME"}:
-    print(f"⚠️ Invalid LOG_ROTATION_STRATEGY '{rotation_strategy}', defaulting to 'SIZE'.")
-    rotation_strategy = "SIZE"
-
-backup_count = get_env_int("LOG_BACKUP_COUNT", 5)
-
-global_handlers = []
-
-# Console
-root_console_handler = StreamHandler()
-root_console_handler.setLevel(LOG_LEVEL)
-root_console_handler.setFormatter(color_formatter)
-global_handlers.append(root_console_handler)
-
-# File (Rotating or Timed)
-#
-if rotation_strategy == "SIZE":
-    max_bytes = get_env_int("LOG_ROTATION_SIZE_MB", 5) * 1024 * 1024
-    root_file_handler = RotatingFileHandler(
-        LOG_FILE, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
-    )
-else:
-    rotation_when = os.getenv("LOG_ROTATION_TIME", "midnight")
-    root_file_handler = TimedRotatingFileHandler(
-        LOG_FILE, when=rotation_when, backupCount=backup_count, encoding="utf-8"
-    )
+import sys
+import threading
+
+logger = logging.getLogger(__name__)
+
+_init_lock = threading.Lock()
+_initialized = False
+# The root handlers' SamplingFilter, whose pending summaries are flushed
+# when it is replaced and at exit.
+_sampling_filter = None
+
+
+def init_logging(force: bool = False) -> None:
+    """Install the console, file and optional Discord handlers on the root
+    logger. Later calls do nothing unless force is True.
+    """
+    global _initialized
+    with _init_lock:
+        if _initialized and not force:
+            return
+        _install_root_handlers()
+        if not _initialized:
+            atexit.register(_flush_log_summaries)
+        _initialized = True
+
+
+def _flush_log_summaries() -> None:
+    # Registered after logging's own atexit hook, so it runs before the
+    # handlers are shut down.
+    if _sampling_filter is not None:
+        _sampling_filter.close()
+
 
-root_file_handler.setFormatter(file_formatter)
-global_handlers.append(root_file_handler)
+def _install_root_handlers() -> None:
+    from logging import StreamHandler
+    from config import get_settings
+    from modular_logger.filters import SamplingFilter
+    from modular_logger.formatters import color_formatter, file_formatter
+    from modular_logger.handlers import get_discord_handler
+    from modular_logger.rotation import create_file_handler
+    from tracing import trace_handler
 
-# Optional Discord
-# Adds Discord handler only if valid and available.
-discord_handler = get_discord_handler()
-if discord_handler:
-    global_handlers.append(discord_handler)
+    settings = get_settings()
+
+    # Here, the user will choose between time and size rotations strategies.
+    # The default is SIZE, in the event that this is unchosen or invalid.
+    # The user can choose between the two strategies via the .env file.
+    rotation_strategy = settings.log_rotation_strategy
+    if rotation_strategy not in {"SIZE", "TIME"}:
+        print(f"⚠️ Invalid LOG_ROTATION_STRATEGY '{rotation_strategy}', defaulting to 'SIZE'.",
+              file=sys.stderr)
+        rotation_strategy = "SIZE"
+
+    global_handlers = []
+
+    # Console
+    root_console_handler = StreamHandler()
+    root_console_handler.setLevel(settings.log_level)
+    root_console_handler.setFormatter(color_formatter)
+    global_handlers.append(root_console_handler)
+
+    # File (Rotating or Timed)
+    # Rotated files are compressed and pruned on a background thread.
+    root_file_handler = create_file_handler(settings, rotation_strategy)
+
+    root_file_handler.setFormatter(file_formatter)
+    global_handlers.append(root_file_handler)
+
+    # Optional Discord
+    # Adds Discord handler only if valid and available.
+    discord_handler = get_discord_handler()
+    if discord_handler:
+        global_handlers.append(discord_handler)
+
+    # One shared instance, so each record is sampled once for all handlers.
+    global _sampling_filter
+    if _sampling_filter is not None:
+        _sampling_filter.close()
+    sampling_filter = _sampling_filter = SamplingFilter.from_settings(settings)
+    sampling_filter.start_flushing()
+    for handler in global_handlers:
+        handler.addFilter(sampling_filter)
+        trace_handler(handler)  # only timed when TRACE_SAMPLE_RATE > 0
+
+    logging.basicConfig(
+        level=settings.log_level,
+        handlers=global_handlers,
+        force=True  # Python 3.8+: clears existing handlers
+    )
 
-logging.basicConfig(
-    level=LOG_LEVEL,
-    handlers=global_handlers,
-    force=True  # Python 3.8+: clears existing handlers
-)
+    logging.info(f"Logger initialized at level {settings.log_level} with rotation strategy "
+                 f"{rotation_strategy}")
 
-logging.info(f"Logger initialized at level {LOG_LEVEL} with rotation strategy "
-             f"{rotation_strategy}")
 
-logger = logging.getLogger(__name__)
\ No newline at end of file
+if __name__ == "__main__":
+    init_logging()
@@ -0,0 +1,269 @@
+"""Rotating file handlers that compress rotated logs in the background.
+
+CompressingRotatingFileHandler / CompressingTimedRotatingFileHandler:
+drop-in replacements for RotatingFileHandler / TimedRotatingFileHandler.
+On rollover the live file is renamed to a timestamped segment, e.g.
+converter.log.20250101-120000-123456. A background thread then compresses
+it (gzip, or zstd if the zstandard package is installed) and applies
+retention. The thread that is logging only pays for the rename.
+
+Retention keeps at most backup_count segments and, if max_total_bytes is
+set, deletes the oldest segments until the rest fit within that budget.
+
+iter_log_lines() streams a log and all of its rotated segments, oldest
+first, decompressing as needed, so readers never care which segments
+have been compressed yet.
+"""
+
+import gzip
+import io
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime
+from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; gzip is always available.
+    zstandard = None
+
+COMPRESSED_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def resolve_compression(name: str | None) -> str | None:
+    """Map a LOG_COMPRESSION value to 'gzip', 'zstd' or None (no compression).
+
+    'auto' picks zstd when available and falls back to gzip.
+    """
+    name = (name or "none").strip().lower()
+    if name in ("", "none", "off"):
+        return None
+    if name == "auto":
+        return "zstd" if zstandard is not None else "gzip"
+    if name == "zstd" and zstandard is None:
+        return "gzip"
+    if name not in COMPRESSED_SUFFIXES:
+        raise ValueError(f"Unknown log compression '{name}'. "
+                         f"Use one of: auto, gzip, zstd, none")
+    return name
+
+
+def compress_file(source: str, compression: str) -> str:
+    """Compress source next to itself, remove it, and return the new path."""
+    destination = source + COMPRESSED_SUFFIXES[compression]
+    partial = destination + ".tmp"
+    with open(source, "rb") as src:
+        if compression == "zstd":
+            with open(partial, "wb") as raw:
+                with zstandard.ZstdCompressor(level=3).stream_writer(raw) as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+        else:
+            with gzip.open(partial, "wb", compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+    # Keep the segment's age so retention and readers still order it correctly.
+    stat = os.stat(source)
+    os.utime(partial, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    os.replace(partial, destination)
+    os.remove(source)
+    return destination
+
+
+def list_log_segments(log_file: str | os.PathLike) -> list[Path]:
+    """Rotated segments of log_file (not the live file itself), oldest first."""
+    log_path = Path(log_file)
+    if not log_path.parent.is_dir():
+        return []
+    prefix = log_path.name + "."
+    segments = [
+        path for path in log_path.parent.iterdir()
+        if path.name.startswith(prefix) and not path.name.endswith(".tmp")
+        and path.is_file()
+    ]
+    return sorted(segments, key=lambda path: (path.stat().st_mtime, path.name))
+
+
+def apply_retention(log_file: str | os.PathLike, backup_count: int,
+                    max_total_bytes: int = 0) -> list[Path]:
+    """Delete the oldest segments beyond backup_count or max_total_bytes.
+
+    A value of 0 disables that limit. Returns the deleted paths.
+    """
+    segments = list_log_segments(log_file)
+    keep: list[Path] = []
+    kept_bytes = 0
+    for segment in reversed(segments):  # newest first
+        size = segment.stat().st_size
+        if backup_count and len(keep) >= backup_count:
+            break
+        if max_total_bytes and kept_bytes + size > max_total_bytes:
+            break
+        keep.append(segment)
+        kept_bytes += size
+
+    deleted = [segment for segment in segments if segment not in keep]
+    for segment in deleted:
+        try:
+            segment.unlink()
+        except FileNotFoundError:
+            pass
+    return deleted
+
+
+def open_log_segment(path: str | os.PathLike) -> io.TextIOBase:
+    """Open a plain, .gz or .zst log file for reading text."""
+    path = str(path)
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"zstandard is required to read {path}")
+        raw = open(path, "rb")
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace")
+
+
+def iter_log_lines(log_file: str | os.PathLike,
+                   include_rotated: bool = True) -> Iterator[str]:
+    """Yield every line of log_file's rotated segments then the live file,
+    oldest first, one line at a time (nothing is read into memory whole).
+    """
+    paths = list_log_segments(log_file) if include_rotated else []
+    if os.path.exists(log_file):
+        paths.append(Path(log_file))
+    for path in paths:
+        try:
+            with open_log_segment(path) as f:
+                yield from f
+        except FileNotFoundError:
+            # Compressed or deleted by retention while we were listing.
+            continue
+
+
+class _CompressingRotationMixin:
+
+    """Shared rollover logic for the size- and time-based handlers."""
+
+    def _init_compression(self, compression: str | None, backup_count: int,
+                          max_total_bytes: int) -> None:
+        self.compression = resolve_compression(compression)
+        self.retention_count = backup_count
+        self.max_total_bytes = max_total_bytes
+        self.rotator = self._rotate_to_segment
+        self._jobs: queue.Queue = queue.Queue()
+        self._worker: threading.Thread | None = None
+        self._worker_lock = threading.Lock()
+
+    def _rotate_to_segment(self, source: str, dest: str) -> None:
+        # dest is the numbered name the stdlib handler would have used; a
+        # timestamped name avoids renaming every older backup on each rollover.
+        if not os.path.exists(source):
+            return
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        segment = f"{self.baseFilename}.{stamp}"
+        os.replace(source, segment)
+        self._submit(segment)
+
+    def _submit(self, segment: str) -> None:
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run_jobs, name="log-compressor", daemon=True)
+                self._worker.start()
+        self._jobs.put(segment)
+
+    def _run_jobs(self) -> None:
+        while True:
+            segment = self._jobs.get()
+            try:
+                if segment is None:
+                    return
+                if self.compression:
+                    compress_file(segment, self.compression)
+                apply_retention(self.baseFilename, self.retention_count,
+                                self.max_total_bytes)
+            except Exception as e:
+                # Never let housekeeping take down the process that logs.
+                print(f"⚠️ Log compression failed for {segment}: {e}", file=sys.stderr)
+            finally:
+                self._jobs.task_done()
+
+    def wait_for_compression(self, timeout: float | None = None) -> bool:
+        """Block until queued segments are processed. Returns False on timeout."""
+        if self._worker is None:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._jobs.all_tasks_done:
+            while self._jobs.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._jobs.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self) -> None:
+        super().close()
+        with self._worker_lock:
+            worker, self._worker = self._worker, None
+        if worker is not None:
+            self._jobs.put(None)
+            worker.join(timeout=30)
+
+
+class CompressingRotatingFileHandler(_CompressingRotationMixin, RotatingFileHandler):
+
+    """RotatingFileHandler whose rotated files are compressed in the background."""
+
+    def __init__(self, filename, maxBytes=0, backupCount=5, encoding=None,
+                 delay=False, compression="auto", max_total_bytes=0):
+        # The stdlib handler only rotates when backupCount > 0; retention is
+        # ours, so it always gets at least 1.
+        super().__init__(filename, maxBytes=maxBytes, backupCount=max(backupCount, 1),
+                         encoding=encoding, delay=delay)
+        self._init_compression(compression, backupCount, max_total_bytes)
+
+
+class CompressingTimedRotatingFileHandler(_CompressingRotationMixin,
+                                          TimedRotatingFileHandler):
+
+    """TimedRotatingFileHandler whose rotated files are compressed in the background."""
+
+    def __init__(self, filename, when="midnight", interval=1, backupCount=5,
+                 encoding=None, delay=False, compression="auto", max_total_bytes=0):
+        # backupCount=0 stops the stdlib handler deleting segments itself.
+        super().__init__(filename, when=when, interval=interval, backupCount=0,
+                         encoding=encoding, delay=delay)
+        self._init_compression(compression, backupCount, max_total_bytes)
+
+
+def create_file_handler(settings, rotation_strategy: str):
+    """Build the compressing file handler described by settings.
+
+    rotation_strategy is 'SIZE' or 'TIME'. Used by both init_logging()
+    and setup_logger() so they rotate, compress and prune identically.
+    """
+    settings.log_dir.mkdir(parents=True, exist_ok=True)
+    max_total_bytes = settings.log_retention_total_mb * 1024 * 1024
+    if rotation_strategy == "SIZE":
+        return CompressingRotatingFileHandler(
+            settings.log_file,
+            maxBytes=settings.log_rotation_size_mb * 1024 * 1024,
+            backupCount=settings.log_backup_count,
+            encoding="utf-8",
+            compression=settings.log_compression,
+            max_total_bytes=max_total_bytes,
+        )
+    return CompressingTimedRotatingFileHandler(
+        settings.log_file,
+        when=settings.log_rotation_time,
+        backupCount=settings.log_backup_count,
+        encoding="utf-8",
+        compression=settings.log_compression,
+        max_total_bytes=max_total_bytes,
+    )
@@ -1,6 +1,5 @@
 import sys
 import os
-import pandas as pd
 import pprint
 
 
@@ -9,12 +8,13 @@ def resource_path(relative_path: str) -> str:
     Get the absolute path to a resource, works for development and for PyInstaller.
 
     PyInstaller bundles files into a temporary folder accessible via sys._MEIPASS.
-    If not running in a PyInstaller bundle, return the path relative to the current directory.
+    If not running in a PyInstaller bundle, return the path relative to the project
+    root (the folder holding this file), so it works from any current directory.
     """
     try:
         base_path = sys._MEIPASS  # PyInstaller temporary folder
     except AttributeError:
-        base_path = os.path.abspath(".")
+        base_path = os.path.dirname(os.path.abspath(__file__))
     return os.path.join(base_path, relative_path)
 
 
@@ -25,6 +25,10 @@ def generate_currency_dictionary() -> dict:
 
     The dictionary is also pretty-printed for easier visual inspection.
     """
+    # pandas is imported here rather than at module level so that
+    # importing resource_path does not pay for loading pandas.
+    import pandas as pd
+
     csv_path = resource_path('data/physical_currency_list.csv')
     df = pd.read_csv(csv_path)
     currency_dict = dict(zip(df.iloc[:, 1], df.iloc[:, 0]))
@@ -0,0 +1,181 @@
+"""On-demand stack-sampling profiler for running converter processes.
+
+Nothing is sampled until asked for, so an armed process pays nothing
+while idle:
+
+- PROFILE_ON_SIGNAL=1: `kill -USR1 <pid>` starts a run (POSIX only).
+- PROFILE_AT_START=1: a run starts as soon as the process is up.
+
+A run samples every thread's Python stack every PROFILE_INTERVAL_MS for
+PROFILE_SECONDS on a background thread, then writes the counts in
+collapsed-stack format (one "thread;outer;...;inner count" line per
+distinct stack) to logs/profile_<timestamp>_<pid>.collapsed, ready for
+flamegraph.pl, speedscope or inferno:
+
+    flamegraph.pl logs/profile_*.collapsed > profile.svg
+
+main.py and the GUI call install_profiler_hook() at start-up.
+"""
+
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from types import FrameType
+
+logger = logging.getLogger(__name__)
+
+MAX_STACK_DEPTH = 256
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    # Keyed on the function, not the current line, so samples aggregate.
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse_stack(frame: FrameType | None, thread_name: str) -> str:
+    """thread;outermost;...;innermost for one thread's current stack."""
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.append(thread_name.replace(";", ":"))
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+
+    """Samples every thread's stack at a fixed interval for a fixed time."""
+
+    def __init__(self, duration: float = 30.0, interval: float = 0.005,
+                 output_dir: Path | str = "logs"):
+        self.duration = duration
+        self.interval = interval
+        self.output_dir = Path(output_dir)
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.output_path: Path | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """Start a run in the background. False if one is already running."""
+        if self.running:
+            return False
+        self.stacks.clear()
+        self.samples = 0
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler",
+                                        daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        """End the current run early; its samples are still written."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def sample(self) -> None:
+        """Record one sample of every thread except the profiler's own."""
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident != own:
+                self.stacks[collapse_stack(frame, names.get(ident, f"thread-{ident}"))] += 1
+        self.samples += 1
+
+    def _run(self) -> None:
+        logger.info(f"Profiling for {self.duration:g}s "
+                    f"(sampling every {self.interval * 1000:g} ms)")
+        deadline = time.monotonic() + self.duration
+        next_sample = time.monotonic()
+        while not self._stop.is_set() and next_sample < deadline:
+            self.sample()
+            next_sample += self.interval
+            # Fixed-rate schedule; a slow sample skips ticks rather than
+            # bunching them up afterwards.
+            now = time.monotonic()
+            if next_sample < now:
+                next_sample = now
+            self._stop.wait(next_sample - now)
+        try:
+            self.output_path = self.write()
+            logger.info(f"Profile written to {self.output_path} ({self.samples} samples, "
+                        f"{len(self.stacks)} distinct stacks)")
+        except OSError as e:
+            logger.error(f"Could not write the profile: {e}")
+
+    def write(self, path: Path | str | None = None) -> Path:
+        if path is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = self.output_dir / f"profile_{timestamp}_{os.getpid()}.collapsed"
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+_profiler: SamplingProfiler | None = None
+
+
+def get_profiler() -> SamplingProfiler:
+    """The process-wide profiler, configured from settings on first use."""
+    global _profiler
+    if _profiler is None:
+        from config import get_settings
+        settings = get_settings()
+        _profiler = SamplingProfiler(settings.profile_seconds,
+                                     settings.profile_interval_ms / 1000,
+                                     settings.log_dir)
+    return _profiler
+
+
+def start_profiling() -> bool:
+    """Start a run with the configured settings (no-op if one is running)."""
+    started = get_profiler().start()
+    if not started:
+        logger.warning("A profile is already being recorded; ignoring the request")
+    return started
+
+
+def _on_signal(signum, frame) -> None:
+    # Runs on the main thread between bytecodes; only starts the sampler thread.
+    start_profiling()
+
+
+def install_profiler_hook() -> bool:
+    """Arm the profiler as configured (PROFILE_ON_SIGNAL, PROFILE_AT_START).
+
+    Must be called from the main thread. Returns True if the signal handler
+    was installed, in which case an event loop that runs outside Python
+    (Qt) has to let the interpreter run now and then for it to fire.
+    """
+    from config import get_settings
+    settings = get_settings()
+    installed = False
+    if settings.profile_on_signal:
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, _on_signal)
+            installed = True
+            logger.info(f"Profiler armed: kill -USR1 {os.getpid()} records "
+                        f"{settings.profile_seconds:g}s of stacks to {settings.log_dir}")
+        else:
+            logger.warning("PROFILE_ON_SIGNAL is set but this platform has no SIGUSR1; "
+                           "use PROFILE_AT_START instead")
+    if settings.profile_at_start:
+        start_profiling()
+    return installed
@@ -0,0 +1,216 @@
+"""Record and replay upstream exchange-rate traffic.
+
+With RATE_CAPTURE_FILE set, the pooled session in currency_utils sends
+requests through RecordingAdapter, which appends every exchange (method,
+URL with the API key redacted, status, headers, body, latency, or the
+exception raised) to a gzip-compressed JSON-lines file.
+
+With RATE_REPLAY_FILE set instead, ReplayAdapter answers from such a file
+without touching the network: each request gets the next recorded
+response for the same method and path, in recorded order, after the
+recorded latency multiplied by RATE_REPLAY_LATENCY_SCALE (1 = original
+timing, 0 = instant). Recorded failures are raised again, and a request
+that was never recorded fails like an unreachable host. Benchmarks and
+regression tests of the conversion paths can therefore run offline and
+deterministically against real response shapes and timings:
+
+    RATE_CAPTURE_FILE=rates.jsonl.gz python launcher.py batch < day.txt
+    RATE_REPLAY_FILE=rates.jsonl.gz RATE_REPLAY_LATENCY_SCALE=0 \\
+        python benchmarks/bench_fx_accessor.py
+
+Requests are matched on method and path only, so a capture replays under
+any EXCHANGE_RATE_BASE_URL host (with the same path prefix). The key is
+stored as a placeholder, but replay still needs EXCHANGE_RATE_API_KEY set
+to something, since the provider will not send a request without one.
+"""
+
+import atexit
+import gzip
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterable
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.exceptions import RequestException
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+REDACTED = "{api_key}"
+
+
+@dataclass
+class RecordedExchange:
+    method: str
+    path: str
+    status: int | None = None
+    headers: dict[str, str] = field(default_factory=dict)
+    body: str = ""
+    latency_ms: float = 0.0
+    # Name of the requests exception raised instead of a response.
+    error: str | None = None
+
+
+def redact_path(url: str, secrets: Iterable[str | None] = ()) -> str:
+    """Path and query of url, with every secret replaced by a placeholder."""
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    for secret in secrets:
+        if secret:
+            path = path.replace(secret, REDACTED)
+    return path
+
+
+class CaptureWriter:
+
+    """Appends exchanges to a gzip JSON-lines file. Thread-safe.
+
+    Each record is flushed as it is written, so a killed process loses at
+    most the exchange in flight.
+    """
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = gzip.open(self.path, "at", encoding="utf-8")
+        self._lock = threading.Lock()
+        self.written = 0
+        atexit.register(self.close)
+
+    def write(self, exchange: RecordedExchange) -> None:
+        line = json.dumps(asdict(exchange), separators=(",", ":"))
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.written += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+def load_capture(path: Path | str) -> list[RecordedExchange]:
+    """Every exchange in a capture file, in recorded order."""
+    exchanges = []
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            try:
+                exchanges.append(RecordedExchange(**json.loads(line)))
+            except (ValueError, TypeError) as e:
+                # A capture cut short mid-line still replays up to there.
+                logger.warning(f"Skipping line {number} of {path}: {e}")
+    return exchanges
+
+
+class RecordingAdapter(HTTPAdapter):
+
+    """A pooled HTTPAdapter that also records every exchange it sends."""
+
+    def __init__(self, writer: CaptureWriter, secrets: Iterable[str | None] = (), **kwargs):
+        super().__init__(**kwargs)
+        self.writer = writer
+        self.secrets = tuple(secrets)
+
+    def send(self, request, **kwargs):
+        path = redact_path(request.url, self.secrets)
+        started = time.perf_counter()
+        try:
+            response = super().send(request, **kwargs)
+            body = response.content  # read it all now, so latency covers the body
+        except RequestException as e:
+            self.writer.write(RecordedExchange(
+                request.method, path, latency_ms=(time.perf_counter() - started) * 1000,
+                error=type(e).__name__))
+            raise
+        self.writer.write(RecordedExchange(
+            request.method, path, response.status_code, dict(response.headers),
+            body.decode("utf-8", errors="replace"),
+            (time.perf_counter() - started) * 1000))
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+
+    """Serves recorded exchanges instead of sending requests. Thread-safe."""
+
+    def __init__(self, exchanges: Iterable[RecordedExchange],
+                 secrets: Iterable[str | None] = (), latency_scale: float = 1.0,
+                 loop: bool = True):
+        super().__init__()
+        self.secrets = tuple(secrets)
+        self.latency_scale = latency_scale
+        # Start over from the first recording once a path's are used up, so a
+        # short capture can drive a long benchmark.
+        self.loop = loop
+        self._recorded: dict[tuple[str, str], list[RecordedExchange]] = defaultdict(list)
+        for exchange in exchanges:
+            self._recorded[(exchange.method, exchange.path)].append(exchange)
+        self._queues = {key: deque(items) for key, items in self._recorded.items()}
+        self._lock = threading.Lock()
+        self.replayed = 0
+        self.missing = 0
+
+    @classmethod
+    def from_file(cls, path: Path | str, **kwargs) -> "ReplayAdapter":
+        adapter = cls(load_capture(path), **kwargs)
+        logger.info(f"Replaying {sum(map(len, adapter._recorded.values()))} recorded "
+                    f"exchanges from {path}")
+        return adapter
+
+    def _next(self, key: tuple[str, str]) -> RecordedExchange | None:
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue:
+                if not (self.loop and key in self._recorded):
+                    self.missing += 1
+                    return None
+                queue = self._queues[key] = deque(self._recorded[key])
+            self.replayed += 1
+            return queue.popleft()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None,
+             proxies=None):
+        key = (request.method, redact_path(request.url, self.secrets))
+        exchange = self._next(key)
+        if exchange is None:
+            raise requests.exceptions.ConnectionError(
+                f"No recorded response for {key[0]} {key[1]}", request=request)
+
+        delay = exchange.latency_ms / 1000 * self.latency_scale
+        read_timeout = timeout[-1] if isinstance(timeout, tuple) else timeout
+        if read_timeout is not None and delay > read_timeout:
+            time.sleep(read_timeout)
+            raise requests.exceptions.ReadTimeout(
+                f"Replayed response took {delay:.3f}s (timeout {read_timeout}s)",
+                request=request)
+        if delay > 0:
+            time.sleep(delay)
+        if exchange.error is not None:
+            error = getattr(requests.exceptions, exchange.error, None)
+            if not (isinstance(error, type) and issubclass(error, RequestException)):
+                error = requests.exceptions.ConnectionError
+            raise error(f"Replayed {exchange.error}", request=request)
+
+        response = requests.Response()
+        response.status_code = exchange.status
+        response.headers = CaseInsensitiveDict(exchange.headers)
+        response._content = exchange.body.encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        response.reason = "Replayed"
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
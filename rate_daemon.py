@@ -0,0 +1,262 @@
+"""Rate-cache daemon shared by every converter instance on a host.
+
+The daemon owns the upstream client, the rate table and its refresher.
+It keeps one /latest table (default base USD) current in the background,
+conditionally and only once upstream has published an update, and
+answers any pair as a cross rate from that table. However many converter
+instances point at it, the API sees one client.
+
+Protocol: one JSON object per line, over TCP or a Unix socket.
+
+    -> {"op": "rate", "from": "EUR", "to": "JPY"}
+    <- {"ok": true, "rate": 162.3, "provider": "rate-daemon", "version": 4}
+    <- {"ok": false, "error": "unsupported-code"}
+    -> {"op": "stats"}     counters, table version and age
+    -> {"op": "ping"}
+
+    python launcher.py rate-daemon --listen 127.0.0.1:8765
+    python launcher.py rate-daemon --listen unix:/tmp/rates.sock
+
+Converter processes use it by setting RATE_DAEMON_ADDRESS to the same
+address; DaemonRateProvider falls back to a direct fetch whenever the
+daemon cannot answer.
+"""
+
+import argparse
+import json
+import logging
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+from rate_providers import RateProvider, RateQuote
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ADDRESS = "127.0.0.1:8765"
+
+
+def parse_address(address: str) -> tuple[int, str | tuple[str, int]]:
+    """'unix:/path' or 'host:port' -> (socket family, address)."""
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+class RateDaemon:
+
+    """Serves cross rates from one background-refreshed RateTableProvider table."""
+
+    def __init__(self, tables, base: str = "USD"):
+        self.tables = tables
+        self.base = base.upper()
+        self.stats: Counter = Counter()
+        self._stats_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._refresher: threading.Thread | None = None
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def quote(self, from_currency: str, to_currency: str) -> dict:
+        self._count("requests")
+        table, error = self.tables.get_table(self.base)
+        if table is None:
+            self._count("errors")
+            return {"ok": False, "error": error or "no-table"}
+        from_rate = table.rates.get(from_currency.upper())
+        to_rate = table.rates.get(to_currency.upper())
+        if not from_rate or to_rate is None:
+            return {"ok": False, "error": "unsupported-code"}
+        return {"ok": True, "rate": to_rate / from_rate,
+                "provider": "rate-daemon", "version": table.version}
+
+    def handle(self, request: dict) -> dict:
+        op = request.get("op")
+        if op == "rate":
+            return self.quote(str(request.get("from", "")), str(request.get("to", "")))
+        if op == "stats":
+            table = self.tables.table(self.base)
+            with self._stats_lock:
+                stats = dict(self.stats)
+            return {"ok": True, "base": self.base, "stats": stats,
+                    "version": table.version if table else 0,
+                    "time_last_update_unix": table.time_last_update_unix if table else 0}
+        if op == "ping":
+            return {"ok": True}
+        return {"ok": False, "error": "unknown-op"}
+
+    def start_refresher(self) -> None:
+        """Refresh the table in the background whenever it falls due, so
+        requests never wait on the upstream.
+        """
+        def run() -> None:
+            while not self._stop.is_set():
+                table, error = self.tables.get_table(self.base)
+                if table is None:
+                    logger.error(f"Rate daemon could not load {self.base}: {error}")
+                    wait = self.tables.min_poll_interval
+                else:
+                    wait = min(max(table.next_poll_unix - time.time(), 1.0), 3600.0)
+                self._stop.wait(wait)
+
+        self._refresher = threading.Thread(target=run, name="rate-refresher", daemon=True)
+        self._refresher.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+
+    def handle(self) -> None:
+        daemon: RateDaemon = self.server.rate_daemon
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                response = daemon.handle(request if isinstance(request, dict) else {})
+            except ValueError:
+                response = {"ok": False, "error": "bad-request"}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+
+def create_server(daemon: RateDaemon, address: str) -> socketserver.BaseServer:
+    """Bind a server for daemon on address (see parse_address). Port 0 picks
+    a free port; the bound address is server.server_address.
+    """
+    family, bind_to = parse_address(address)
+    if family == socket.AF_UNIX:
+        if os.path.exists(bind_to):
+            os.remove(bind_to)  # stale socket from a previous run
+        server = _UnixServer(bind_to, _Handler)
+    else:
+        server = _TCPServer(bind_to, _Handler)
+    server.rate_daemon = daemon
+    return server
+
+
+class DaemonRateProvider(RateProvider):
+
+    """Client for a RateDaemon. Each thread keeps one connection open.
+
+    Any failure to reach the daemon is returned as 'daemon-unavailable'
+    within timeout, so a FallbackRateProvider can go direct instead. After
+    a failure the daemon is not tried again for retry_after seconds.
+    """
+
+    def __init__(self, address: str, timeout: float = 0.25,
+                 retry_after: float = 5.0, name: str = "rate-daemon"):
+        self.address = address
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.name = name
+        self._family, self._target = parse_address(address)
+        self._local = threading.local()
+        self._down_until = 0.0
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            sock = socket.socket(self._family, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self._target)
+            conn = self._local.conn = (sock, sock.makefile("rb"))
+        return conn
+
+    def _drop_connection(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            conn[1].close()
+            conn[0].close()
+
+    def request(self, request: dict) -> dict:
+        sock, reader = self._connection()
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        line = reader.readline()
+        if not line:
+            raise ConnectionError("Rate daemon closed the connection")
+        return json.loads(line)
+
+    def get_quote(self, from_currency: str, to_currency: str) -> RateQuote:
+        if time.monotonic() < self._down_until:
+            return RateQuote(None, self.name, 0.0, "daemon-unavailable")
+        started = time.perf_counter()
+        try:
+            response = self.request({"op": "rate", "from": from_currency,
+                                     "to": to_currency})
+        except (OSError, ValueError) as e:
+            self._drop_connection()
+            self._down_until = time.monotonic() + self.retry_after
+            logger.warning(f"Rate daemon at {self.address} unavailable "
+                           f"({type(e).__name__}); fetching directly")
+            return RateQuote(None, self.name, (time.perf_counter() - started) * 1000,
+                             "daemon-unavailable")
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if not response.get("ok"):
+            return RateQuote(None, self.name, elapsed_ms, response.get("error", "Unknown"))
+        return RateQuote(response["rate"], self.name, elapsed_ms)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    from config import get_settings
+    from currency_utils import _get_session
+    from rate_table import RateTableProvider
+
+    parser = argparse.ArgumentParser(description="Run the local rate-cache daemon.")
+    parser.add_argument("--listen", help="host:port or unix:/path "
+                                         f"(default: RATE_DAEMON_ADDRESS or {DEFAULT_ADDRESS})")
+    parser.add_argument("--base", default="USD", help="Table to keep and cross from")
+    parser.add_argument("--publish-shm", action="store_true",
+                        help="Also publish the table to shared memory (RATE_SHM_NAME)")
+    args = parser.parse_args(argv)
+
+    settings = get_settings()
+    tables = RateTableProvider(settings.exchange_rate_base_url,
+                               settings.require_api_key(),
+                               session_factory=_get_session,
+                               min_poll_interval=settings.rate_min_poll_seconds)
+    publisher = None
+    if args.publish_shm:
+        from shared_rates import DEFAULT_SEGMENT_NAME, SharedRatePublisher, heartbeat_interval
+        publisher = SharedRatePublisher(settings.rate_shm_name or DEFAULT_SEGMENT_NAME,
+                                        heartbeat_interval=heartbeat_interval(settings))
+        tables.add_listener(publisher.on_table_change)
+
+    daemon = RateDaemon(tables, base=args.base)
+    daemon.start_refresher()
+    address = args.listen or settings.rate_daemon_address or DEFAULT_ADDRESS
+    server = create_server(daemon, address)
+    logger.info(f"Rate daemon serving {args.base} cross rates on {address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.stop()
+        server.server_close()
+        if publisher is not None:
+            publisher.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""Best-path conversion and arbitrage detection over a graph of rates.
+
+Every quote "1 A = r B" is an edge A -> B with weight -log(r). Adding
+weights multiplies rates, so the shortest path from A to B is the chain
+of conversions that yields the most B per A. Quotes can come from
+tables with different bases or gaps; an edge's inverse (B -> A at 1/r)
+is implied unless B -> A is quoted directly.
+
+RateGraph.precompute() runs Floyd-Warshall over all currencies at once
+with numpy (O(n^3) with vectorised inner loops; tens of milliseconds for
+the ~160 registry currencies). After that, best_rate() is an array lookup and
+best_path() walks a next-hop matrix. The precompute reruns lazily on the
+first query after quotes change, so hooking on_table_change up to a
+RateTableProvider keeps it current.
+
+A negative cycle (a loop whose rates multiply to more than 1) is either
+arbitrage or inconsistent quotes. find_arbitrage() lists them, and pairs
+whose best path could run through one get no answer from best_rate().
+
+Node indices follow the currency registry's ordinals, so results line up
+with other per-currency arrays; codes outside the registry are appended.
+"""
+
+import logging
+import math
+import threading
+from typing import Iterable
+
+import numpy as np
+
+from rate_providers import RateProvider, RateQuote
+
+logger = logging.getLogger(__name__)
+
+# Relative gain around a cycle below which it is treated as float rounding.
+DEFAULT_ARBITRAGE_TOLERANCE = 1e-9
+
+
+class RateGraph:
+
+    """All-pairs best conversion rates over a set of quotes."""
+
+    def __init__(self, codes: Iterable[str] | None = None,
+                 arbitrage_tolerance: float = DEFAULT_ARBITRAGE_TOLERANCE):
+        if codes is None:
+            from data.currency_registry import get_currency_registry
+            codes = get_currency_registry().codes
+        self.codes: list[str] = []
+        self._index: dict[str, int] = {}
+        for code in codes:
+            self._node(code)
+        self.arbitrage_tolerance = arbitrage_tolerance
+        self._quotes: dict[tuple[int, int], float] = {}
+        self._lock = threading.Lock()
+        self._dirty = True
+        self.version = 0
+        # Set together by precompute(): distances, next hops, negative-cycle
+        # nodes, and pairs whose best path may pass through such a cycle.
+        self._solved: tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray] | None = None
+
+    def _node(self, code: str) -> int:
+        code = code.upper()
+        index = self._index.get(code)
+        if index is None:
+            index = self._index[code] = len(self.codes)
+            self.codes.append(code)
+        return index
+
+    def add_quote(self, from_currency: str, to_currency: str, rate: float) -> None:
+        """Record 1 from_currency = rate to_currency, replacing any older quote."""
+        if not rate or rate <= 0 or not math.isfinite(rate):
+            raise ValueError(f"Invalid rate {rate} for {from_currency} -> {to_currency}")
+        with self._lock:
+            i, j = self._node(from_currency), self._node(to_currency)
+            if i != j:
+                self._quotes[(i, j)] = float(rate)
+                self._dirty = True
+
+    def add_table(self, base: str, rates: dict[str, float]) -> None:
+        """Record a whole table quoted against base."""
+        for code, rate in rates.items():
+            if code.upper() != base.upper():
+                self.add_quote(base, code, rate)
+
+    def on_table_change(self, table, changed: dict[str, float]) -> None:
+        """RateTableProvider listener: fold changed entries into the graph."""
+        self.add_table(table.base, changed)
+
+    def precompute(self) -> None:
+        """Solve all pairs now (otherwise done on the first query after a change)."""
+        with self._lock:
+            if not self._dirty and self._solved is not None:
+                return
+            n = len(self.codes)
+            weights = np.full((n, n), np.inf)
+            for (i, j), rate in self._quotes.items():
+                weights[i, j] = -math.log(rate)
+            for (i, j), rate in self._quotes.items():
+                if (j, i) not in self._quotes:
+                    weights[j, i] = math.log(rate)
+            self._dirty = False
+            version = self.version + 1
+
+        dist, next_hop = _floyd_warshall(weights)
+        # A cycle with gain g has weight -log(1 + g), i.e. about -g.
+        negative = np.diag(dist) < -math.log1p(self.arbitrage_tolerance)
+        if negative.any():
+            reachable = np.isfinite(dist).astype(np.int32)
+            tainted = (reachable[:, negative] @ reachable[negative, :]) > 0
+            logger.warning(f"Rate graph has {int(negative.sum())} currencies on "
+                           "arbitrage / inconsistent quote cycles")
+        else:
+            tainted = np.zeros((n, n), dtype=bool)
+
+        with self._lock:
+            self._solved = (dist, next_hop, negative, tainted)
+            self.version = version
+
+    def _solution(self):
+        if self._dirty or self._solved is None:
+            self.precompute()
+        return self._solved
+
+    def best_rate(self, from_currency: str, to_currency: str) -> float | None:
+        """Most to_currency obtainable for 1 from_currency over any path.
+
+        None if there is no path, or the answer is unbounded because the
+        path can pass through an arbitrage cycle.
+        """
+        dist, _, _, tainted = self._solution()
+        i = self._index.get(from_currency.upper())
+        j = self._index.get(to_currency.upper())
+        if i is None or j is None or i >= len(dist) or j >= len(dist):
+            return None
+        if tainted[i, j] or not np.isfinite(dist[i, j]):
+            return None
+        return math.exp(-dist[i, j])
+
+    def best_path(self, from_currency: str, to_currency: str) -> list[str] | None:
+        """Currencies along the best conversion path, ends included."""
+        dist, next_hop, _, tainted = self._solution()
+        i = self._index.get(from_currency.upper())
+        j = self._index.get(to_currency.upper())
+        if i is None or j is None or i >= len(dist) or j >= len(dist):
+            return None
+        if tainted[i, j] or not np.isfinite(dist[i, j]):
+            return None
+        path = [i]
+        while path[-1] != j and len(path) <= len(dist):
+            path.append(int(next_hop[path[-1], j]))
+        return [self.codes[node] for node in path]
+
+    def find_arbitrage(self) -> list[tuple[list[str], float]]:
+        """Distinct negative cycles as (codes, gain), e.g.
+        (['USD', 'EUR', 'GBP', 'USD'], 1.002): converting round the loop
+        multiplies the amount by gain.
+        """
+        dist, next_hop, negative, _ = self._solution()
+        cycles: dict[frozenset, tuple[list[str], float]] = {}
+        for start in np.flatnonzero(negative):
+            cycle = _walk_cycle(next_hop, int(start))
+            if not cycle:
+                continue
+            key = frozenset(cycle)
+            if key in cycles:
+                continue
+            with self._lock:
+                gain = 1.0
+                for a, b in zip(cycle, cycle[1:] + cycle[:1]):
+                    rate = self._quotes.get((a, b))
+                    gain *= rate if rate is not None else 1 / self._quotes[(b, a)]
+            codes = [self.codes[node] for node in cycle]
+            cycles[key] = (codes + codes[:1], gain)
+        return sorted(cycles.values(), key=lambda item: -item[1])
+
+
+def _floyd_warshall(weights: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """All-pairs shortest paths with next-hop reconstruction."""
+    n = len(weights)
+    dist = weights.copy()
+    np.fill_diagonal(dist, np.minimum(np.diag(dist), 0.0))
+    next_hop = np.where(np.isfinite(weights), np.arange(n)[None, :], -1)
+    np.fill_diagonal(next_hop, np.arange(n))
+    for k in range(n):
+        through_k = dist[:, k, None] + dist[None, k, :]
+        # A tiny margin stops float rounding on r * (1/r) loops from
+        # rewriting paths that are not actually better.
+        better = through_k < dist - 1e-12
+        if better.any():
+            dist = np.where(better, through_k, dist)
+            next_hop = np.where(better, next_hop[:, k, None], next_hop)
+    return dist, next_hop
+
+
+def _walk_cycle(next_hop: np.ndarray, start: int) -> list[int] | None:
+    """Follow next hops from start towards itself until a node repeats."""
+    seen: dict[int, int] = {}
+    path: list[int] = []
+    node = start
+    while node not in seen:
+        if node < 0 or len(path) > len(next_hop):
+            return None
+        seen[node] = len(path)
+        path.append(node)
+        node = int(next_hop[node, start])
+    return path[seen[node]:]
+
+
+class GraphRateProvider(RateProvider):
+
+    """Quotes the best multi-hop rate from a RateGraph."""
+
+    def __init__(self, graph: RateGraph, name: str = "rate-graph"):
+        self.graph = graph
+        self.name = name
+
+    def get_quote(self, from_currency: str, to_currency: str) -> RateQuote:
+        rate = self.graph.best_rate(from_currency, to_currency)
+        if rate is None:
+            return RateQuote(None, self.name, 0.0, "no-path")
+        return RateQuote(rate, self.name, 0.0)
@@ -0,0 +1,231 @@
+"""Pluggable exchange rate sources.
+
+RateProvider: the interface every source implements. get_quote(from, to)
+returns a RateQuote, which records which provider answered and how long
+it took.
+
+ExchangeRateApiProvider: the exchangerate-api.com pair endpoint
+(previously hard-wired into currency_utils).
+
+StaticRateProvider: rates from a local table or JSON file, e.g. a saved
+/latest response. Cross rates are derived through the table's base.
+
+FallbackRateProvider: tries providers in order and returns the first
+success, e.g. a local shared-memory table before the network.
+
+HedgedRateProvider: asks a primary provider first. If the primary has not
+answered within a latency budget (or has already failed), it also asks a
+secondary and takes whichever succeeds first. This caps tail latency at
+roughly hedge_after + the secondary's latency, instead of the primary's
+full timeout.
+"""
+
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable
+
+import requests
+from requests.exceptions import RequestException
+
+from tracing import propagate, span
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateQuote:
+    rate: float | None
+    provider: str
+    latency_ms: float
+    error: str | None = None
+    # HTTP status of a failed upstream answer, when there was one.
+    status: int | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.rate is not None
+
+
+def http_status(error: RequestException) -> int | None:
+    """Status code of the response behind a requests error, if any."""
+    response = getattr(error, "response", None)
+    return response.status_code if response is not None else None
+
+
+class RateProvider(ABC):
+
+    """A source of exchange rates. Implementations must be thread-safe."""
+
+    name: str = "provider"
+
+    @abstractmethod
+    def get_quote(self, from_currency: str, to_currency: str) -> RateQuote:
+        """Return the rate for 1 from_currency in to_currency.
+
+        Failures are reported as a RateQuote with rate None and an error,
+        not raised.
+        """
+
+    def get_rate(self, from_currency: str, to_currency: str) -> float | None:
+        return self.get_quote(from_currency, to_currency).rate
+
+
+class ExchangeRateApiProvider(RateProvider):
+
+    """exchangerate-api.com v6 pair endpoint."""
+
+    def __init__(self, base_url: str, api_key: str | None,
+                 session_factory: Callable[[], requests.Session] | None = None,
+                 timeout: float = 5, name: str = "exchangerate-api"):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+        self.name = name
+        if session_factory is None:
+            session = requests.Session()
+            session_factory = lambda: session  # noqa: E731
+        self._session_factory = session_factory
+
+    def get_quote(self, from_currency: str, to_currency: str) -> RateQuote:
+        if not self.api_key:
+            return RateQuote(None, self.name, 0.0, "missing-api-key")
+        url = f"{self.base_url}/{self.api_key}/pair/{from_currency}/{to_currency}"
+        logger.info(f"Fetching exchange rate: {from_currency} -> {to_currency} "
+                    f"from {self.name}")
+
+        # Latency and error types are logged in a fixed shape that
+        # modular_logger.log_analyzer parses back out of the log files.
+        started = time.perf_counter()
+        try:
+            with span("http.get", "http", provider=self.name) as request:
+                response = self._session_factory().get(url, timeout=self.timeout)
+                request.set(status=response.status_code)
+                response.raise_for_status()  # Raises HTTPError for bad responses
+            with span("json.parse", "json"):
+                data = response.json()
+        except RequestException as req_err:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            logger.exception(f"HTTP request has failed ({type(req_err).__name__}) "
+                             f"for {from_currency} -> {to_currency} "
+                             f"in {elapsed_ms:.1f} ms: {req_err}")
+            return RateQuote(None, self.name, elapsed_ms, type(req_err).__name__,
+                             http_status(req_err))
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        if data.get("result") == "success" and "conversion_rate" in data:
+            rate = data["conversion_rate"]
+            logger.info(f"Rate found: 1 {from_currency} = {rate} {to_currency} "
+                        f"in {elapsed_ms:.1f} ms")
+            return RateQuote(rate, self.name, elapsed_ms)
+        error_type = data.get("error-type", "Unknown")
+        logger.error(f"Exchange rate API error: {error_type} | Response: {data}")
+        return RateQuote(None, self.name, elapsed_ms, error_type)
+
+
+class StaticRateProvider(RateProvider):
+
+    """Rates from an in-memory table quoted against a single base currency."""
+
+    def __init__(self, base: str, rates: dict[str, float], name: str = "static"):
+        self.base = base.upper()
+        self.rates = {code.upper(): float(rate) for code, rate in rates.items()}
+        self.rates[self.base] = 1.0
+        self.name = name
+
+    @classmethod
+    def from_file(cls, path: str, name: str = "static-file") -> "StaticRateProvider":
+        """Load a JSON file shaped like the API's /latest response
+        ({"base_code": ..., "conversion_rates": {...}}) or {"base": ..., "rates": {...}}.
+        """
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        base = data.get("base_code") or data["base"]
+        rates = data.get("conversion_rates") or data["rates"]
+        return cls(base, rates, name=name)
+
+    def get_quote(self, from_currency: str, to_currency: str) -> RateQuote:
+        started = time.perf_counter()
+        from_rate = self.rates.get(from_currency.upper())
+        to_rate = self.rates.get(to_currency.upper())
+        if not from_rate or to_rate is None:
+            return RateQuote(None, self.name, 0.0, "unsupported-code")
+        rate = to_rate / from_rate
+        return RateQuote(rate, self.name, (time.perf_counter() - started) * 1000)
+
+
+class FallbackRateProvider(RateProvider):
+
+    """First successful answer from providers, tried in order."""
+
+    def __init__(self, *providers: RateProvider):
+        self.providers = providers
+        self.name = f"fallback({','.join(p.name for p in providers)})"
+
+    def get_quote(self, from_currency: str, to_currency: str) -> RateQuote:
+        quote = None
+        for provider in self.providers:
+            quote = provider.get_quote(from_currency, to_currency)
+            if quote.ok:
+                return quote
+        return quote
+
+
+class HedgedRateProvider(RateProvider):
+
+    """Primary first; secondary as well once hedge_after seconds pass
+    without a successful answer. The first success wins.
+
+    wins counts which provider answered each successful request.
+    """
+
+    def __init__(self, primary: RateProvider, secondary: RateProvider,
+                 hedge_after: float, max_workers: int = 16):
+        self.primary = primary
+        self.secondary = secondary
+        self.hedge_after = hedge_after
+        self.name = f"hedged({primary.name},{secondary.name})"
+        self.wins: Counter = Counter()
+        self._wins_lock = threading.Lock()
+        # Losing requests cannot be cancelled mid-flight; they finish in this
+        # pool in the background and their answers are discarded.
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="hedged-rate")
+
+    def get_quote(self, from_currency: str, to_currency: str) -> RateQuote:
+        started = time.perf_counter()
+        primary = self._executor.submit(propagate(self.primary.get_quote),
+                                        from_currency, to_currency)
+        done, _ = wait([primary], timeout=self.hedge_after)
+        if done and primary.result().ok:
+            return self._won(primary.result(), started, hedged=False)
+
+        logger.info(f"Hedging {from_currency} -> {to_currency} to {self.secondary.name} "
+                    f"({'primary failed' if done else 'primary slow'})")
+        pending = {self._executor.submit(propagate(self.secondary.get_quote),
+                                         from_currency, to_currency)}
+        if not done:
+            pending.add(primary)
+
+        last_failure = primary.result() if done else None
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                quote = future.result()
+                if quote.ok:
+                    return self._won(quote, started, hedged=True)
+                last_failure = quote
+        return last_failure
+
+    def _won(self, quote: RateQuote, started: float, hedged: bool) -> RateQuote:
+        with self._wins_lock:
+            self.wins[quote.provider] += 1
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if hedged:
+            logger.info(f"Hedged request won by {quote.provider} in {elapsed_ms:.1f} ms")
+        return RateQuote(quote.rate, quote.provider, elapsed_ms)
@@ -0,0 +1,267 @@
+"""Push rate updates to any number of subscribers from one refresher.
+
+RateSubscriptionHub keeps a single base table current (RateTableProvider,
+refreshed on upstream's schedule with conditional requests) and, each
+time it changes, works out the cross rate for every subscribed pair. A
+subscriber only hears about a pair when its rate moved by more than the
+subscriber's threshold (relative, e.g. 0.0001 = 1 basis point) since the
+last update it was sent. Subscribers never cause upstream traffic.
+
+Two ways to subscribe, both to pairs ("EUR/USD" or ("EUR", "USD")) or to
+bases ("EUR": every pair from EUR):
+
+- hub.subscribe(...) -> AsyncRateSubscription, an async iterator for
+  asyncio code. It must be created inside the event loop.
+- hub.subscribe_callback(..., callback) -> CallbackRateSubscription.
+  callback(update) runs on the hub's refresher thread, so Qt code should
+  only emit a signal from it (a queued connection moves it to the GUI
+  thread).
+
+Pending updates are conflated per pair: a slow consumer gets the newest
+rate for each pair rather than a growing backlog, so memory per
+subscriber is bounded by the number of pairs it follows.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 0.0001
+
+Pair = tuple[str, str]
+
+
+@dataclass(frozen=True)
+class RateUpdate:
+    from_currency: str
+    to_currency: str
+    rate: float
+    previous: float | None  # last rate this subscriber was sent, if any
+    version: int  # version of the table the rate came from
+
+    @property
+    def pair(self) -> Pair:
+        return self.from_currency, self.to_currency
+
+
+def parse_targets(targets: Iterable[str | Pair] | str) -> tuple[set[Pair], set[str]]:
+    """Split subscription targets into (pairs, bases)."""
+    if isinstance(targets, str):
+        targets = [targets]
+    pairs: set[Pair] = set()
+    bases: set[str] = set()
+    for target in targets:
+        if isinstance(target, tuple):
+            pairs.add((target[0].upper(), target[1].upper()))
+        elif "/" in target:
+            from_currency, to_currency = target.split("/", 1)
+            pairs.add((from_currency.strip().upper(), to_currency.strip().upper()))
+        else:
+            bases.add(target.strip().upper())
+    return pairs, bases
+
+
+class _Subscription(ABC):
+
+    """Interest and last-sent rates for one subscriber."""
+
+    def __init__(self, hub: "RateSubscriptionHub", targets, threshold: float | None):
+        self._hub = hub
+        self.pairs, self.bases = parse_targets(targets)
+        self.threshold = hub.threshold if threshold is None else threshold
+        self._sent: dict[Pair, float] = {}
+        self.closed = False
+
+    def _updates(self, rates: dict[str, float], version: int) -> list[RateUpdate]:
+        # Called on the refresher thread only.
+        wanted = set(self.pairs)
+        for base in self.bases:
+            wanted.update((base, code) for code in rates if code != base)
+        updates = []
+        for from_currency, to_currency in wanted:
+            from_rate = rates.get(from_currency)
+            to_rate = rates.get(to_currency)
+            if not from_rate or to_rate is None:
+                continue
+            rate = to_rate / from_rate
+            previous = self._sent.get((from_currency, to_currency))
+            if previous is not None and abs(rate / previous - 1) <= self.threshold:
+                continue
+            self._sent[(from_currency, to_currency)] = rate
+            updates.append(RateUpdate(from_currency, to_currency, rate, previous, version))
+        return updates
+
+    @abstractmethod
+    def _deliver(self, updates: list[RateUpdate]) -> None:
+        """Hand updates to the subscriber. Called on the refresher thread."""
+
+    def close(self) -> None:
+        self.closed = True
+        self._hub._remove(self)
+
+
+class CallbackRateSubscription(_Subscription):
+
+    def __init__(self, hub, targets, threshold, callback: Callable[[RateUpdate], None]):
+        super().__init__(hub, targets, threshold)
+        self._callback = callback
+
+    def _deliver(self, updates: list[RateUpdate]) -> None:
+        for update in updates:
+            try:
+                self._callback(update)
+            except Exception:
+                logger.exception(f"Rate subscription callback failed for "
+                                 f"{update.from_currency}/{update.to_currency}")
+
+
+class AsyncRateSubscription(_Subscription):
+
+    """Async iterator of RateUpdate; also an async context manager."""
+
+    def __init__(self, hub, targets, threshold):
+        super().__init__(hub, targets, threshold)
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._pending: dict[Pair, RateUpdate] = {}
+        self._lock = threading.Lock()
+
+    def _deliver(self, updates: list[RateUpdate]) -> None:
+        with self._lock:
+            for update in updates:
+                older = self._pending.pop(update.pair, None)
+                if older is not None:
+                    # Conflate: newest rate, but relative to what the
+                    # consumer actually saw last.
+                    update = RateUpdate(update.from_currency, update.to_currency,
+                                        update.rate, older.previous, update.version)
+                self._pending[update.pair] = update
+        self._wake()
+
+    def _wake(self) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:  # the loop has been closed
+            self.closed = True
+            self._hub._remove(self)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def __aiter__(self) -> "AsyncRateSubscription":
+        return self
+
+    async def __anext__(self) -> RateUpdate:
+        while True:
+            with self._lock:
+                if self._pending:
+                    return self._pending.pop(next(iter(self._pending)))
+            if self.closed:
+                raise StopAsyncIteration
+            self._wakeup.clear()
+            await self._wakeup.wait()
+
+    def close(self) -> None:
+        super().close()
+        self._wake()
+
+    async def __aenter__(self) -> "AsyncRateSubscription":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+
+class RateSubscriptionHub:
+
+    """One refresher for a base table, fanning changes out to subscribers."""
+
+    def __init__(self, tables, base: str = "USD",
+                 threshold: float = DEFAULT_THRESHOLD):
+        self.tables = tables
+        self.base = base.upper()
+        self.threshold = threshold
+        self._subscriptions: list[_Subscription] = []
+        self._lock = threading.Lock()
+        # Serialises fan-out, so each subscriber sees updates in order.
+        self._fanout_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._refresher: threading.Thread | None = None
+        tables.add_listener(self.on_table_change)
+
+    def subscribe(self, targets, threshold: float | None = None) -> AsyncRateSubscription:
+        return self._add(AsyncRateSubscription(self, targets, threshold))
+
+    def subscribe_callback(self, targets, callback: Callable[[RateUpdate], None],
+                           threshold: float | None = None) -> CallbackRateSubscription:
+        return self._add(CallbackRateSubscription(self, targets, threshold, callback))
+
+    def _add(self, subscription: _Subscription):
+        with self._lock:
+            self._subscriptions.append(subscription)
+        # New subscribers start from the current rates, if there are any.
+        table = self.tables.table(self.base)
+        if table is not None:
+            with self._fanout_lock:
+                updates = subscription._updates(dict(table.rates), table.version)
+                if updates:
+                    subscription._deliver(updates)
+        self._ensure_refresher()
+        return subscription
+
+    def _remove(self, subscription: _Subscription) -> None:
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscriptions)
+
+    def on_table_change(self, table, changed: dict[str, float]) -> None:
+        """RateTableProvider listener: fan the new rates out."""
+        if table.base != self.base:
+            return
+        rates = dict(table.rates)
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        with self._fanout_lock:
+            for subscription in subscriptions:
+                if subscription.closed:
+                    continue
+                updates = subscription._updates(rates, table.version)
+                if updates:
+                    subscription._deliver(updates)
+
+    def _ensure_refresher(self) -> None:
+        with self._lock:
+            if self._refresher is not None:
+                return
+            self._refresher = threading.Thread(target=self._refresh_loop,
+                                               name="rate-subscriptions", daemon=True)
+        self._refresher.start()
+
+    def _refresh_loop(self) -> None:
+        while not self._stop.is_set():
+            table, error = self.tables.get_table(self.base)
+            if table is None:
+                logger.error(f"Rate subscriptions could not load {self.base}: {error}")
+                wait = self.tables.min_poll_interval
+            else:
+                wait = min(max(table.next_poll_unix - time.time(), 1.0), 3600.0)
+            self._stop.wait(wait)
+
+    def close(self) -> None:
+        self._stop.set()
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.close()
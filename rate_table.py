@@ -0,0 +1,225 @@
+"""Whole rate tables from the /latest endpoint, refreshed only when stale.
+
+exchangerate-api publishes each base currency's table on a schedule, and
+every /latest response says when it last changed (time_last_update_unix)
+and when it will next change (time_next_update_unix). RateTableProvider
+keeps one RateTable per base currency and:
+
+- serves every lookup from memory until time_next_update_unix, with no
+  request at all;
+- after that, polls with a conditional GET (If-None-Match /
+  If-Modified-Since), so an unchanged table costs a 304 and no parsing;
+- on a real update, applies only the entries whose value changed. The
+  table's version (and its change listeners) only move when something
+  actually changed, so downstream caches keyed on the version stay valid
+  otherwise.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+import requests
+from requests.exceptions import RequestException
+
+from rate_providers import RateProvider, RateQuote, http_status
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+# A table past its time_next_update_unix is polled at most this often,
+# so a late upstream publish does not turn into a request per lookup.
+DEFAULT_MIN_POLL_INTERVAL = 60.0
+
+ChangeListener = Callable[["RateTable", dict[str, float]], None]
+
+
+@dataclass
+class RateTable:
+    base: str
+    rates: dict[str, float] = field(default_factory=dict)
+    version: int = 0
+    time_last_update_unix: int = 0
+    time_next_update_unix: int = 0
+    etag: str | None = None
+    last_modified: str | None = None
+    # Earliest time (unix seconds) the upstream is asked again.
+    next_poll_unix: float = 0.0
+
+    def apply(self, rates: dict[str, float]) -> dict[str, float]:
+        """Merge rates in place and return only the entries that changed.
+
+        version is bumped only if something changed.
+        """
+        changed = {code: float(rate) for code, rate in rates.items()
+                   if self.rates.get(code) != float(rate)}
+        if changed:
+            self.rates.update(changed)
+            self.version += 1
+        return changed
+
+
+class RateTableProvider(RateProvider):
+
+    """Quotes from per-base /latest tables, refreshed conditionally."""
+
+    def __init__(self, base_url: str, api_key: str | None,
+                 session_factory: Callable[[], requests.Session] | None = None,
+                 timeout: float = 5, name: str = "exchangerate-api-latest",
+                 min_poll_interval: float = DEFAULT_MIN_POLL_INTERVAL,
+                 clock: Callable[[], float] = time.time):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+        self.name = name
+        self.min_poll_interval = min_poll_interval
+        self._clock = clock
+        if session_factory is None:
+            session = requests.Session()
+            session_factory = lambda: session  # noqa: E731
+        self._session_factory = session_factory
+        self._tables: dict[str, RateTable] = {}
+        # One lock per base, so concurrent lookups refresh a table once.
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        self._listeners: list[ChangeListener] = []
+        # Bases whose first fetch failed: (no retry before, error, HTTP
+        # status), so a missing table is not re-polled on every lookup either.
+        self._failed: dict[str, tuple[float, str, int | None]] = {}
+        self._last_status: int | None = None  # of the latest failed refresh
+
+    def add_listener(self, listener: ChangeListener) -> None:
+        """Call listener(table, changed) after each update that changed rates."""
+        self._listeners.append(listener)
+
+    def table(self, base: str) -> RateTable | None:
+        """The current table for base, without refreshing it."""
+        return self._tables.get(base.upper())
+
+    def get_quote(self, from_currency: str, to_currency: str) -> RateQuote:
+        started = time.perf_counter()
+        table, error = self.get_table(from_currency)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if table is None:
+            failed = self._failed.get(from_currency.upper())
+            return RateQuote(None, self.name, elapsed_ms, error,
+                             failed[2] if failed else None)
+        rate = table.rates.get(to_currency.upper())
+        if rate is None:
+            return RateQuote(None, self.name, elapsed_ms, "unsupported-code")
+        # Almost always an in-memory hit, so not worth an INFO line each.
+        logger.debug(f"Rate found: 1 {from_currency} = {rate} {to_currency} "
+                     f"in {elapsed_ms:.1f} ms")
+        return RateQuote(rate, self.name, elapsed_ms)
+
+    def get_table(self, base: str) -> tuple[RateTable | None, str | None]:
+        """Return (table, error) for base, refreshing it first if it is due.
+
+        If a refresh fails but an older table exists, the older table is
+        returned and the error is only logged.
+        """
+        base = base.upper()
+        table = self._tables.get(base)
+        if table is not None and self._clock() < table.next_poll_unix:
+            return table, None
+
+        with self._lock_for(base):
+            table = self._tables.get(base)
+            if table is not None and self._clock() < table.next_poll_unix:
+                return table, None  # refreshed by another thread meanwhile
+            if table is None and base in self._failed:
+                retry_at, error, _ = self._failed[base]
+                if self._clock() < retry_at:
+                    return None, error
+            self._last_status = None
+            error = self._refresh(base, table)
+            table = self._tables.get(base)
+            if table is None and error is not None:
+                self._failed[base] = (self._clock() + self.min_poll_interval, error,
+                                      self._last_status)
+            else:
+                self._failed.pop(base, None)
+        return table, (error if table is None else None)
+
+    def _lock_for(self, base: str) -> threading.Lock:
+        with self._locks_lock:
+            lock = self._locks.get(base)
+            if lock is None:
+                lock = self._locks[base] = threading.Lock()
+            return lock
+
+    def _refresh(self, base: str, table: RateTable | None) -> str | None:
+        """Poll /latest for base and update the table. Returns an error type
+        on failure, else None. Called with the base's lock held.
+        """
+        if not self.api_key:
+            return "missing-api-key"
+        headers = {}
+        if table is not None:
+            if table.etag:
+                headers["If-None-Match"] = table.etag
+            if table.last_modified:
+                headers["If-Modified-Since"] = table.last_modified
+
+        url = f"{self.base_url}/{self.api_key}/latest/{base}"
+        started = time.perf_counter()
+        try:
+            with span("http.get", "http", provider=self.name, base=base) as request:
+                response = self._session_factory().get(url, headers=headers,
+                                                       timeout=self.timeout)
+                request.set(status=response.status_code)
+            if response.status_code == 304:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                self._schedule_next_poll(table, table.time_next_update_unix)
+                logger.info(f"Rate table {base} not modified in {elapsed_ms:.1f} ms")
+                return None
+            response.raise_for_status()  # Raises HTTPError for bad responses
+            with span("json.parse", "json"):
+                data = response.json()
+        except RequestException as req_err:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            logger.exception(f"HTTP request has failed ({type(req_err).__name__}) "
+                             f"for rate table {base} "
+                             f"in {elapsed_ms:.1f} ms: {req_err}")
+            if table is not None:
+                self._schedule_next_poll(table, 0)
+            self._last_status = http_status(req_err)
+            return type(req_err).__name__
+
+        if data.get("result") != "success" or "conversion_rates" not in data:
+            error_type = data.get("error-type", "Unknown")
+            logger.error(f"Exchange rate API error: {error_type} | Response: {data}")
+            if table is not None:
+                self._schedule_next_poll(table, 0)
+            return error_type
+
+        if table is None:
+            table = self._tables[base] = RateTable(base)
+        table.etag = response.headers.get("ETag") or table.etag
+        table.last_modified = response.headers.get("Last-Modified") or table.last_modified
+        last_update = int(data.get("time_last_update_unix") or 0)
+        next_update = int(data.get("time_next_update_unix") or 0)
+
+        changed: dict[str, float] = {}
+        # A 200 for a table we already hold (no validators, or a server that
+        # ignores them) is only applied if upstream says it changed.
+        if not table.rates or last_update != table.time_last_update_unix:
+            changed = table.apply(data["conversion_rates"])
+        table.time_last_update_unix = last_update
+        table.time_next_update_unix = next_update
+        self._schedule_next_poll(table, next_update)
+
+        if changed:
+            logger.info(f"Rate table {base}: {len(changed)} of {len(table.rates)} "
+                        f"rates changed (version {table.version})")
+            for listener in list(self._listeners):
+                listener(table, changed)
+        else:
+            logger.info(f"Rate table {base} unchanged")
+        return None
+
+    def _schedule_next_poll(self, table: RateTable, next_update_unix: float) -> None:
+        now = self._clock()
+        table.next_poll_unix = max(next_update_unix, now + self.min_poll_interval)
@@ -1,17 +1,13 @@
 import os
 import sys
-import subprocess
 
 # Add the project root to the system path
 project_root = os.path.dirname(os.path.abspath(__file__))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-# Run main.py using subprocess
-try:
-    subprocess.run(
-        [sys.executable, os.path.join(project_root, "main.py")],
-        check=True
-    )
-except subprocess.CalledProcessError as e:
-    print("❌ Failed to run CurrencyConverter:", e)
+# Run the converter in this interpreter rather than re-executing main.py
+# in a second Python process; see launcher.py for the available modes.
+from launcher import launch  # noqa: E402
+
+sys.exit(launch(["cli", *sys.argv[1:]]))
@@ -0,0 +1,386 @@
+"""Rates shared between processes through one shared-memory segment.
+
+One publisher per host writes the current rate vector into a
+multiprocessing.shared_memory segment. Every converter process (CLI,
+batch workers, forked children) attaches a SharedRateReader and reads
+the rates in place as a NumPy view: no copy, no lock, no fetch of its own.
+
+Layout (all 8-byte words, native byte order):
+
+    0  magic          b"FXRATES1"
+    1  sequence       even = stable, odd = write in progress
+    2  count          number of rate slots (registry size)
+    3  codes hash     crc32 of the registry codes, so both sides agree
+                      on which slot is which currency
+    4  base ordinal   currency the rates are quoted against
+    5  last update    upstream time_last_update_unix (float)
+    6  published at   publisher's time.time() at the last publish or
+                      heartbeat (float)
+    7  retired        1 once a publisher has removed or replaced the segment
+    8… rates          float64 per registry ordinal: units per 1 base, NaN
+                      where unknown
+
+Slots are indexed by currency registry ordinal, so any pair is
+rates[to] / rates[from] whatever the base is.
+
+Writes are guarded by a seqlock: the publisher makes the sequence odd,
+writes, then makes it even again. Readers copy what they need and retry
+if the sequence was odd or changed meanwhile, so a reader never sees half
+of a refresh and never blocks the publisher.
+
+A running publisher refreshes "published at" every few seconds even when
+the rates have not changed. A reader with a max_age treats an older
+table, or a retired segment, as gone: it re-attaches (at most once a
+second) in case a restarted publisher has created a new segment, and
+otherwise returns nothing, so lookups fall through to the next provider.
+
+    python launcher.py publish-rates --base USD
+"""
+
+import argparse
+import logging
+import sys
+import threading
+import time
+import zlib
+from multiprocessing import resource_tracker, shared_memory
+from typing import Iterable, Optional
+
+import numpy as np
+
+from rate_providers import RateProvider, RateQuote
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEGMENT_NAME = "currency_converter_rates"
+MAGIC = int.from_bytes(b"FXRATES1", "little")
+HEADER_WORDS = 8
+_SEQUENCE, _COUNT, _CODES_HASH, _BASE = 1, 2, 3, 4
+_LAST_UPDATE, _PUBLISHED_AT, _RETIRED = 5, 6, 7
+# Readers give up after this many torn reads in a row (a stuck publisher).
+MAX_READ_RETRIES = 10_000
+# A stale reader looks for a replacement segment at most this often.
+REATTACH_INTERVAL = 1.0
+
+
+def _registry_codes() -> tuple[str, ...]:
+    from data.currency_registry import get_currency_registry
+    return get_currency_registry().codes
+
+
+def _codes_hash(codes: Iterable[str]) -> int:
+    return zlib.crc32(",".join(codes).encode("ascii"))
+
+
+class _Segment:
+
+    """Typed views over a mapped segment."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, count: int):
+        self.shm = shm
+        self.header = np.ndarray((HEADER_WORDS,), dtype=np.uint64, buffer=shm.buf)
+        self.header_f64 = np.ndarray((HEADER_WORDS,), dtype=np.float64, buffer=shm.buf)
+        self.rates = np.ndarray((count,), dtype=np.float64, buffer=shm.buf,
+                                offset=HEADER_WORDS * 8)
+
+    def release(self) -> None:
+        # The views must go before the mapping can be closed.
+        del self.header, self.header_f64, self.rates
+        self.shm.close()
+
+
+class SharedRatePublisher:
+
+    """Creates the segment and publishes rate tables into it."""
+
+    def __init__(self, name: str = DEFAULT_SEGMENT_NAME,
+                 codes: Optional[Iterable[str]] = None,
+                 heartbeat_interval: float | None = None):
+        self.codes = tuple(codes) if codes is not None else _registry_codes()
+        self._ordinals = {code: i for i, code in enumerate(self.codes)}
+        size = (HEADER_WORDS + len(self.codes)) * 8
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by a publisher that died; take it over, telling
+            # readers still mapping it to attach to the new one.
+            stale = shared_memory.SharedMemory(name=name)
+            if stale.size >= HEADER_WORDS * 8:
+                header = np.ndarray((HEADER_WORDS,), dtype=np.uint64, buffer=stale.buf)
+                header[_RETIRED] = 1
+                del header
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.name = shm.name
+        self._segment = _Segment(shm, len(self.codes))
+        self._segment.rates[:] = np.nan
+        header = self._segment.header
+        header[_COUNT] = len(self.codes)
+        header[_CODES_HASH] = _codes_hash(self.codes)
+        header[_SEQUENCE] = 0
+        header[_RETIRED] = 0
+        self._segment.header_f64[_PUBLISHED_AT] = time.time()
+        header[0] = MAGIC  # written last: readers check it first
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        if heartbeat_interval:
+            threading.Thread(target=self._beat, args=(heartbeat_interval,),
+                             name="shared-rates-heartbeat", daemon=True).start()
+
+    @property
+    def version(self) -> int:
+        return int(self._segment.header[_SEQUENCE]) // 2
+
+    def publish(self, base: str, rates: dict[str, float],
+                time_last_update_unix: float = 0.0) -> int:
+        """Replace the shared table with rates quoted against base.
+
+        Codes outside the registry are ignored. Returns the new version.
+        """
+        base = base.upper()
+        if base not in self._ordinals:
+            raise KeyError(f"Unknown base currency {base}")
+        vector = np.full(len(self.codes), np.nan)
+        for code, rate in rates.items():
+            ordinal = self._ordinals.get(code.upper())
+            if ordinal is not None:
+                vector[ordinal] = rate
+        vector[self._ordinals[base]] = 1.0
+
+        segment = self._segment
+        with self._lock:
+            sequence = int(segment.header[_SEQUENCE])
+            segment.header[_SEQUENCE] = sequence + 1  # odd: readers retry
+            segment.header[_BASE] = self._ordinals[base]
+            segment.header_f64[_LAST_UPDATE] = time_last_update_unix
+            segment.header_f64[_PUBLISHED_AT] = time.time()
+            segment.rates[:] = vector
+            segment.header[_SEQUENCE] = sequence + 2
+        return (sequence + 2) // 2
+
+    def on_table_change(self, table, changed: dict[str, float]) -> None:
+        """RateTableProvider listener: publish the whole updated table."""
+        self.publish(table.base, table.rates, table.time_last_update_unix)
+
+    def heartbeat(self) -> None:
+        """Tell readers the current table is still being kept up to date."""
+        with self._lock:
+            if not self._stopped.is_set():
+                self._segment.header_f64[_PUBLISHED_AT] = time.time()
+
+    def _beat(self, interval: float) -> None:
+        while not self._stopped.wait(interval):
+            self.heartbeat()
+
+    def close(self, unlink: bool = True) -> None:
+        with self._lock:
+            if self._stopped.is_set():
+                return
+            self._stopped.set()
+            if unlink:
+                self._segment.header[_RETIRED] = 1
+            shm = self._segment.shm
+            self._segment.release()
+        if unlink:
+            shm.unlink()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 registers every attachment with the resource
+        # tracker, which would unlink the publisher's segment when this
+        # process exits.
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class SharedRateReader:
+
+    """Lock-free, zero-copy view of a published rate table.
+
+    With max_age (seconds), fresh() reports whether a live publisher still
+    stands behind the table (see the module docstring).
+
+    Raises FileNotFoundError if no publisher has created the segment.
+    """
+
+    def __init__(self, name: str = DEFAULT_SEGMENT_NAME,
+                 codes: Optional[Iterable[str]] = None, max_age: float | None = None):
+        self.codes = tuple(codes) if codes is not None else _registry_codes()
+        self._ordinals = {code: i for i, code in enumerate(self.codes)}
+        self.name = name
+        self.max_age = max_age
+        self._segment = self._open(name)
+        # Segments replaced by a restarted publisher; callers may still hold
+        # views into them, so they are only unmapped by close().
+        self._replaced: list[_Segment] = []
+        self._reattach_lock = threading.Lock()
+        self._next_reattach = 0.0
+
+    def _open(self, name: str) -> _Segment:
+        shm = _attach(name)
+        header = np.ndarray((HEADER_WORDS,), dtype=np.uint64, buffer=shm.buf)
+        valid = (int(header[0]) == MAGIC and int(header[_COUNT]) == len(self.codes)
+                 and int(header[_CODES_HASH]) == _codes_hash(self.codes))
+        del header
+        if not valid:
+            shm.close()
+            raise ValueError(f"Shared rate segment {name} does not match this "
+                             "currency registry")
+        return _Segment(shm, len(self.codes))
+
+    @property
+    def rates(self) -> np.ndarray:
+        """The live shared vector (read-only view). Values can change under
+        the caller; use snapshot() or get_rate() for a consistent read.
+        """
+        view = self._segment.rates.view()
+        view.flags.writeable = False
+        return view
+
+    @property
+    def version(self) -> int:
+        """Number of tables published so far (0: none yet)."""
+        return int(self._segment.header[_SEQUENCE]) // 2
+
+    def _read(self, segment: _Segment, read):
+        header = segment.header
+        for _ in range(MAX_READ_RETRIES):
+            before = int(header[_SEQUENCE])
+            if before % 2 == 0:
+                value = read()
+                if int(header[_SEQUENCE]) == before:
+                    return before // 2, value
+        raise TimeoutError("Shared rate table kept changing while being read")
+
+    def get_rate(self, from_currency: str, to_currency: str) -> float | None:
+        """Cross rate for 1 from_currency in to_currency, or None if unknown."""
+        i = self._ordinals.get(from_currency.upper())
+        j = self._ordinals.get(to_currency.upper())
+        if i is None or j is None:
+            return None
+        segment = self._segment
+        rates = segment.rates
+        _, (from_rate, to_rate) = self._read(
+            segment, lambda: (float(rates[i]), float(rates[j])))
+        rate = to_rate / from_rate
+        return rate if np.isfinite(rate) and rate > 0 else None
+
+    def snapshot(self) -> tuple[int, str, np.ndarray, float]:
+        """Consistent copy: (version, base code, rates, time_last_update_unix)."""
+        segment = self._segment
+        version, (base, rates, last_update) = self._read(segment, lambda: (
+            int(segment.header[_BASE]), segment.rates.copy(),
+            float(segment.header_f64[_LAST_UPDATE])))
+        return version, self.codes[base], rates, last_update
+
+    def published_at(self) -> float:
+        return float(self._segment.header_f64[_PUBLISHED_AT])
+
+    def _current(self, segment: _Segment) -> bool:
+        if int(segment.header[_RETIRED]):
+            return False
+        age = time.time() - float(segment.header_f64[_PUBLISHED_AT])
+        return self.max_age is None or age <= self.max_age
+
+    def fresh(self) -> bool:
+        """True unless the publisher has gone: the segment was retired, or
+        the table is older than max_age. A stale reader first re-attaches in
+        case a restarted publisher has created a new segment.
+        """
+        if self._current(self._segment):
+            return True
+        with self._reattach_lock:
+            now = time.monotonic()
+            if now >= self._next_reattach:
+                self._next_reattach = now + REATTACH_INTERVAL
+                self._reattach()
+        return self._current(self._segment)
+
+    def _reattach(self) -> None:
+        try:
+            segment = self._open(self.name)
+        except (FileNotFoundError, ValueError) as e:
+            logger.debug(f"No replacement for shared rate segment {self.name}: {e}")
+            return
+        if self._current(segment):
+            logger.info(f"Re-attached to the republished shared rate segment {self.name}")
+            self._replaced.append(self._segment)
+            self._segment = segment
+        else:
+            segment.release()  # the same dead publisher's segment
+
+    def close(self) -> None:
+        for segment in [*self._replaced, self._segment]:
+            segment.release()
+        self._replaced.clear()
+
+
+class SharedMemoryRateProvider(RateProvider):
+
+    """Quotes from a SharedRateReader."""
+
+    def __init__(self, reader: SharedRateReader, name: str = "shared-memory"):
+        self.reader = reader
+        self.name = name
+
+    def get_quote(self, from_currency: str, to_currency: str) -> RateQuote:
+        started = time.perf_counter()
+        if self.reader.version == 0:
+            return RateQuote(None, self.name, 0.0, "not-published")
+        if not self.reader.fresh():
+            return RateQuote(None, self.name, (time.perf_counter() - started) * 1000, "stale")
+        rate = self.reader.get_rate(from_currency, to_currency)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if rate is None:
+            return RateQuote(None, self.name, elapsed_ms, "unsupported-code")
+        return RateQuote(rate, self.name, elapsed_ms)
+
+
+def heartbeat_interval(settings) -> float:
+    """How often a publisher heartbeats, so readers never see it as stale."""
+    max_age = settings.rate_shm_max_age_seconds
+    return max_age / 4 if max_age > 0 else 15.0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Keep the shared table current from the /latest endpoint until stopped."""
+    from config import get_settings
+    from currency_utils import _get_session
+    from rate_table import RateTableProvider
+
+    parser = argparse.ArgumentParser(description="Publish rates to shared memory.")
+    parser.add_argument("--base", default="USD", help="Table to publish")
+    parser.add_argument("--name", help="Segment name (default: RATE_SHM_NAME)")
+    args = parser.parse_args(argv)
+
+    settings = get_settings()
+    publisher = SharedRatePublisher(args.name or settings.rate_shm_name
+                                    or DEFAULT_SEGMENT_NAME,
+                                    heartbeat_interval=heartbeat_interval(settings))
+    tables = RateTableProvider(settings.exchange_rate_base_url,
+                               settings.require_api_key(),
+                               session_factory=_get_session,
+                               min_poll_interval=settings.rate_min_poll_seconds)
+    tables.add_listener(publisher.on_table_change)
+    logger.info(f"Publishing {args.base} rates to shared memory {publisher.name}")
+    try:
+        while True:
+            table, error = tables.get_table(args.base)
+            if table is None:
+                logger.error(f"Could not load the {args.base} rate table: {error}")
+                time.sleep(settings.rate_min_poll_seconds)
+                continue
+            time.sleep(min(max(table.next_poll_unix - time.time(), 1.0), 3600.0))
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        publisher.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,419 @@
+"""Soak-test harness: hours of conversions, watching for slow leaks.
+
+Drives convert_currency() and the logging stack (init_logging: console,
+rotating file handler, sampling filter) at a fixed rate against a local
+stub of the exchange rate API, and samples the process as it goes:
+
+- RSS (from /proc, else the peak from getrusage),
+- memory traced by tracemalloc, with the top growing allocation sites,
+- open file descriptors, threads, and logging handlers on every logger.
+
+Growth is measured from the end of a warm-up period (pools, caches and
+the registry fill up first) to the end of the run, and the run fails if
+any of it exceeds its threshold. Samples are written as CSV.
+
+    python tests/soak-testing/soak.py --duration 14400 --rate 50
+    python tests/soak-testing/soak.py --duration 600 --rate-source latest
+
+The unittest wrapper in test_soak.py only runs with RUN_SOAK_TESTS=1.
+Everything (logs, rotated files, the traffic profile) goes to a
+temporary directory unless --log-dir is given.
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import zlib
+from dataclasses import asdict, dataclass, field, fields
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+# Add the project root to the system path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+STUB_API_KEY = "soak-test-key"
+
+
+def stub_rate(from_currency: str, to_currency: str) -> float:
+    """A stable, pair-specific rate, so results can be checked."""
+    return 0.5 + zlib.crc32(f"{from_currency}/{to_currency}".encode()) % 1000 / 1000
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+
+    # Keep-alive, like the real API, so pooled connections are reused.
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        parts = self.path.strip("/").split("/")
+        with self.server.requests_lock:
+            self.server.requests += 1
+        if len(parts) == 4 and parts[1] == "pair":
+            self._send_json({"result": "success",
+                             "conversion_rate": stub_rate(parts[2], parts[3])})
+        elif len(parts) == 3 and parts[1] == "latest":
+            if self.headers.get("If-None-Match") == '"soak"':
+                self.send_response(304)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            from data.currency_registry import get_currency_registry
+            base = parts[2]
+            self._send_json({
+                "result": "success", "base_code": base, "time_last_update_unix": 1,
+                "time_next_update_unix": int(time.time()) + 60,
+                "conversion_rates": {code: stub_rate(base, code)
+                                     for code in get_currency_registry().codes},
+            }, etag='"soak"')
+        else:
+            self._send_json({"result": "error", "error-type": "not-found"}, status=404)
+
+    def do_HEAD(self):  # warm_http_pool
+        self.send_response(404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _send_json(self, document: dict, status: int = 200,
+                   etag: Optional[str] = None) -> None:
+        body = json.dumps(document).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubRateApi:
+
+    """The exchangerate-api pair and /latest endpoints on a local port."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.server = ThreadingHTTPServer((host, port), _StubHandler)
+        self.server.daemon_threads = True
+        self.server.requests = 0
+        self.server.requests_lock = threading.Lock()
+        self._thread = threading.Thread(target=self.server.serve_forever,
+                                        name="soak-stub-api", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def requests(self) -> int:
+        return self.server.requests
+
+    def __enter__(self) -> "StubRateApi":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def rss_mb() -> Optional[float]:
+    """Current resident set size; the peak where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024  # bytes vs KiB
+
+
+def open_fds() -> Optional[int]:
+    for directory in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(directory))
+        except OSError:
+            continue
+    return None
+
+
+def logging_handlers() -> int:
+    """Handlers attached to the root logger and every named logger."""
+    loggers = [logging.getLogger()] + [
+        logger for logger in logging.Logger.manager.loggerDict.values()
+        if isinstance(logger, logging.Logger)]
+    return sum(len(logger.handlers) for logger in loggers)
+
+
+@dataclass
+class Sample:
+    elapsed: float
+    conversions: int
+    failures: int
+    rss_mb: Optional[float]
+    traced_mb: Optional[float]
+    fds: Optional[int]
+    threads: int
+    handlers: int
+
+
+def take_sample(elapsed: float, conversions: int, failures: int) -> Sample:
+    traced = tracemalloc.get_traced_memory()[0] / 2**20 if tracemalloc.is_tracing() else None
+    return Sample(elapsed, conversions, failures, rss_mb(), traced, open_fds(),
+                  threading.active_count(), logging_handlers())
+
+
+@dataclass(frozen=True)
+class Thresholds:
+
+    """Largest growth tolerated after warm-up, per resource."""
+
+    rss_mb: float = 32.0
+    traced_mb: float = 8.0
+    fds: int = 8
+    threads: int = 4
+    handlers: int = 0
+
+
+def growth(samples: list[Sample], warmup: float, window: int = 3) -> dict[str, float]:
+    """How much each resource grew from the end of warm-up to the end of the
+    run: the median of the last `window` samples minus that of the first
+    `window` after warm-up, so one noisy sample neither hides nor fakes growth.
+    """
+    steady = [sample for sample in samples if sample.elapsed >= warmup]
+    if len(steady) < 2:
+        raise ValueError(f"only {len(steady)} sample(s) after the {warmup:g}s warm-up; "
+                         "run longer or sample more often")
+    window = max(1, min(window, len(steady) // 2))
+    result = {}
+    for name in ("rss_mb", "traced_mb", "fds", "threads", "handlers"):
+        values = [getattr(sample, name) for sample in steady]
+        if any(value is None for value in values):
+            continue
+        result[name] = statistics.median(values[-window:]) - statistics.median(values[:window])
+    return result
+
+
+def check_growth(samples: list[Sample], thresholds: Thresholds, warmup: float) -> list[str]:
+    """One message per resource that grew by more than its threshold."""
+    limits = asdict(thresholds)
+    try:
+        grown = growth(samples, warmup)
+    except ValueError as e:
+        return [f"growth not measured: {e}"]
+    return [f"{name} grew by {amount:g} (limit {limits[name]:g})"
+            for name, amount in grown.items() if amount > limits[name]]
+
+
+@dataclass
+class SoakResult:
+    samples: list[Sample]
+    violations: list[str]
+    top_allocations: list[str] = field(default_factory=list)
+    stub_requests: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return not self.violations
+
+    def report(self) -> str:
+        last = self.samples[-1] if self.samples else None
+        lines = [f"{'PASSED' if self.ok else 'FAILED'}: "
+                 + (f"{last.conversions} conversions ({last.failures} failed) in "
+                    f"{last.elapsed:.0f}s, {self.stub_requests} API requests"
+                    if last else "no samples")]
+        lines += [f"  {violation}" for violation in self.violations]
+        if self.top_allocations:
+            lines.append("  Largest allocation growth since warm-up:")
+            lines += [f"    {line}" for line in self.top_allocations]
+        return "\n".join(lines)
+
+
+def _quiet_console() -> None:
+    # Hours of per-conversion INFO lines on stderr help nobody; the file
+    # handler still receives everything.
+    for handler in logging.getLogger().handlers:
+        if type(handler) is logging.StreamHandler:
+            handler.setLevel(logging.WARNING)
+
+
+def run_soak(duration: float, rate: float, threads: int = 4, sample_interval: float = 10.0,
+             warmup: float = 60.0, thresholds: Thresholds = Thresholds(),
+             log_dir: Optional[Path] = None, rate_source: str = "pair", pairs: int = 200,
+             trace_malloc: bool = True, csv_path: Optional[Path] = None,
+             verbose: bool = False) -> SoakResult:
+    """Run the soak test in this process and return its samples and verdict."""
+    saved_environ = dict(os.environ)
+    root = logging.getLogger()
+    saved_handlers, saved_level = list(root.handlers), root.level
+    with tempfile.TemporaryDirectory(prefix="soak-") as tmp, StubRateApi() as api:
+        log_dir = Path(log_dir or tmp)
+        os.environ.update({
+            "EXCHANGE_RATE_API_KEY": STUB_API_KEY,
+            "EXCHANGE_RATE_BASE_URL": api.base_url,
+            "RATE_SOURCE": rate_source,
+            "LOG_DIR": str(log_dir),
+            "TRAFFIC_PROFILE_FILE": str(log_dir / "traffic_profile.json"),
+        })
+        # Small files, so rotation and compression are exercised too.
+        os.environ.setdefault("LOG_ROTATION_SIZE_MB", "1")
+
+        import config
+        import currency_utils
+        from data.currency_registry import get_currency_registry
+        from modular_logger.root_logger import init_logging
+        config.reset_settings()
+        currency_utils.set_rate_provider(None)
+        init_logging(force=True)
+        if not verbose:
+            _quiet_console()
+        # Traffic concentrates on a fixed set of pairs, hottest first, as in
+        # production; uniformly random pairs would make every bounded per-pair
+        # cache look like a leak. Codes the rate lookup rejects are skipped.
+        mix = random.Random(0)
+        codes = [code for code in get_currency_registry().codes
+                 if len(code) == 3 and code.isalpha()]
+        hot_pairs = list(dict.fromkeys(tuple(mix.sample(codes, 2)) for _ in range(pairs)))
+        cum_weights = list(itertools.accumulate(1 / rank
+                                                for rank in range(1, len(hot_pairs) + 1)))
+
+        counts = {"conversions": 0, "failures": 0}
+        counts_lock = threading.Lock()
+        stop = threading.Event()
+
+        def drive(seed: int) -> None:
+            rng = random.Random(seed)
+            interval = threads / rate
+            next_call = time.monotonic()
+            while not stop.is_set():
+                from_code, to_code = rng.choices(hot_pairs, cum_weights=cum_weights)[0]
+                amount = round(rng.uniform(1, 10_000), 2)
+                result = currency_utils.convert_currency(amount, from_code, to_code)
+                expected = amount * stub_rate(from_code, to_code)
+                ok = result is not None and abs(result - expected) <= 1e-6 * expected
+                with counts_lock:
+                    counts["conversions"] += 1
+                    counts["failures"] += not ok
+                # Fixed-rate schedule: fall behind rather than burst to catch up.
+                next_call = max(next_call + interval, time.monotonic())
+                stop.wait(next_call - time.monotonic())
+
+        if trace_malloc:
+            tracemalloc.start()
+        samples: list[Sample] = []
+        baseline = None
+        started = time.monotonic()
+        workers = [threading.Thread(target=drive, args=(seed,), name=f"soak-driver-{seed}",
+                                    daemon=True) for seed in range(threads)]
+        for worker in workers:
+            worker.start()
+        try:
+            while True:
+                elapsed = time.monotonic() - started
+                with counts_lock:
+                    samples.append(take_sample(elapsed, counts["conversions"],
+                                               counts["failures"]))
+                if trace_malloc and baseline is None and elapsed >= warmup:
+                    baseline = tracemalloc.take_snapshot()
+                if elapsed >= duration:
+                    break
+                time.sleep(min(sample_interval, duration - elapsed))
+        finally:
+            stop.set()
+            for worker in workers:
+                worker.join()
+
+        top_allocations = []
+        if trace_malloc:
+            if baseline is not None:
+                grown = tracemalloc.take_snapshot().compare_to(baseline, "lineno")
+                top_allocations = [str(stat) for stat in grown[:10] if stat.size_diff > 0]
+            tracemalloc.stop()
+
+        violations = check_growth(samples, thresholds, warmup)
+        if samples and samples[-1].failures:
+            violations.append(f"{samples[-1].failures} conversions failed or were wrong")
+        result = SoakResult(samples, violations, top_allocations, api.requests)
+        if csv_path is not None:
+            write_samples(samples, csv_path)
+        # Close the file handlers before the temporary log directory goes,
+        # and leave the process configured as it was.
+        for handler in root.handlers:
+            handler.close()
+        root.handlers[:] = saved_handlers
+        root.setLevel(saved_level)
+        os.environ.clear()
+        os.environ.update(saved_environ)
+        currency_utils.save_traffic_profile()
+        currency_utils._traffic = None  # its file is in the log directory
+        currency_utils.set_rate_provider(None)
+        config.reset_settings()
+    return result
+
+
+def write_samples(samples: list[Sample], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([column.name for column in fields(Sample)])
+        for sample in samples:
+            writer.writerow([round(value, 3) if isinstance(value, float) else value
+                             for value in asdict(sample).values()])
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=3600,
+                        help="Seconds to run (default: 3600)")
+    parser.add_argument("--rate", type=float, default=20,
+                        help="Conversions per second across all threads (default: 20)")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--sample-interval", type=float, default=10)
+    parser.add_argument("--warmup", type=float, default=60,
+                        help="Seconds before growth is measured (default: 60)")
+    parser.add_argument("--pairs", type=int, default=200,
+                        help="Distinct currency pairs in the traffic mix (default: 200)")
+    parser.add_argument("--rate-source", choices=("pair", "latest"), default="pair")
+    parser.add_argument("--log-dir", type=Path,
+                        help="Keep logs here instead of in a temporary directory")
+    parser.add_argument("--csv", type=Path, help="Write the samples to this CSV file")
+    parser.add_argument("--no-tracemalloc", action="store_true",
+                        help="Skip allocation tracing (it slows every allocation)")
+    parser.add_argument("--verbose", action="store_true",
+                        help="Keep per-conversion log lines on the console")
+    defaults = Thresholds()
+    for name in ("rss_mb", "traced_mb", "fds", "threads", "handlers"):
+        parser.add_argument(f"--max-{name.replace('_', '-')}-growth", dest=name,
+                            type=type(getattr(defaults, name)),
+                            default=getattr(defaults, name))
+    args = parser.parse_args(argv)
+
+    thresholds = Thresholds(args.rss_mb, args.traced_mb, args.fds, args.threads,
+                            args.handlers)
+    result = run_soak(args.duration, args.rate, args.threads, args.sample_interval,
+                      args.warmup, thresholds, args.log_dir, args.rate_source, args.pairs,
+                      not args.no_tracemalloc, args.csv, args.verbose)
+    print(result.report())
+    return 0 if result.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
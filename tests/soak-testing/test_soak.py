@@ -0,0 +1,77 @@
+"""
+Soak test: converts at a steady rate against a local stub API and fails
+if memory, file descriptors, threads or logging handlers keep growing.
+
+- Only runs when explicitly enabled: RUN_SOAK_TESTS=1.
+- SOAK_SECONDS (default 600), SOAK_RATE (conversions/s, default 20) and
+  SOAK_CSV (where to keep the samples) tune the run; soak.py --help lists
+  every option for longer runs from the command line.
+"""
+
+import os
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from soak import Sample, StubRateApi, Thresholds, check_growth, run_soak, stub_rate  # noqa: E402
+
+
+def _samples(rss_values, start=0.0, step=10.0):
+    return [Sample(start + i * step, i, 0, rss, 1.0, 10, 3, 2)
+            for i, rss in enumerate(rss_values)]
+
+
+class TestGrowthCheck(unittest.TestCase):
+
+    def test_flat_after_warm_up_passes(self):
+        # Growth during warm-up (pools and caches filling) is not counted.
+        samples = _samples([10, 60, 90, 90, 91, 90, 90, 92, 90])
+        self.assertEqual(check_growth(samples, Thresholds(rss_mb=5), warmup=20), [])
+
+    def test_steady_growth_fails(self):
+        samples = _samples([90, 95, 100, 105, 110, 115, 120, 125])
+        violations = check_growth(samples, Thresholds(rss_mb=5), warmup=0)
+        self.assertEqual(violations, ["rss_mb grew by 25 (limit 5)"])
+
+    def test_one_spike_is_not_growth(self):
+        samples = _samples([90, 90, 90, 150, 90, 90, 90])
+        self.assertEqual(check_growth(samples, Thresholds(rss_mb=5), warmup=0), [])
+
+    def test_too_short_a_run_is_reported(self):
+        violations = check_growth(_samples([90, 90]), Thresholds(), warmup=15)
+        self.assertEqual(len(violations), 1)
+        self.assertIn("growth not measured", violations[0])
+
+
+class TestStubRateApi(unittest.TestCase):
+
+    def test_pair_endpoint(self):
+        import requests
+        with StubRateApi() as api:
+            data = requests.get(f"{api.base_url}/key/pair/USD/EUR", timeout=5).json()
+        self.assertEqual(data["conversion_rate"], stub_rate("USD", "EUR"))
+        self.assertEqual(api.requests, 1)
+
+
+class TestSoak(unittest.TestCase):
+
+    def test_no_growth_under_sustained_load(self):
+        if os.getenv("RUN_SOAK_TESTS") != "1":
+            self.skipTest("Set RUN_SOAK_TESTS=1 to enable soak tests.")
+
+        duration = float(os.getenv("SOAK_SECONDS", "600"))
+        csv_path = os.getenv("SOAK_CSV")
+        result = run_soak(duration=duration, rate=float(os.getenv("SOAK_RATE", "20")),
+                          warmup=min(60.0, duration / 4),
+                          sample_interval=max(1.0, min(10.0, duration / 60)),
+                          csv_path=Path(csv_path) if csv_path else None)
+
+        print(result.report())
+        self.assertTrue(result.ok, result.report())
+        self.assertGreater(result.samples[-1].conversions, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
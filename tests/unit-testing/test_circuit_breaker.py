@@ -0,0 +1,186 @@
+"""Unit tests for the per-endpoint circuit breaker."""
+
+import unittest
+from unittest.mock import MagicMock
+
+import requests
+
+from circuit_breaker import (
+    CIRCUIT_OPEN_ERROR, CLOSED, HALF_OPEN, OPEN, BreakerRateProvider,
+    CircuitBreaker
+)
+from rate_providers import (
+    ExchangeRateApiProvider, RateProvider, RateQuote, StaticRateProvider
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _ScriptedProvider(RateProvider):
+
+    """Returns the next queued error (None means success) on each call."""
+
+    name = "upstream"
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def get_quote(self, from_currency, to_currency):
+        self.calls += 1
+        error = self.errors.pop(0) if self.errors else None
+        if error:
+            return RateQuote(None, self.name, 5000.0, error)
+        return RateQuote(1.25, self.name, 20.0)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = _Clock()
+        self.breaker = CircuitBreaker("https://api.example", failure_threshold=3,
+                                      recovery_timeout=10, clock=self.clock)
+
+    def _fail(self, times):
+        for _ in range(times):
+            self.assertTrue(self.breaker.allow_request())
+            self.breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self):
+        self._fail(2)
+        self.breaker.record_success()  # resets the streak
+        self._fail(2)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self._fail(1)
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow_request())
+        self.assertEqual(self.breaker.metrics()["rejected"], 1)
+
+    def test_half_open_limits_probes_and_closes_on_success(self):
+        self._fail(3)
+        self.clock.now = 10
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertTrue(self.breaker.allow_request())
+        self.assertFalse(self.breaker.allow_request())  # one probe at a time
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.metrics()["transitions"],
+                         {"closed->open": 1, "open->half-open": 1,
+                          "half-open->closed": 1})
+
+    def test_failed_probe_reopens(self):
+        self._fail(3)
+        self.clock.now = 10
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.clock.now = 15
+        self.assertFalse(self.breaker.allow_request())
+        self.clock.now = 20
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+
+    def test_zero_threshold_disables(self):
+        breaker = CircuitBreaker("x", failure_threshold=0)
+        for _ in range(10):
+            breaker.record_failure()
+        self.assertTrue(breaker.allow_request())
+        self.assertEqual(breaker.state, CLOSED)
+
+
+class TestBreakerRateProvider(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = _Clock()
+        self.breaker = CircuitBreaker("upstream", failure_threshold=2,
+                                      recovery_timeout=10, clock=self.clock)
+
+    def test_open_circuit_fails_fast(self):
+        upstream = _ScriptedProvider("Timeout", "Timeout")
+        provider = BreakerRateProvider(upstream, self.breaker)
+        provider.get_quote("USD", "EUR")
+        provider.get_quote("USD", "EUR")
+
+        quote = provider.get_quote("USD", "EUR")
+        self.assertEqual(quote.error, CIRCUIT_OPEN_ERROR)
+        self.assertEqual(upstream.calls, 2)
+
+    def test_open_circuit_serves_last_good_rate(self):
+        upstream = _ScriptedProvider(None, "Timeout", "Timeout")
+        provider = BreakerRateProvider(upstream, self.breaker)
+        for _ in range(3):
+            provider.get_quote("USD", "EUR")
+
+        quote = provider.get_quote("USD", "EUR")
+        self.assertEqual((quote.rate, quote.provider), (1.25, "upstream:cached"))
+        self.assertEqual(upstream.calls, 3)
+
+    def test_open_circuit_uses_snapshot_fallback(self):
+        snapshot = StaticRateProvider("USD", {"EUR": 0.5})
+        provider = BreakerRateProvider(_ScriptedProvider("Timeout", "Timeout"),
+                                       self.breaker, fallback=snapshot)
+        provider.get_quote("USD", "EUR")
+        provider.get_quote("USD", "EUR")
+
+        quote = provider.get_quote("EUR", "USD")
+        self.assertAlmostEqual(quote.rate, 2.0)
+        self.assertEqual(provider.served_fallback, 1)
+
+    def test_client_errors_do_not_trip(self):
+        upstream = _ScriptedProvider("unsupported-code", "unsupported-code",
+                                     "unsupported-code")
+        provider = BreakerRateProvider(upstream, self.breaker)
+        for _ in range(3):
+            provider.get_quote("USD", "ZZZ")
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_raising_probe_releases_its_slot(self):
+        upstream = _ScriptedProvider("Timeout", "Timeout")
+        provider = BreakerRateProvider(upstream, self.breaker)
+        provider.get_quote("USD", "EUR")
+        provider.get_quote("USD", "EUR")
+        self.clock.now = 10
+
+        upstream.get_quote = lambda *pair: 1 / 0
+        with self.assertRaises(ZeroDivisionError):
+            provider.get_quote("USD", "EUR")
+        self.assertEqual(self.breaker.state, OPEN)
+        self.clock.now = 20
+        del upstream.get_quote
+        self.assertTrue(provider.get_quote("USD", "EUR").ok)
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def _http_provider(self, status, breaker=None):
+        response = MagicMock(status_code=status)
+        response.raise_for_status.side_effect = requests.HTTPError(
+            f"{status} Error", response=response)
+        session = MagicMock()
+        session.get.return_value = response
+        upstream = ExchangeRateApiProvider("https://api.test/v6", "key",
+                                           session_factory=lambda: session)
+        return BreakerRateProvider(upstream, breaker or self.breaker)
+
+    def test_http_404_does_not_trip(self):
+        provider = self._http_provider(404)
+        for _ in range(3):
+            quote = provider.get_quote("USD", "ZZZ")
+        self.assertEqual((quote.error, quote.status), ("HTTPError", 404))
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_http_429_and_5xx_trip(self):
+        for status in (429, 503):
+            breaker = CircuitBreaker("upstream", failure_threshold=2,
+                                     recovery_timeout=10, clock=self.clock)
+            provider = self._http_provider(status, breaker)
+            for _ in range(2):
+                provider.get_quote("USD", "EUR")
+            self.assertEqual(breaker.state, OPEN, status)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+"""Unit tests for the lazily loaded, cached settings in config.py."""
+
+import os
+import unittest
+from unittest.mock import patch
+
+import config
+
+
+class TestSettings(unittest.TestCase):
+
+    def setUp(self):
+        config.reset_settings()
+        self.addCleanup(config.reset_settings)
+
+    @patch.dict(os.environ, {"EXCHANGE_RATE_API_KEY": "abc", "LOG_LEVEL": "debug"})
+    def test_settings_are_loaded_once_and_cached(self):
+        first = config.get_settings()
+        self.assertIs(first, config.get_settings())
+        self.assertEqual(first.log_level, "DEBUG")
+        self.assertEqual(config.API_KEY, "abc")
+
+    @patch.dict(os.environ, {"LOG_LEVEL": "LOUD"})
+    def test_invalid_log_level_is_rejected_on_first_use(self):
+        with self.assertRaises(ValueError):
+            config.get_settings()
+
+    @patch.dict(os.environ, {"EXCHANGE_RATE_API_KEY": ""})
+    def test_missing_api_key_only_raises_when_required(self):
+        settings = config.get_settings()
+        self.assertIsNone(settings.api_key)
+        with self.assertRaises(RuntimeError):
+            settings.require_api_key()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
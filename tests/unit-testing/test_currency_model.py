@@ -0,0 +1,96 @@
+"""Unit tests for the Qt models behind the currency dropdowns (run offscreen)."""
+
+import os
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QModelIndex, Qt  # noqa: E402
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from data.currency_registry import Currency  # noqa: E402
+from gui.currency_model import (  # noqa: E402
+    CODE_ROLE, NAME_ROLE, CurrencyComboBox, CurrencyFilterProxyModel, CurrencyListModel
+)
+
+CURRENCIES = [Currency("EUR", "Euro"), Currency("GBP", "British Pound Sterling"),
+              Currency("USD", "United States Dollar")]
+
+
+def setUpModule():
+    global _app
+    _app = QApplication.instance() or QApplication([])
+
+
+class TestCurrencyListModel(unittest.TestCase):
+
+    def setUp(self):
+        self.model = CurrencyListModel(CURRENCIES)
+
+    def test_roles(self):
+        index = self.model.index(1, 0)
+        self.assertEqual(self.model.rowCount(), 3)
+        self.assertEqual(self.model.data(index), "GBP — British Pound Sterling")
+        self.assertEqual(self.model.data(index, Qt.ItemDataRole.EditRole),
+                         "GBP — British Pound Sterling")
+        self.assertEqual(self.model.data(index, CODE_ROLE), "GBP")
+        self.assertEqual(self.model.data(index, NAME_ROLE), "British Pound Sterling")
+        self.assertEqual(self.model.data(index, Qt.ItemDataRole.ToolTipRole),
+                         "British Pound Sterling")
+        self.assertIsNone(self.model.data(QModelIndex()))
+        # A flat list: valid rows have no children.
+        self.assertEqual(self.model.rowCount(index), 0)
+
+    def test_set_currencies_resets_once(self):
+        resets = []
+        self.model.modelReset.connect(lambda: resets.append(True))
+        self.model.set_currencies(CURRENCIES[:1])
+        self.assertEqual((self.model.rowCount(), len(resets)), (1, 1))
+        self.assertEqual(self.model.row_of("EUR"), 0)
+        self.assertEqual(self.model.row_of("USD"), -1)
+
+
+class TestCurrencyFilterProxyModel(unittest.TestCase):
+
+    def setUp(self):
+        self.model = CurrencyListModel(CURRENCIES)
+        self.proxy = CurrencyFilterProxyModel()
+        self.proxy.setSourceModel(self.model)
+
+    def codes(self):
+        return [self.proxy.data(self.proxy.index(row, 0), CODE_ROLE)
+                for row in range(self.proxy.rowCount())]
+
+    def test_filters_on_code_and_name_ignoring_case(self):
+        self.assertEqual(self.codes(), ["EUR", "GBP", "USD"])
+        self.proxy.set_search_text("gb")
+        self.assertEqual(self.codes(), ["GBP"])
+        self.proxy.set_search_text("  STATES ")
+        self.assertEqual(self.codes(), ["USD"])
+        self.proxy.set_search_text("xyz")
+        self.assertEqual(self.codes(), [])
+        self.proxy.set_search_text("")
+        self.assertEqual(len(self.codes()), 3)
+
+
+class TestCurrencyComboBox(unittest.TestCase):
+
+    def test_shared_model_and_independent_search(self):
+        model = CurrencyListModel()
+        first, second = CurrencyComboBox(model), CurrencyComboBox(model)
+        self.assertIsNone(first.current_code())
+        model.set_currencies(CURRENCIES)
+        first.set_current_code("USD")
+        second.set_current_code("EUR")
+        self.assertEqual((first.current_code(), second.current_code()), ("USD", "EUR"))
+
+        first._proxy.set_search_text("pound")
+        self.assertEqual(first._proxy.rowCount(), 1)
+        self.assertEqual(second._proxy.rowCount(), 3)
+        first._select_text("GBP — British Pound Sterling")
+        self.assertEqual(first.current_code(), "GBP")
+        self.assertEqual(first._proxy.rowCount(), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
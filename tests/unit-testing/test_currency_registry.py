@@ -0,0 +1,43 @@
+"""Unit tests for the pandas-free currency registry used by the GUI model."""
+
+import os
+import tempfile
+import unittest
+
+from data.currency_registry import get_currency_registry, load_currency_registry
+
+
+class TestCurrencyRegistry(unittest.TestCase):
+
+    def test_bundled_registry_is_keyed_by_iso_code(self):
+        registry = get_currency_registry()
+        self.assertIn("USD", registry)
+        self.assertEqual(registry.name_of("GBP"), "British Pound Sterling")
+        self.assertEqual(registry.codes[registry.ordinal("USD")], "USD")
+
+    def test_ordinals_follow_csv_order(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "currencies.csv")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("currency code,currency name\n"
+                        "eur,Euro\nUSD,United States Dollar\n\n")
+            registry = load_currency_registry(path)
+
+        self.assertEqual(registry.codes, ("EUR", "USD"))
+        self.assertEqual(registry.ordinal("USD"), 1)
+        with self.assertRaises(KeyError):
+            registry.ordinal("XXX")
+
+    def test_bundled_csv_is_found_from_any_directory(self):
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                registry = load_currency_registry()
+            finally:
+                os.chdir(cwd)
+        self.assertIn("USD", registry)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
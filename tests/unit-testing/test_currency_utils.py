@@ -13,18 +13,20 @@ functions imported from currency_utils. """
 import unittest
 from unittest.mock import patch
 import requests.exceptions
-from currency_utils import convert_currency, get_exchange_rate
+from currency_utils import (
+    backoff_delay, convert_batch, convert_currency, get_exchange_rate
+)
 
 """Creates test class, inheriting from unittest, that will test the
 get_exchange_rate function from our currency_utils file.
 It inherits from unittest.TestCase, which provides test runner features
 and assertion methods."""
 
-"""A decorator replacing the requests.get inside the currency_utils
-   with a mock object."""
+"""A decorator replacing the get method of the pooled requests.Session
+   used inside currency_utils with a mock object."""
 
 
-@patch("currency_utils.requests.get")
+@patch("currency_utils.requests.Session.get")
 class TestGetExchangeRate(unittest.TestCase):
 
     # A test method, testing the successful API call outcome.
@@ -134,5 +136,45 @@ class TestConvertCurrency(unittest.TestCase):
             convert_currency("fake_api_key", None, "USD", "EUR")
 
 
+# convert_batch yields in completion order, so results are sorted by index
+# before comparing. time.sleep is patched so backoff never slows the tests.
+@patch("currency_utils.time.sleep")
+@patch("currency_utils.get_exchange_rate")
+class TestConvertBatch(unittest.TestCase):
+
+    def test_converts_every_line(self, mock_get_rate, mock_sleep):
+        mock_get_rate.side_effect = lambda f, t: {"EUR": 0.5, "GBP": 0.25}[t]
+        conversions = [(10, "usd", "EUR"), (4, "USD", "GBP"), (2, "USD", "EUR")]
+        results = sorted(convert_batch(conversions, max_workers=2),
+                         key=lambda r: r.index)
+        self.assertEqual([r.converted for r in results], [5.0, 1.0, 1.0])
+        self.assertEqual(results[0].from_currency, "USD")
+
+    def test_each_pair_fetched_once(self, mock_get_rate, mock_sleep):
+        mock_get_rate.return_value = 2.0
+        results = list(convert_batch([(1, "USD", "EUR")] * 50, max_workers=4))
+        self.assertEqual(len(results), 50)
+        mock_get_rate.assert_called_once_with("USD", "EUR")
+
+    def test_invalid_entries_are_reported_without_lookup(self, mock_get_rate, mock_sleep):
+        results = sorted(convert_batch([(-1, "USD", "EUR"), (1, "US", "EUR")]),
+                         key=lambda r: r.index)
+        self.assertEqual([r.error for r in results],
+                         ["invalid amount", "invalid currency code"])
+        mock_get_rate.assert_not_called()
+
+    def test_failing_pair_backs_off_then_gives_up(self, mock_get_rate, mock_sleep):
+        mock_get_rate.return_value = None
+        [result] = convert_batch([(1, "USD", "EUR")], max_retries=2)
+        self.assertIsNone(result.converted)
+        self.assertEqual(mock_get_rate.call_count, 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+
+    def test_backoff_delay_is_capped(self, mock_get_rate, mock_sleep):
+        for attempt in range(10):
+            delay = backoff_delay(attempt, base_delay=0.5, max_delay=2.0)
+            self.assertTrue(0 <= delay <= min(2.0, 0.5 * 2 ** attempt))
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
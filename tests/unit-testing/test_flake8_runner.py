@@ -0,0 +1,114 @@
+"""Unit tests for the sharded, cached flake8 runner.
+
+A stand-in flake8 command reports one issue per file and records which
+files it was asked to lint, so no real flake8 install is needed.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+FLAKE8_DIR = Path(__file__).resolve().parents[2] / "flake8"
+if str(FLAKE8_DIR) not in sys.path:
+    sys.path.insert(0, str(FLAKE8_DIR))
+
+import flake8_report_creator  # noqa: E402
+
+FAKE_FLAKE8 = """
+import sys
+files = [arg for arg in sys.argv[1:] if not arg.startswith("-")]
+if "--version" in sys.argv:
+    print("fake-flake8 1.0")
+    sys.exit(0)
+with open(sys.argv[0] + ".calls", "a", encoding="utf-8") as log:
+    log.writelines(f + "\\n" for f in files)
+for f in files:
+    size = len(open(f, encoding="utf-8").read())
+    print(f"{f}:1:{size}: E501 line too long")
+sys.exit(1 if files else 0)
+"""
+
+
+class TestIncrementalFlake8(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.src = self.root / "src"
+        (self.src / "pkg").mkdir(parents=True)
+        (self.src / "__pycache__").mkdir()
+        (self.src / "__pycache__" / "skip.py").write_text("x")
+        for name in ("b.py", "a.py", "pkg/c.py"):
+            (self.src / name).write_text("x = 1\n")
+
+        fake = self.root / "fake_flake8.py"
+        fake.write_text(FAKE_FLAKE8)
+        self.calls_file = Path(str(fake) + ".calls")
+        reports = self.root / "reports"
+        for name, value in {"FLAKE8_COMMAND": [sys.executable, str(fake)],
+                            "FLAKE8_REPORTS_DIR": reports,
+                            "FLAKE8_CACHE_FILE": reports / ".cache.json"}.items():
+            patcher = patch.object(flake8_report_creator, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _linted(self):
+        if not self.calls_file.exists():
+            return []
+        linted = self.calls_file.read_text().split()
+        self.calls_file.unlink()
+        return sorted(Path(f).name for f in linted)
+
+    def test_report_is_merged_in_stable_order(self):
+        report, stats = flake8_report_creator.run_flake8_incremental(self.src, jobs=3)
+        lines = report.read_text().splitlines()
+        self.assertEqual([Path(line.split(":")[0]).name for line in lines],
+                         ["a.py", "b.py", "c.py"])
+        self.assertEqual((stats.files, stats.linted, stats.cached), (3, 3, 0))
+
+    def test_unchanged_files_come_from_cache(self):
+        first, _ = flake8_report_creator.run_flake8_incremental(self.src, jobs=2)
+        self._linted()
+        os.remove(first)
+
+        (self.src / "b.py").write_text("x = 10\n")
+        second, stats = flake8_report_creator.run_flake8_incremental(self.src, jobs=2)
+        self.assertEqual(self._linted(), ["b.py"])
+        self.assertEqual((stats.cached, stats.linted), (2, 1))
+        self.assertAlmostEqual(stats.hit_rate, 2 / 3)
+        self.assertIn(":1:7: E501", second.read_text())
+
+    def test_no_cache_lints_everything(self):
+        flake8_report_creator.run_flake8_incremental(self.src)
+        self._linted()
+        _, stats = flake8_report_creator.run_flake8_incremental(self.src, use_cache=False)
+        self.assertEqual(self._linted(), ["a.py", "b.py", "c.py"])
+        self.assertEqual(stats.cached, 0)
+
+    def test_config_excludes_are_not_linted(self):
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.root)
+        (self.root / ".flake8").write_text(
+            "[flake8]\nexclude = __pycache__, build, src/pkg\nextend-exclude = gen_*.py\n")
+        for name in ("build/out.py", "gen_parser.py"):
+            (self.src / name).parent.mkdir(exist_ok=True)
+            (self.src / name).write_text("import os\n")
+
+        report, stats = flake8_report_creator.run_flake8_incremental("src", jobs=1)
+        self.assertEqual(self._linted(), ["a.py", "b.py"])
+        self.assertEqual(stats.files, 2)
+        self.assertNotIn("out.py", report.read_text())
+
+    def test_shards_never_empty(self):
+        self.assertEqual(flake8_report_creator._shards([], 4), [])
+        shards = flake8_report_creator._shards([str(i) for i in range(100)], 4)
+        self.assertEqual(sorted(sum(shards, [])), sorted(str(i) for i in range(100)))
+        self.assertEqual(len(flake8_report_creator._shards(["a"] * 100, 1)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
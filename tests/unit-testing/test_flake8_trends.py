@@ -0,0 +1,112 @@
+"""Unit tests for the streaming flake8 report parser and the trend index."""
+
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+FLAKE8_DIR = Path(__file__).resolve().parents[2] / "flake8"
+if str(FLAKE8_DIR) not in sys.path:
+    sys.path.insert(0, str(FLAKE8_DIR))
+
+import trend_index  # noqa: E402
+import utils  # noqa: E402
+from parser import parse_flake8_report, summarize_flake8_report  # noqa: E402
+from trend_index import TrendIndex  # noqa: E402
+
+REPORT = (
+    "app.py:1:80: E501 line too long (88 > 79 characters)\n"
+    "app.py:3:1: F401 'os' imported but unused\n"
+    "C:\\project\\win.py:10:5: E501 line too long\n"
+    "pkg/mod.py:2:1: E302 expected 2 blank lines, found 1\n"
+    "\n"
+    "not a flake8 line\n"
+)
+
+
+class TestReportParser(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.report = self.dir / "flake8-report_2025-01-02_03-04-05.txt"
+        self.report.write_text(REPORT, encoding="utf-8")
+
+    def test_counts_codes_and_files(self):
+        error_counts, file_counts = parse_flake8_report(self.report)
+        self.assertEqual(error_counts, {"E501": 2, "F401": 1, "E302": 1})
+        self.assertEqual(file_counts["app.py"], 2)
+        self.assertEqual(file_counts["pkg/mod.py"], 1)
+
+    def test_windows_paths_are_kept_whole(self):
+        _, file_counts = parse_flake8_report(self.report)
+        self.assertEqual(file_counts["C:\\project\\win.py"], 1)
+        self.assertNotIn("C", file_counts)
+
+    def test_summary_totals_and_skipped_lines(self):
+        summary = summarize_flake8_report(self.report)
+        self.assertEqual(summary.total, 4)
+        self.assertEqual(summary.skipped, 1)
+
+    def test_report_listing_uses_the_creator_file_names(self):
+        older = self.dir / "flake8-report_2024-12-31_23-59-59.txt"
+        older.write_text("", encoding="utf-8")
+        (self.dir / "notes.txt").write_text("", encoding="utf-8")
+        self.assertEqual(utils.list_flake8_reports(self.dir), [older, self.report])
+        self.assertEqual(utils.report_timestamp(self.report),
+                         datetime(2025, 1, 2, 3, 4, 5))
+        with patch.object(utils, "FLAKE8_REPORTS_DIR", self.dir):
+            self.assertIn(utils.get_latest_flake8_report(), (older, self.report))
+
+
+class TestTrendIndex(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.index = TrendIndex(self.dir / "trends.sqlite3")
+        self.addCleanup(self.index.close)
+
+    def _report(self, stamp, lines):
+        report = self.dir / f"flake8-report_{stamp}.txt"
+        report.write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+        return report
+
+    def test_record_is_append_only(self):
+        report = self._report("2025-01-01_00-00-00", ["a.py:1:1: E501 long"])
+        summary = summarize_flake8_report(report)
+        self.assertTrue(self.index.record(report, summary, files_scanned=3))
+        self.assertFalse(self.index.record(report, summary))
+        runs = self.index.runs()
+        self.assertEqual(len(runs), 1)
+        self.assertEqual((runs[0].total, runs[0].files_with_issues,
+                          runs[0].files_scanned), (1, 1, 3))
+        self.assertEqual(self.index.code_counts(report.name), {"E501": 1})
+
+    def test_backfill_only_parses_new_reports(self):
+        first = self._report("2025-01-01_00-00-00",
+                             ["a.py:1:1: E501 long", "b.py:1:1: F401 unused"])
+        self.assertEqual(self.index.backfill([first]), 1)
+        second = self._report("2025-01-02_00-00-00", ["a.py:1:1: E501 long"])
+
+        with patch.object(trend_index, "summarize_flake8_report",
+                          wraps=summarize_flake8_report) as summarize:
+            self.assertEqual(self.index.backfill([first, second]), 1)
+        summarize.assert_called_once_with(second)
+
+    def test_runs_are_the_latest_oldest_first(self):
+        for day, issues in ((1, 3), (3, 1), (2, 2)):
+            report = self._report(f"2025-01-0{day}_00-00-00",
+                                  [f"a.py:{n}:1: E501 long" for n in range(issues)])
+            self.index.record(report, summarize_flake8_report(report))
+        runs = self.index.runs(limit=2)
+        self.assertEqual([run.run_at.day for run in runs], [2, 3])
+        self.assertEqual([run.total for run in runs], [2, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
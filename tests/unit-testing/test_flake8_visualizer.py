@@ -0,0 +1,128 @@
+"""Unit tests for chart specs, the render cache and the text/HTML summaries.
+
+Rendering itself is replaced by a stand-in that writes empty files, run
+on threads instead of processes, so these tests need no plotting library.
+"""
+
+import subprocess
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+FLAKE8_DIR = Path(__file__).resolve().parents[2] / "flake8"
+if str(FLAKE8_DIR) not in sys.path:
+    sys.path.insert(0, str(FLAKE8_DIR))
+
+import summary  # noqa: E402
+import visualizer  # noqa: E402
+
+ERRORS = {"E501": 3, "F401": 1, "E302": 2}
+FILES = {"b.py": 2, "a.py": 2, "c.py": 1}
+
+
+class TestChartSpecs(unittest.TestCase):
+
+    def test_error_code_chart_is_sorted_by_code(self):
+        spec = visualizer.error_code_chart(ERRORS)
+        self.assertEqual(spec.labels, ("E302", "E501", "F401"))
+        self.assertEqual(spec.values, (2, 3, 1))
+
+    def test_top_files_chart_orders_ties_by_name(self):
+        spec = visualizer.top_files_chart(FILES, min_issues=2)
+        self.assertEqual(spec.labels, ("a.py", "b.py"))
+
+    def test_no_data_gives_no_chart(self):
+        self.assertIsNone(visualizer.error_code_chart({}))
+        self.assertIsNone(visualizer.error_code_chart(ERRORS, filter_codes={"W605"}))
+        self.assertIsNone(visualizer.top_files_chart(FILES, min_issues=5))
+
+    def test_digest_depends_on_data_and_output_settings(self):
+        spec = visualizer.error_code_chart(ERRORS)
+        self.assertEqual(spec.digest(("png",), 300),
+                         visualizer.error_code_chart(dict(ERRORS)).digest(("png",), 300))
+        self.assertNotEqual(spec.digest(("png",), 300), spec.digest(("png",), 100))
+        changed = visualizer.error_code_chart({**ERRORS, "E501": 4})
+        self.assertNotEqual(spec.digest(("png",), 300), changed.digest(("png",), 300))
+
+
+def _fake_render(spec, output_dir, formats, dpi):
+    paths = []
+    for ext in formats:
+        path = Path(output_dir) / f"{spec.name}.{ext}"
+        path.write_bytes(b"")
+        paths.append(str(path))
+    return paths
+
+
+class TestRenderCache(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.out = Path(tmp.name) / "graphs"
+        for name, value in {"FLAKE8_RENDER_CACHE": self.out / ".render_cache.json",
+                            "ProcessPoolExecutor": ThreadPoolExecutor}.items():
+            patcher = patch.object(visualizer, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = patch.object(visualizer, "_render", side_effect=_fake_render)
+        self.render = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _render_all(self, errors=ERRORS, files=FILES, **kwargs):
+        specs = [visualizer.error_code_chart(errors), visualizer.top_files_chart(files)]
+        return visualizer.render_charts(specs, output_dir=self.out, **kwargs)
+
+    def test_unchanged_charts_are_skipped(self):
+        self.assertEqual(set(self._render_all().values()), {visualizer.RENDERED})
+        self.assertEqual(self.render.call_count, 2)
+        self.assertEqual(set(self._render_all().values()), {visualizer.CACHED})
+        self.assertEqual(self.render.call_count, 2)
+
+    def test_only_changed_charts_are_redrawn(self):
+        self._render_all()
+        statuses = self._render_all(errors={**ERRORS, "W605": 1})
+        self.assertEqual(statuses, {"flake8_error_codes": visualizer.RENDERED,
+                                    "flake8_top_files": visualizer.CACHED})
+
+    def test_missing_outputs_or_force_redraw(self):
+        self._render_all()
+        (self.out / "flake8_top_files.svg").unlink()
+        self.assertEqual(self._render_all()["flake8_top_files"], visualizer.RENDERED)
+        self.assertEqual(set(self._render_all(force=True).values()), {visualizer.RENDERED})
+
+    def test_failed_render_is_retried_next_time(self):
+        self.render.side_effect = RuntimeError("no backend")
+        self.assertEqual(set(self._render_all().values()), {visualizer.FAILED})
+        self.render.side_effect = _fake_render
+        self.assertEqual(set(self._render_all().values()), {visualizer.RENDERED})
+
+
+class TestSummaries(unittest.TestCase):
+
+    def test_text_summary(self):
+        text = summary.text_summary(ERRORS, FILES, top=2)
+        self.assertIn("E501: 3 occurrences", text)
+        self.assertLess(text.index("E501"), text.index("E302"))
+        self.assertIn("a.py: 2 issues", text)
+        self.assertNotIn("c.py", text)
+
+    def test_html_summary_escapes_names(self):
+        page = summary.html_summary(ERRORS, {"<script>.py": 1})
+        self.assertIn("&lt;script&gt;.py", page)
+        self.assertNotIn("<script>", page)
+        self.assertIn("6 issues in 1 files", page)
+
+    def test_no_plotting_libraries_are_imported(self):
+        code = ("import sys, summary, visualizer; "
+                "print(any(m.split('.')[0] in ('matplotlib', 'seaborn') for m in sys.modules))")
+        result = subprocess.run([sys.executable, "-c", code], cwd=FLAKE8_DIR,
+                                capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "False")
+
+
+if __name__ == "__main__":
+    unittest.main()
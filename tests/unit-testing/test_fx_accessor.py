@@ -0,0 +1,85 @@
+"""Unit tests for the pandas df.fx conversion accessor."""
+
+import threading
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+import fx_accessor  # noqa: F401  (registers df.fx)
+from fx_accessor import convert_chunks
+from rate_providers import StaticRateProvider
+
+
+class _CountingLookup:
+    def __init__(self):
+        self.provider = StaticRateProvider("USD", {"EUR": 0.5, "JPY": 100.0})
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, from_currency, to_currency):
+        with self._lock:
+            self.calls.append((from_currency, to_currency))
+        return self.provider.get_rate(from_currency, to_currency)
+
+
+class TestFxAccessor(unittest.TestCase):
+
+    def setUp(self):
+        self.lookup = _CountingLookup()
+        self.df = pd.DataFrame({
+            "amount": [10, 20, 30, -5, "abc", 40, 50],
+            "from": ["USD", "usd", "EUR", "USD", "USD", "USD", "XXX"],
+            "to": ["EUR", "EUR", "JPY", "EUR", "EUR", "USD", "EUR"],
+        })
+
+    def test_convert_resolves_each_pair_once(self):
+        out = self.df.fx.convert("amount", "from", "to", out_col="converted",
+                                 rate_col="rate", get_rate=self.lookup)
+        expected = [5.0, 10.0, 6000.0, np.nan, np.nan, 40.0, np.nan]
+        np.testing.assert_allclose(out["converted"].to_numpy(), expected)
+        self.assertEqual(sorted(self.lookup.calls),
+                         [("EUR", "JPY"), ("USD", "EUR"), ("XXX", "EUR")])
+        self.assertNotIn("converted", self.df.columns)  # input left alone
+
+    def test_chunked_matches_single_pass(self):
+        whole = self.df.fx.convert("amount", "from", "to", get_rate=self.lookup)
+        calls = len(self.lookup.calls)
+        chunked = self.df.fx.convert("amount", "from", "to", get_rate=self.lookup,
+                                     chunksize=2)
+        pd.testing.assert_frame_equal(whole, chunked)
+        self.assertEqual(len(self.lookup.calls), calls * 2)  # once per pair per call
+
+    def test_chunked_fills_one_output_in_place(self):
+        df = self.df.set_index(pd.Index(list("aabbccd")))  # duplicate labels
+        whole = df.fx.convert("amount", "from", "to", rate_col="rate",
+                              get_rate=self.lookup)
+        with patch("fx_accessor.pd.concat") as concat:
+            chunked = df.fx.convert("amount", "from", "to", rate_col="rate",
+                                    get_rate=self.lookup, chunksize=3)
+        concat.assert_not_called()
+        pd.testing.assert_frame_equal(whole, chunked)
+
+    def test_convert_chunks_shares_rates_across_chunks(self):
+        chunks = [self.df.iloc[:3], self.df.iloc[3:]]
+        parts = list(convert_chunks(chunks, "amount", "from", "to",
+                                    get_rate=self.lookup))
+        self.assertEqual(len(parts), 2)
+        self.assertEqual(len(self.lookup.calls), 3)
+
+    def test_rates(self):
+        rates = self.df.fx.rates("from", "to", get_rate=self.lookup)
+        self.assertEqual(rates.iloc[0], 0.5)
+        self.assertTrue(np.isnan(rates.iloc[6]))
+
+    def test_defaults_to_get_exchange_rate(self):
+        with patch("currency_utils.get_exchange_rate", return_value=2.0) as mock_rate:
+            out = pd.DataFrame({"a": [1.5], "f": ["GBP"], "t": ["EUR"]}) \
+                .fx.convert("a", "f", "t")
+        self.assertEqual(out["converted"].iloc[0], 3.0)
+        mock_rate.assert_called_once_with("GBP", "EUR")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,240 @@
+"""Unit tests for the binary conversion journal and its memory-mapped reader."""
+
+import math
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+import currency_utils
+import journal
+from journal import FAILED, RECORD_SIZE, ConversionJournal, JournalReader
+from rate_providers import StaticRateProvider
+
+CODES = ("EUR", "GBP", "JPY", "USD")
+
+
+class TestConversionJournal(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+
+    def _journal(self, **options):
+        writer = ConversionJournal(self.dir, codes=CODES, **options)
+        self.addCleanup(writer.close)
+        return writer
+
+    def test_round_trip(self):
+        writer = self._journal()
+        writer.record(10, "usd", "EUR", 0.5, 5.0, provider="static", ts=100.0)
+        writer.record(3, "USD", "XXX", None, None, provider="api", ts=101.0)
+        self.assertTrue(writer.sync(timeout=5))
+
+        reader = JournalReader(self.dir, codes=CODES)
+        records = reader.records()
+        self.assertEqual(len(records), 2)
+        first, failed = records
+        self.assertEqual((reader.code(first["from"]), reader.code(first["to"])),
+                         ("USD", "EUR"))
+        self.assertEqual((first["amount"], first["rate"], first["result"]), (10, 0.5, 5.0))
+        self.assertEqual(reader.providers[first["provider"]], "static")
+        self.assertEqual(failed["to"], journal.UNKNOWN_CODE)
+        self.assertEqual(failed["flags"] & FAILED, FAILED)
+        self.assertTrue(math.isnan(failed["result"]))
+        self.assertEqual(reader.providers[failed["provider"]], "api")
+
+    def test_records_are_grouped_into_few_fsyncs(self):
+        writer = self._journal(commit_interval=0.05)
+        with patch("journal.os.fsync") as fsync:
+            threads = [threading.Thread(target=lambda: [
+                writer.record(1, "USD", "EUR", 0.5, 0.5) for _ in range(250)])
+                for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            writer.sync(timeout=5)
+        self.assertEqual(len(JournalReader(self.dir, codes=CODES).records()), 1000)
+        self.assertLess(fsync.call_count, 20)
+
+    def test_segments_roll_over_and_are_read_in_order(self):
+        writer = self._journal(segment_bytes=64 + 10 * RECORD_SIZE)
+        for i in range(25):
+            writer.record(i + 1, "USD", "EUR", 0.5, (i + 1) / 2, ts=float(i))
+        writer.sync(timeout=5)
+        self.assertEqual(len(list(self.dir.glob("journal-*.fxj"))), 3)
+        records = JournalReader(self.dir, codes=CODES).records()
+        self.assertEqual(records["ts"].tolist(), [float(i) for i in range(25)])
+
+    def test_batch_spanning_a_rollover_is_fsynced_in_every_segment(self):
+        writer = self._journal(segment_bytes=64 + 10 * RECORD_SIZE, commit_interval=60)
+        synced = set()
+        fsync = journal.os.fsync
+
+        def recording_fsync(fd):
+            fsync(fd)
+            stat = journal.os.fstat(fd)
+            synced.add((stat.st_ino, stat.st_size))
+        with patch("journal.os.fsync", side_effect=recording_fsync):
+            for i in range(15):
+                writer.record(1, "USD", "EUR", 0.5, 0.5, ts=float(i))
+            self.assertTrue(writer.sync(timeout=5))
+        segments = sorted(self.dir.glob("journal-*.fxj"))
+        self.assertEqual(len(segments), 2)
+        for segment in segments:
+            stat = segment.stat()
+            self.assertIn((stat.st_ino, stat.st_size), synced, segment.name)
+
+    def test_torn_record_is_ignored_then_truncated(self):
+        writer = self._journal()
+        writer.record(1, "USD", "EUR", 0.5, 0.5)
+        writer.close()
+        segment = next(self.dir.glob("journal-*.fxj"))
+        with segment.open("ab") as f:
+            f.write(b"\x01" * (RECORD_SIZE // 2))  # crash mid-record
+
+        self.assertEqual(len(JournalReader(self.dir, codes=CODES).records()), 1)
+        reopened = self._journal()
+        reopened.record(2, "GBP", "USD", 2.0, 4.0, provider="static")
+        reopened.sync(timeout=5)
+        records = JournalReader(self.dir, codes=CODES).records()
+        self.assertEqual(records["amount"].tolist(), [1.0, 2.0])
+
+    def test_other_registry_segments_are_skipped(self):
+        writer = self._journal()
+        writer.record(1, "USD", "EUR", 0.5, 0.5)
+        writer.close()
+        other = ConversionJournal(self.dir, codes=("AUD", "USD"))
+        other.record(1, "AUD", "USD", 0.6, 0.6)
+        other.close()
+        self.assertEqual(len(list(self.dir.glob("journal-*.fxj"))), 2)
+        records = JournalReader(self.dir, codes=CODES).records()
+        self.assertEqual(records["rate"].tolist(), [0.5])
+
+    def test_writers_sharing_a_directory_keep_every_record(self):
+        # Separate writers behave like separate processes: own files and ids.
+        writers = [self._journal(segment_bytes=64 + 7 * RECORD_SIZE, commit_interval=0.01)
+                   for _ in range(2)]
+
+        def write(index, writer):
+            for i in range(40):
+                writer.record(i, "USD", "EUR", 0.5, i / 2, provider=f"provider-{index}",
+                              ts=float(index))
+                if i % 5 == 0:
+                    writer.sync(timeout=5)
+            writer.sync(timeout=5)
+
+        threads = [threading.Thread(target=write, args=item) for item in enumerate(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        reader = JournalReader(self.dir, codes=CODES)
+        records = reader.records()
+        self.assertEqual(len(records), 80)
+        for index in range(2):
+            mine = records[records["ts"] == index]
+            self.assertEqual(sorted(mine["amount"].tolist()), [float(i) for i in range(40)])
+            self.assertEqual({reader.providers[p] for p in mine["provider"]},
+                             {f"provider-{index}"})
+
+    def test_failed_commit_is_retried_without_duplicates(self):
+        writer = self._journal(commit_interval=0.01)
+        writer.record(1, "USD", "EUR", 0.5, 0.5)
+        real_fsync = journal.os.fsync
+        with patch("journal.os.fsync", side_effect=OSError("disk full")), \
+                self.assertLogs("journal", "ERROR"):
+            self.assertFalse(writer.sync(timeout=5))
+        with patch("journal.os.fsync", real_fsync):
+            self.assertTrue(writer.sync(timeout=5))
+        records = JournalReader(self.dir, codes=CODES).records()
+        self.assertEqual(records["amount"].tolist(), [1.0])
+
+    def test_closed_journal_refuses_records(self):
+        writer = self._journal()
+        writer.close()
+        with self.assertRaises(ValueError):
+            writer.record(1, "USD", "EUR", 0.5, 0.5)
+
+
+class TestJournalReader(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        writer = ConversionJournal(self.dir, codes=CODES)
+        for ts, (amount, from_code, to_code, rate) in enumerate([
+                (10, "USD", "EUR", 0.5), (20, "USD", "EUR", 0.5),
+                (1, "GBP", "JPY", 190.0), (5, "USD", "EUR", None)]):
+            writer.record(amount, from_code, to_code, rate,
+                          None if rate is None else amount * rate, ts=float(ts))
+        writer.close()
+        self.reader = JournalReader(self.dir, codes=CODES)
+
+    def test_segments_are_read_only_memory_maps(self):
+        segment = next(self.reader.segments())
+        self.assertIsInstance(segment, np.memmap)
+        with self.assertRaises(ValueError):
+            segment["amount"][0] = 1
+
+    def test_time_filter_and_pair_mask(self):
+        records = self.reader.records(since=1.0, until=3.0)
+        self.assertEqual(records["ts"].tolist(), [1.0, 2.0])
+        everything = self.reader.records()
+        self.assertEqual(int(self.reader.pair_mask(everything, "usd", "eur").sum()), 3)
+
+    def test_totals_by_pair_skip_failures(self):
+        totals = self.reader.totals_by_pair(self.reader.records())
+        self.assertEqual(totals, {("USD", "EUR"): (2, 30.0, 15.0),
+                                  ("GBP", "JPY"): (1, 1.0, 190.0)})
+
+    def test_empty_journal(self):
+        with tempfile.TemporaryDirectory() as empty:
+            reader = JournalReader(empty, codes=CODES)
+            self.assertEqual(len(reader.records()), 0)
+            self.assertEqual(reader.totals_by_pair(reader.records()), {})
+
+
+class TestConversionsAreJournaled(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.journal = ConversionJournal(tmp.name)
+        self.addCleanup(self.journal.close)
+        self.dir = Path(tmp.name)
+        patcher = patch.object(currency_utils, "_journal", self.journal)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        currency_utils.set_rate_provider(StaticRateProvider("USD", {"EUR": 0.5}))
+        self.addCleanup(currency_utils.set_rate_provider, None)
+
+    def test_convert_currency_and_batch(self):
+        with self.assertLogs("currency_utils", level="DEBUG") as logs:
+            self.assertEqual(currency_utils.convert_currency(10, "USD", "EUR"), 5.0)
+        # The journal is the audit record, so the log line is only DEBUG.
+        self.assertTrue(any(line.startswith("DEBUG:currency_utils:Conversion:")
+                            for line in logs.output))
+        results = list(currency_utils.convert_batch([(4, "EUR", "USD"), (2, "USD", "CHF")],
+                                                    max_retries=0))
+        self.assertEqual(len(results), 2)
+        self.journal.sync(timeout=5)
+
+        reader = JournalReader(self.dir)
+        records = reader.records()
+        self.assertEqual(len(records), 3)
+        self.assertEqual({reader.providers[p] for p in records["provider"]}, {"static"})
+        self.assertEqual(int((records["flags"] & FAILED).sum()), 1)
+        self.assertEqual(sorted(records["result"][~np.isnan(records["result"])].tolist()),
+                         [5.0, 8.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+"""Unit tests for the streaming converter log analyzer."""
+
+import json
+import random
+import unittest
+
+from modular_logger.log_analyzer import LatencySketch, analyze_lines, report
+
+PLAIN = "2025-01-01 10:00:0{s} | INFO     | currency_utils | {message}\n"
+
+
+def _json_line(timestamp, message):
+    return json.dumps({"timestamp": timestamp, "level": "INFO",
+                       "name": "currency_utils", "message": message}) + "\n"
+
+
+class TestLogAnalyzer(unittest.TestCase):
+
+    def test_plain_and_json_lines_are_both_parsed(self):
+        lines = [
+            PLAIN.format(s=1, message="Rate found: 1 USD = 0.9 EUR in 120.0 ms"),
+            _json_line("2025-01-01 10:00:02", "Rate found: 1 USD = 0.9 EUR in 80.0 ms"),
+            PLAIN.format(s=3, message="Conversion: 10.00 USD → 9.00 EUR"),
+            PLAIN.format(s=4, message="HTTP request has failed (ReadTimeout) for "
+                                      "USD -> GBP in 5000.0 ms: timed out"),
+            "Traceback (most recent call last):\n",
+            PLAIN.format(s=5, message="Exchange rate API error: quota-reached | "
+                                      "Response: {}"),
+        ]
+        summary = report(analyze_lines(lines))
+
+        self.assertEqual(summary["latency_ms"]["USD/EUR"]["count"], 2)
+        self.assertEqual(summary["errors"], {"ReadTimeout": 1, "quota-reached": 1})
+        self.assertEqual(summary["conversions"]["EUR"], {"count": 1, "amount": 9.0})
+        self.assertEqual(summary["records"], 5)
+
+    def test_time_window_is_half_open(self):
+        lines = [PLAIN.format(s=s, message="Rate found: 1 USD = 1 EUR in 1.0 ms")
+                 for s in range(5)]
+        stats = analyze_lines(lines, since="2025-01-01 10:00:01",
+                              until="2025-01-01 10:00:03")
+        self.assertEqual(stats.latency["USD/EUR"].count, 2)
+
+    def test_sketch_percentiles_are_within_error_and_mergeable(self):
+        rng = random.Random(7)
+        values = [rng.lognormvariate(4, 1) for _ in range(20000)]
+        left, right = LatencySketch(), LatencySketch()
+        for i, value in enumerate(values):
+            (left if i % 2 else right).add(value)
+        left.merge(right)
+
+        values.sort()
+        for p in (50, 90, 99):
+            exact = values[round(p / 100 * (len(values) - 1))]
+            self.assertAlmostEqual(left.percentile(p) / exact, 1, delta=0.03)
+        self.assertLess(len(left.buckets), 1000)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
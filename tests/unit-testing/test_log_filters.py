@@ -0,0 +1,98 @@
+"""Unit tests for the per-call-site rate limiting and sampling log filter."""
+
+import logging
+import time
+import unittest
+from unittest.mock import patch
+
+from modular_logger.filters import SamplingFilter, parse_logger_values
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+class TestSamplingFilter(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = logging.getLogger("test_log_filters.hot_path")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+        self.handler = _ListHandler()
+        self.logger.addHandler(self.handler)
+        self.addCleanup(self.logger.removeHandler, self.handler)
+
+    def _log_errors(self, count):
+        for i in range(count):
+            self.logger.error(f"request {i} failed")  # one call site
+
+    @patch("modular_logger.filters.time.monotonic")
+    def test_burst_limit_then_summary(self, mock_now):
+        mock_now.return_value = 100.0
+        self.handler.addFilter(SamplingFilter(bursts={"": 3}, window=1.0))
+
+        self._log_errors(10)
+        self.assertEqual(self.handler.messages,
+                         ["request 0 failed", "request 1 failed", "request 2 failed"])
+
+        mock_now.return_value = 101.5  # next window
+        self._log_errors(1)
+        self.assertIn("suppressed 7 similar records", self.handler.messages[3])
+        self.assertEqual(self.handler.messages[4], "request 0 failed")
+
+    def test_tail_of_a_burst_is_summarised_in_the_background(self):
+        sampling = SamplingFilter(bursts={"": 3}, window=0.05)
+        self.handler.addFilter(sampling)
+        sampling.start_flushing()
+        self.addCleanup(sampling.close)
+        self._log_errors(10)  # and then the call site goes quiet
+        deadline = time.monotonic() + 5
+        while len(self.handler.messages) < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertIn("suppressed 7 similar records", self.handler.messages[3])
+        self.assertIn("(last: request 9 failed)", self.handler.messages[3])
+
+    def test_close_flushes_the_current_window(self):
+        sampling = SamplingFilter(bursts={"": 1}, window=60)
+        self.handler.addFilter(sampling)
+        for rate, code in ((0.5, "EUR"), (0.6, "GBP")):
+            self.logger.warning("rate %s for %s", rate, code)
+        sampling.close()
+        self.assertEqual(len(self.handler.messages), 2)
+        self.assertIn("suppressed 1 similar records", self.handler.messages[1])
+        self.assertIn("(last: rate 0.6 for GBP)", self.handler.messages[1])
+
+    def test_suppressed_records_are_not_kept(self):
+        sampling = SamplingFilter(bursts={"": 1})
+        self.handler.addFilter(sampling)
+        for _ in range(2):
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                self.logger.exception("lookup failed")
+        (site,) = sampling._sites.values()
+        self.assertEqual(site.suppressed, 1)
+        # Only plain fields: no record, exception or traceback (and frames).
+        for value in site.last:
+            self.assertIsInstance(value, (int, str, tuple))
+
+    def test_info_is_sampled_per_logger_but_warnings_are_not(self):
+        sampling = {"": 1.0, "test_log_filters": 0.0}
+        self.handler.addFilter(SamplingFilter(sample_rates=sampling, bursts={"": 0}))
+        for _ in range(5):
+            self.logger.info("noise")
+            self.logger.warning("signal")
+        self.assertEqual(self.handler.messages, ["signal"] * 5)
+
+    def test_parse_logger_values_uses_star_as_default(self):
+        values = parse_logger_values("*=50, currency_utils=5,bogus", 100)
+        self.assertEqual(values, {"": 50.0, "currency_utils": 5.0})
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,61 @@
+"""Unit tests for the background-compressing rotating file handlers."""
+
+import logging
+import os
+import tempfile
+import unittest
+
+from modular_logger.rotation import (
+    CompressingRotatingFileHandler, apply_retention, iter_log_lines,
+    list_log_segments
+)
+
+
+class TestCompressingRotatingFileHandler(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.log_file = os.path.join(self.tmp.name, "converter.log")
+
+    def _write_records(self, handler, count):
+        logger = logging.getLogger(f"test_log_rotation.{id(handler)}")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+        try:
+            for i in range(count):
+                logger.info("record %05d %s", i, "x" * 80)
+        finally:
+            logger.removeHandler(handler)
+
+    def test_rotated_segments_are_gzipped_and_readable_in_order(self):
+        handler = CompressingRotatingFileHandler(
+            self.log_file, maxBytes=2000, backupCount=100, compression="gzip")
+        self._write_records(handler, 200)
+        self.assertTrue(handler.wait_for_compression(timeout=10))
+        handler.close()
+
+        segments = list_log_segments(self.log_file)
+        self.assertGreater(len(segments), 1)
+        self.assertTrue(all(s.name.endswith(".gz") for s in segments))
+
+        lines = list(iter_log_lines(self.log_file))
+        self.assertEqual([int(line.split()[1]) for line in lines], list(range(200)))
+
+    def test_retention_by_count_and_total_bytes(self):
+        handler = CompressingRotatingFileHandler(
+            self.log_file, maxBytes=1000, backupCount=3, compression="none")
+        self._write_records(handler, 200)
+        self.assertTrue(handler.wait_for_compression(timeout=10))
+        handler.close()
+        self.assertEqual(len(list_log_segments(self.log_file)), 3)
+
+        apply_retention(self.log_file, backup_count=0, max_total_bytes=1500)
+        remaining = list_log_segments(self.log_file)
+        self.assertEqual(len(remaining), 1)
+        self.assertLessEqual(sum(s.stat().st_size for s in remaining), 1500)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
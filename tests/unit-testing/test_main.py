@@ -0,0 +1,56 @@
+"""Unit tests for the non-interactive batch mode of main.py."""
+
+import io
+import unittest
+from contextlib import redirect_stderr
+
+import currency_utils
+from main import parse_batch_lines, run_batch
+from rate_providers import StaticRateProvider
+
+
+class TestParseBatchLines(unittest.TestCase):
+
+    def test_malformed_and_non_finite_lines_are_reported(self):
+        lines = ["10 usd eur", "", "# comment", "nan USD EUR", "inf USD EUR",
+                 "1 2", "abc USD EUR", "2.5 GBP USD"]
+        malformed = []
+        with redirect_stderr(io.StringIO()) as stderr:
+            parsed = list(parse_batch_lines(lines, malformed))
+        self.assertEqual(parsed, [(1, 10.0, "USD", "EUR"), (8, 2.5, "GBP", "USD")])
+        self.assertEqual(malformed, [4, 5, 6, 7])
+        self.assertIn("ERROR line 4:", stderr.getvalue())
+
+
+class TestRunBatch(unittest.TestCase):
+
+    def setUp(self):
+        currency_utils.set_rate_provider(StaticRateProvider("USD", {"EUR": 0.5, "GBP": 0.8}))
+        self.addCleanup(currency_utils.set_rate_provider, None)
+
+    def run_batch(self, text):
+        output = io.StringIO()
+        with redirect_stderr(io.StringIO()) as stderr:
+            code = run_batch(io.StringIO(text), output, workers=4, max_retries=0)
+        return code, sorted(output.getvalue().splitlines()), stderr.getvalue()
+
+    def test_results_carry_their_input_line(self):
+        code, lines, _ = self.run_batch("10 USD EUR\n# skip\n5 USD GBP\n4 EUR USD\n")
+        self.assertEqual(code, 0)
+        self.assertEqual(lines, ["1: 10.00 USD = 5.00 EUR", "3: 5.00 USD = 4.00 GBP",
+                                 "4: 4.00 EUR = 8.00 USD"])
+
+    def test_malformed_lines_fail_the_batch(self):
+        code, lines, stderr = self.run_batch("10 USD EUR\nnan USD EUR\n")
+        self.assertEqual(code, 1)
+        self.assertEqual(lines, ["1: 10.00 USD = 5.00 EUR"])
+        self.assertIn("ERROR line 2:", stderr)
+
+    def test_failed_conversions_report_their_line(self):
+        code, lines, stderr = self.run_batch("10 USD EUR\n3 USD XYZ\n")
+        self.assertEqual(code, 1)
+        self.assertIn("ERROR line 2: 3.0 USD XYZ", stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
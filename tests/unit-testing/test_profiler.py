@@ -0,0 +1,122 @@
+"""Unit tests for the on-demand sampling profiler."""
+
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import profiler
+
+
+def _busy_until(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class TestCollapseStack(unittest.TestCase):
+
+    def test_outermost_frame_first_with_thread_root(self):
+        def inner():
+            return profiler.collapse_stack(sys._getframe(), "main;thread")
+
+        stack = inner()
+        frames = stack.split(";")
+        self.assertEqual(frames[0], "main:thread")
+        self.assertTrue(frames[-1].startswith(
+            "TestCollapseStack.test_outermost_frame_first_with_thread_root.<locals>.inner "
+            "(test_profiler.py:"))
+        self.assertIn("test_outermost_frame_first_with_thread_root", frames[-2])
+
+
+class TestSamplingProfiler(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+
+    def test_run_writes_collapsed_stacks(self):
+        stop = threading.Event()
+        worker = threading.Thread(target=_busy_until, args=(stop,), name="busy-worker")
+        worker.start()
+        self.addCleanup(worker.join)
+        self.addCleanup(stop.set)
+
+        run = profiler.SamplingProfiler(duration=0.3, interval=0.005, output_dir=self.dir)
+        self.assertTrue(run.start())
+        self.assertFalse(run.start())  # already running
+        run._thread.join(timeout=5)
+
+        self.assertGreater(run.samples, 10)
+        self.assertEqual(run.output_path.parent, self.dir)
+        self.assertRegex(run.output_path.name,
+                         rf"^profile_\d{{8}}_\d{{6}}_{os.getpid()}\.collapsed$")
+        lines = run.output_path.read_text(encoding="utf-8").splitlines()
+        busy = [line for line in lines if line.startswith("busy-worker;")]
+        self.assertTrue(busy)
+        self.assertTrue(any("_busy_until (test_profiler.py:" in line for line in busy))
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            self.assertGreater(int(count), 0)
+        # The profiler never samples itself.
+        self.assertFalse(any(line.startswith("sampling-profiler;") for line in lines))
+
+    def test_stop_ends_a_run_early_and_still_writes(self):
+        run = profiler.SamplingProfiler(duration=60, interval=0.01, output_dir=self.dir)
+        run.start()
+        time.sleep(0.05)
+        started = time.monotonic()
+        run.stop()
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertTrue(run.output_path.exists())
+
+
+@unittest.skipUnless(hasattr(signal, "SIGUSR1"), "needs SIGUSR1")
+class TestProfilerHook(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.settings = SimpleNamespace(profile_on_signal=True, profile_at_start=False,
+                                        profile_seconds=0.1, profile_interval_ms=5.0,
+                                        log_dir=Path(tmp.name))
+        patcher = patch("config.get_settings", return_value=self.settings)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(signal.signal, signal.SIGUSR1, signal.getsignal(signal.SIGUSR1))
+        self.addCleanup(setattr, profiler, "_profiler", None)
+        profiler._profiler = None
+
+    def test_idle_until_signalled(self):
+        self.assertTrue(profiler.install_profiler_hook())
+        self.assertIsNone(profiler._profiler)  # nothing created, nothing sampled
+
+        os.kill(os.getpid(), signal.SIGUSR1)
+        run = profiler.get_profiler()
+        run._thread.join(timeout=5)
+        self.assertTrue(run.output_path.exists())
+        self.assertEqual(run.output_path.parent, self.settings.log_dir)
+
+    def test_not_armed_unless_configured(self):
+        self.settings.profile_on_signal = False
+        before = signal.getsignal(signal.SIGUSR1)
+        self.assertFalse(profiler.install_profiler_hook())
+        self.assertIs(signal.getsignal(signal.SIGUSR1), before)
+
+    def test_profile_at_start(self):
+        self.settings.profile_on_signal = False
+        self.settings.profile_at_start = True
+        profiler.install_profiler_hook()
+        run = profiler.get_profiler()
+        run._thread.join(timeout=5)
+        self.assertTrue(run.output_path.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
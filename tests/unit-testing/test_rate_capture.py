@@ -0,0 +1,149 @@
+"""Unit tests for recording and replaying upstream rate traffic."""
+
+import dataclasses
+import gzip
+import json
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+
+import requests
+
+import config
+import currency_utils
+from rate_capture import (
+    CaptureWriter, RecordedExchange, RecordingAdapter, ReplayAdapter, load_capture
+)
+
+KEY = "secret-key"
+
+
+class _PairHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        body = json.dumps({"result": "success", "conversion_rate": 0.5}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _pair(rate: float, latency_ms: float = 0.0) -> RecordedExchange:
+    return RecordedExchange("GET", "/{api_key}/pair/USD/EUR", 200,
+                            {"Content-Type": "application/json"},
+                            json.dumps({"result": "success", "conversion_rate": rate}),
+                            latency_ms)
+
+
+class TestRecording(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "capture.jsonl.gz"
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _PairHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def test_exchanges_and_failures_are_recorded_without_the_key(self):
+        writer = CaptureWriter(self.path)
+        session = requests.Session()
+        session.mount("http://", RecordingAdapter(writer, secrets=[KEY]))
+        self.assertEqual(session.get(f"{self.base_url}/{KEY}/pair/USD/EUR",
+                                     timeout=5).json()["conversion_rate"], 0.5)
+        unused = ThreadingHTTPServer(("127.0.0.1", 0), _PairHandler)
+        closed_port = unused.server_address[1]
+        unused.server_close()
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            session.get(f"http://127.0.0.1:{closed_port}/{KEY}/pair/USD/JPY", timeout=5)
+        writer.close()
+
+        self.assertNotIn(KEY, gzip.decompress(self.path.read_bytes()).decode())
+        ok, failed = load_capture(self.path)
+        self.assertEqual((ok.method, ok.path, ok.status), ("GET", "/{api_key}/pair/USD/EUR", 200))
+        self.assertEqual(json.loads(ok.body)["conversion_rate"], 0.5)
+        self.assertGreater(ok.latency_ms, 0)
+        self.assertEqual((failed.path, failed.status, failed.error),
+                         ("/{api_key}/pair/USD/JPY", None, "ConnectionError"))
+
+    def test_truncated_capture_replays_up_to_the_cut(self):
+        writer = CaptureWriter(self.path)
+        writer.write(_pair(0.5))
+        writer.close()
+        with gzip.open(self.path, "at", encoding="utf-8") as f:
+            f.write('{"method": "GET", "pa')
+        with self.assertLogs("rate_capture", "WARNING"):
+            self.assertEqual(len(load_capture(self.path)), 1)
+
+
+class TestReplay(unittest.TestCase):
+
+    def session(self, exchanges, **options):
+        self.adapter = ReplayAdapter(exchanges, secrets=["other-key"], **options)
+        session = requests.Session()
+        session.mount("https://", self.adapter)
+        return session
+
+    def test_responses_in_recorded_order_then_looped(self):
+        session = self.session([_pair(0.5), _pair(0.6)], latency_scale=0)
+        url = "https://any.host/other-key/pair/USD/EUR"
+        rates = [session.get(url).json()["conversion_rate"] for _ in range(3)]
+        self.assertEqual(rates, [0.5, 0.6, 0.5])
+        self.assertEqual(self.adapter.replayed, 3)
+
+    def test_unrecorded_requests_fail_like_the_network(self):
+        session = self.session([_pair(0.5)], loop=False)
+        session.get("https://h/other-key/pair/USD/EUR")
+        for url in ("https://h/other-key/pair/USD/EUR", "https://h/other-key/pair/USD/GBP"):
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                session.get(url)
+        self.assertEqual(self.adapter.missing, 2)
+
+    def test_latency_is_scaled(self):
+        session = self.session([_pair(0.5, latency_ms=200)], latency_scale=0.25)
+        started = time.perf_counter()
+        session.get("https://h/other-key/pair/USD/EUR")
+        self.assertGreaterEqual(time.perf_counter() - started, 0.05)
+        session = self.session([_pair(0.5, latency_ms=200)], latency_scale=1)
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            session.get("https://h/other-key/pair/USD/EUR", timeout=(1, 0.01))
+
+    def test_recorded_errors_are_raised_again(self):
+        failed = RecordedExchange("GET", "/{api_key}/pair/USD/EUR", error="ConnectTimeout")
+        session = self.session([failed])
+        with self.assertRaises(requests.exceptions.ConnectTimeout):
+            session.get("https://h/other-key/pair/USD/EUR")
+
+
+class TestReplayThroughCurrencyUtils(unittest.TestCase):
+
+    def test_conversion_runs_offline_from_a_capture(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "capture.jsonl.gz"
+            writer = CaptureWriter(path)
+            writer.write(_pair(0.8, latency_ms=50))
+            writer.close()
+            settings = dataclasses.replace(
+                config.get_settings(), api_key="offline", rate_source="pair",
+                exchange_rate_base_url="https://offline.invalid", rate_replay_file=str(path),
+                rate_replay_latency_scale=0, rate_secondary_base_url="", rate_static_file="",
+                rate_daemon_address="", rate_shm_name="", traffic_profile_file="")
+            with patch("currency_utils.get_settings", return_value=settings), \
+                    patch.object(currency_utils, "_session", None), \
+                    patch.object(currency_utils, "_provider", None):
+                self.assertEqual(currency_utils.convert_currency(10, "USD", "EUR"), 8.0)
+                self.assertIsNone(currency_utils.convert_currency(10, "USD", "GBP"))
+
+
+if __name__ == "__main__":
+    unittest.main()
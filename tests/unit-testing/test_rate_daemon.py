@@ -0,0 +1,95 @@
+"""Unit tests for the rate-cache daemon and its client, on localhost only."""
+
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+from rate_daemon import DaemonRateProvider, RateDaemon, create_server
+from rate_providers import FallbackRateProvider, StaticRateProvider
+from rate_table import RateTable
+
+
+class _FakeTables:
+
+    """Stands in for RateTableProvider; counts upstream fetches."""
+
+    min_poll_interval = 60
+
+    def __init__(self, rates):
+        self._table = RateTable("USD", dict(rates), version=1, next_poll_unix=float("inf"))
+        self.fetches = 0
+
+    def get_table(self, base):
+        self.fetches += 1
+        return self._table, None
+
+    def table(self, base):
+        return self._table
+
+
+class TestRateDaemon(unittest.TestCase):
+
+    def _serve(self, address):
+        self.tables = _FakeTables({"USD": 1.0, "EUR": 0.5, "JPY": 100.0})
+        server = create_server(RateDaemon(self.tables), address)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def test_tcp_cross_rates(self):
+        server = self._serve("127.0.0.1:0")
+        host, port = server.server_address
+        client = DaemonRateProvider(f"{host}:{port}")
+
+        quote = client.get_quote("EUR", "JPY")
+        self.assertEqual(quote.provider, "rate-daemon")
+        self.assertAlmostEqual(quote.rate, 200.0)
+        self.assertEqual(client.get_quote("USD", "ZZZ").error, "unsupported-code")
+        stats = client.request({"op": "stats"})
+        self.assertEqual(stats["stats"]["requests"], 2)
+        self.assertEqual(client.request({"op": "nope"})["error"], "unknown-op")
+
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix sockets only")
+    def test_unix_socket(self):
+        tmp = tempfile.mkdtemp()
+        path = os.path.join(tmp, "rates.sock")
+        self._serve(f"unix:{path}")
+        client = DaemonRateProvider(f"unix:{path}")
+        self.assertAlmostEqual(client.get_rate("JPY", "EUR"), 0.005)
+
+    def test_many_threads_share_one_table(self):
+        server = self._serve("127.0.0.1:0")
+        client = DaemonRateProvider("%s:%d" % server.server_address)
+        results = []
+
+        def worker():
+            for _ in range(20):
+                results.append(client.get_rate("USD", "EUR"))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [0.5] * 160)
+
+    def test_falls_back_to_direct_when_daemon_is_down(self):
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]  # nothing listens here afterwards
+        daemon = DaemonRateProvider(f"127.0.0.1:{port}", retry_after=60)
+        direct = StaticRateProvider("USD", {"EUR": 0.5})
+        provider = FallbackRateProvider(daemon, direct)
+
+        quote = provider.get_quote("USD", "EUR")
+        self.assertEqual((quote.rate, quote.provider), (0.5, "static"))
+        # Not retried until retry_after has passed.
+        self.assertEqual(daemon.get_quote("USD", "EUR").latency_ms, 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
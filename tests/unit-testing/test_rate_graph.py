@@ -0,0 +1,71 @@
+"""Unit tests for best-path conversion and arbitrage detection."""
+
+import unittest
+
+from rate_graph import GraphRateProvider, RateGraph
+
+
+class TestRateGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = RateGraph(["USD", "EUR", "GBP", "JPY", "CHF"])
+
+    def test_direct_and_implied_inverse(self):
+        self.graph.add_quote("USD", "EUR", 0.5)
+        self.assertAlmostEqual(self.graph.best_rate("USD", "EUR"), 0.5)
+        self.assertAlmostEqual(self.graph.best_rate("EUR", "USD"), 2.0)
+        self.assertEqual(self.graph.find_arbitrage(), [])
+
+    def test_multi_hop_across_tables_with_different_bases(self):
+        self.graph.add_table("USD", {"EUR": 0.5})
+        self.graph.add_table("EUR", {"JPY": 160.0})
+        self.assertAlmostEqual(self.graph.best_rate("USD", "JPY"), 80.0)
+        self.assertEqual(self.graph.best_path("USD", "JPY"), ["USD", "EUR", "JPY"])
+        self.assertAlmostEqual(self.graph.best_rate("JPY", "USD"), 1 / 80.0)
+
+    def test_best_path_beats_direct_quote(self):
+        self.graph.add_quote("USD", "GBP", 0.70)
+        self.graph.add_quote("USD", "EUR", 0.90)
+        self.graph.add_quote("EUR", "GBP", 0.80)  # USD -> EUR -> GBP = 0.72
+        self.graph.add_quote("GBP", "USD", 1 / 0.72)  # keep it consistent
+        self.graph.add_quote("GBP", "EUR", 1 / 0.80)
+        self.graph.add_quote("EUR", "USD", 1 / 0.90)
+        self.assertAlmostEqual(self.graph.best_rate("USD", "GBP"), 0.72)
+        self.assertEqual(self.graph.best_path("USD", "GBP"), ["USD", "EUR", "GBP"])
+
+    def test_no_path(self):
+        self.graph.add_quote("USD", "EUR", 0.5)
+        self.assertIsNone(self.graph.best_rate("USD", "CHF"))
+        self.assertIsNone(self.graph.best_path("USD", "CHF"))
+        self.assertIsNone(self.graph.best_rate("USD", "XYZ"))
+
+    def test_detects_arbitrage_and_withholds_tainted_pairs(self):
+        self.graph.add_table("USD", {"EUR": 0.5, "GBP": 0.25, "CHF": 1.0})
+        self.graph.add_quote("EUR", "GBP", 0.55)  # consistent would be 0.5
+        cycles = self.graph.find_arbitrage()
+        self.assertEqual(len(cycles), 1)
+        codes, gain = cycles[0]
+        self.assertEqual(set(codes), {"USD", "EUR", "GBP"})
+        self.assertEqual(codes[0], codes[-1])
+        self.assertAlmostEqual(gain, 1.1)
+        self.assertIsNone(self.graph.best_rate("USD", "CHF"))
+
+    def test_recomputes_after_table_change(self):
+        class _Table:
+            base = "USD"
+        self.graph.on_table_change(_Table, {"EUR": 0.5})
+        self.assertAlmostEqual(self.graph.best_rate("EUR", "USD"), 2.0)
+        version = self.graph.version
+        self.graph.on_table_change(_Table, {"EUR": 0.25})
+        self.assertAlmostEqual(self.graph.best_rate("EUR", "USD"), 4.0)
+        self.assertEqual(self.graph.version, version + 1)
+
+    def test_provider(self):
+        self.graph.add_table("USD", {"EUR": 0.5, "JPY": 100.0})
+        provider = GraphRateProvider(self.graph)
+        self.assertAlmostEqual(provider.get_rate("EUR", "JPY"), 200.0)
+        self.assertEqual(provider.get_quote("EUR", "CHF").error, "no-path")
+
+
+if __name__ == "__main__":
+    unittest.main()
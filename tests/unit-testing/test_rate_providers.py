@@ -0,0 +1,112 @@
+"""Unit tests for the pluggable rate providers and request hedging."""
+
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from rate_providers import (
+    HedgedRateProvider, RateProvider, RateQuote, StaticRateProvider
+)
+
+
+class _FakeProvider(RateProvider):
+
+    """Answers with a fixed rate (or failure) after a fixed delay."""
+
+    def __init__(self, name, rate, delay=0.0):
+        self.name = name
+        self.rate = rate
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get_quote(self, from_currency, to_currency):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.rate is None:
+            return RateQuote(None, self.name, self.delay * 1000, "ConnectionError")
+        return RateQuote(self.rate, self.name, self.delay * 1000)
+
+
+class TestHedgedRateProvider(unittest.TestCase):
+
+    def test_fast_primary_is_not_hedged(self):
+        primary = _FakeProvider("primary", 1.5)
+        secondary = _FakeProvider("secondary", 9.9)
+        hedged = HedgedRateProvider(primary, secondary, hedge_after=0.5)
+
+        quote = hedged.get_quote("USD", "EUR")
+        self.assertEqual((quote.rate, quote.provider), (1.5, "primary"))
+        self.assertEqual(secondary.calls, 0)
+        self.assertEqual(hedged.wins["primary"], 1)
+
+    def test_slow_primary_is_hedged_to_secondary(self):
+        primary = _FakeProvider("primary", 1.5, delay=1.0)
+        secondary = _FakeProvider("secondary", 1.4, delay=0.01)
+        hedged = HedgedRateProvider(primary, secondary, hedge_after=0.05)
+
+        started = time.perf_counter()
+        quote = hedged.get_quote("USD", "EUR")
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(quote.provider, "secondary")
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(hedged.wins["secondary"], 1)
+
+    def test_failed_primary_falls_over_without_waiting(self):
+        primary = _FakeProvider("primary", None)
+        secondary = _FakeProvider("secondary", 1.4)
+        hedged = HedgedRateProvider(primary, secondary, hedge_after=5.0)
+
+        started = time.perf_counter()
+        quote = hedged.get_quote("USD", "EUR")
+        self.assertEqual(quote.provider, "secondary")
+        self.assertLess(time.perf_counter() - started, 1.0)
+
+    def test_slow_primary_still_wins_if_secondary_fails(self):
+        primary = _FakeProvider("primary", 1.5, delay=0.1)
+        secondary = _FakeProvider("secondary", None)
+        hedged = HedgedRateProvider(primary, secondary, hedge_after=0.01)
+
+        quote = hedged.get_quote("USD", "EUR")
+        self.assertEqual((quote.rate, quote.provider), (1.5, "primary"))
+
+    def test_both_failing_returns_failure(self):
+        hedged = HedgedRateProvider(_FakeProvider("primary", None),
+                                    _FakeProvider("secondary", None),
+                                    hedge_after=0.01)
+        quote = hedged.get_quote("USD", "EUR")
+        self.assertFalse(quote.ok)
+        self.assertEqual(quote.error, "ConnectionError")
+        self.assertEqual(sum(hedged.wins.values()), 0)
+
+
+class TestStaticRateProvider(unittest.TestCase):
+
+    def test_cross_rate_through_base(self):
+        provider = StaticRateProvider("USD", {"EUR": 0.5, "GBP": 0.25})
+        self.assertAlmostEqual(provider.get_rate("USD", "EUR"), 0.5)
+        self.assertAlmostEqual(provider.get_rate("EUR", "GBP"), 0.5)
+        self.assertAlmostEqual(provider.get_rate("GBP", "USD"), 4.0)
+
+    def test_unknown_code(self):
+        quote = StaticRateProvider("USD", {"EUR": 0.5}).get_quote("USD", "XXX")
+        self.assertFalse(quote.ok)
+        self.assertEqual(quote.error, "unsupported-code")
+
+    def test_from_latest_response_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "latest.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"result": "success", "base_code": "EUR",
+                           "conversion_rates": {"EUR": 1, "USD": 2.0}}, f)
+            provider = StaticRateProvider.from_file(path)
+        self.assertAlmostEqual(provider.get_rate("USD", "EUR"), 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
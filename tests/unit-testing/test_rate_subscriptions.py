@@ -0,0 +1,142 @@
+"""Unit tests for the push-based rate subscription hub."""
+
+import asyncio
+import threading
+import unittest
+
+from rate_subscriptions import RateSubscriptionHub, parse_targets
+from rate_table import RateTable
+
+
+class _FakeTables:
+
+    """Stands in for RateTableProvider; tests push table changes by hand."""
+
+    min_poll_interval = 60
+
+    def __init__(self):
+        self._table = None
+        self.listeners = []
+        self.fetches = 0
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def table(self, base):
+        return self._table
+
+    def get_table(self, base):
+        self.fetches += 1
+        return self._table, None
+
+    def update(self, rates):
+        if self._table is None:
+            self._table = RateTable("USD", next_poll_unix=float("inf"))
+        changed = self._table.apply(rates)
+        for listener in self.listeners:
+            listener(self._table, changed)
+
+
+class TestParseTargets(unittest.TestCase):
+
+    def test_pairs_and_bases(self):
+        pairs, bases = parse_targets(["eur/usd", ("GBP", "JPY"), "chf"])
+        self.assertEqual(pairs, {("EUR", "USD"), ("GBP", "JPY")})
+        self.assertEqual(bases, {"CHF"})
+        self.assertEqual(parse_targets("EUR/JPY"), ({("EUR", "JPY")}, set()))
+
+
+class TestCallbackSubscriptions(unittest.TestCase):
+
+    def setUp(self):
+        self.tables = _FakeTables()
+        self.hub = RateSubscriptionHub(self.tables, threshold=0.01)
+        self.addCleanup(self.hub.close)
+
+    def test_only_changes_above_threshold_are_pushed(self):
+        updates = []
+        self.hub.subscribe_callback("EUR/JPY", updates.append)
+        self.tables.update({"USD": 1, "EUR": 0.5, "JPY": 100.0})
+        self.assertEqual([(u.pair, u.rate, u.previous) for u in updates],
+                         [(("EUR", "JPY"), 200.0, None)])
+
+        self.tables.update({"JPY": 100.5})  # +0.5%: below threshold
+        self.assertEqual(len(updates), 1)
+        self.tables.update({"JPY": 101.5})  # +1.5% from what was sent
+        self.assertEqual(len(updates), 2)
+        self.assertAlmostEqual(updates[-1].rate, 203.0)
+        self.assertEqual(updates[-1].previous, 200.0)
+
+    def test_base_subscription_and_initial_snapshot(self):
+        self.tables.update({"USD": 1, "EUR": 0.5, "JPY": 100.0})
+        updates = []
+        self.hub.subscribe_callback(["EUR"], updates.append)
+        self.assertEqual({u.pair for u in updates}, {("EUR", "USD"), ("EUR", "JPY")})
+
+    def test_fan_out_without_extra_upstream_traffic(self):
+        received = [[] for _ in range(50)]
+        subscriptions = [self.hub.subscribe_callback("GBP/EUR", r.append, threshold=0)
+                         for r in received]
+        fetches = self.tables.fetches
+        self.tables.update({"USD": 1, "EUR": 0.5, "GBP": 0.25})
+        self.assertTrue(all(len(r) == 1 for r in received))
+        self.assertLessEqual(self.tables.fetches - fetches, 1)
+
+        subscriptions[0].close()
+        self.tables.update({"EUR": 0.6})
+        self.assertEqual(len(received[0]), 1)
+        self.assertEqual(len(received[1]), 2)
+        self.assertEqual(self.hub.subscriber_count, 49)
+
+    def test_failing_callback_does_not_stop_others(self):
+        received = []
+
+        def broken(update):
+            raise RuntimeError("boom")
+        self.hub.subscribe_callback("EUR/USD", broken)
+        self.hub.subscribe_callback("EUR/USD", received.append)
+        self.tables.update({"USD": 1, "EUR": 0.5})
+        self.assertEqual(len(received), 1)
+
+
+class TestAsyncSubscriptions(unittest.TestCase):
+
+    def test_async_iterator_conflates_pending_updates(self):
+        tables = _FakeTables()
+        hub = RateSubscriptionHub(tables, threshold=0)
+        self.addCleanup(hub.close)
+
+        async def consume():
+            async with hub.subscribe(["EUR/USD"]) as updates:
+                def publish():
+                    for rate in (0.5, 0.4, 0.25):  # three before we read
+                        tables.update({"USD": 1, "EUR": rate})
+                thread = threading.Thread(target=publish)
+                thread.start()
+                thread.join()
+                self.assertEqual(updates.pending(), 1)
+                first = await asyncio.wait_for(updates.__anext__(), 5)
+
+                threading.Thread(target=tables.update, args=({"EUR": 0.2},)).start()
+                second = await asyncio.wait_for(updates.__anext__(), 5)
+            return first, second
+
+        first, second = asyncio.run(consume())
+        self.assertEqual((first.rate, first.previous), (4.0, None))
+        self.assertEqual((second.rate, second.previous), (5.0, 4.0))
+        self.assertEqual(hub.subscriber_count, 0)
+
+    def test_close_ends_iteration(self):
+        hub = RateSubscriptionHub(_FakeTables())
+        self.addCleanup(hub.close)
+
+        async def consume():
+            subscription = hub.subscribe("EUR")
+            asyncio.get_running_loop().call_later(0.01, subscription.close)
+            return [update async for update in subscription]
+
+        self.assertEqual(asyncio.run(consume()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
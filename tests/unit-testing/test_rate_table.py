@@ -0,0 +1,122 @@
+"""Unit tests for conditional, delta-applying /latest rate table refreshes."""
+
+import unittest
+from unittest.mock import MagicMock
+
+from rate_table import RateTableProvider
+
+
+def _response(status=200, rates=None, last_update=1000, next_update=2000,
+              etag='"v1"'):
+    response = MagicMock()
+    response.status_code = status
+    response.headers = {"ETag": etag} if etag else {}
+    response.json.return_value = {
+        "result": "success", "base_code": "USD",
+        "time_last_update_unix": last_update,
+        "time_next_update_unix": next_update,
+        "conversion_rates": rates or {},
+    }
+    return response
+
+
+class TestRateTableProvider(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1500.0
+        self.session = MagicMock()
+        self.provider = RateTableProvider("https://api.example/v6", "key",
+                                          session_factory=lambda: self.session,
+                                          min_poll_interval=60,
+                                          clock=lambda: self.now)
+        self.changes = []
+        self.provider.add_listener(lambda table, changed: self.changes.append(changed))
+        self.session.get.return_value = _response(
+            rates={"USD": 1, "EUR": 0.9, "GBP": 0.8})
+
+    def test_no_request_until_next_update(self):
+        self.assertEqual(self.provider.get_rate("USD", "EUR"), 0.9)
+        self.assertEqual(self.provider.get_rate("usd", "GBP"), 0.8)
+        self.now = 1999
+        self.provider.get_rate("USD", "EUR")
+        self.assertEqual(self.session.get.call_count, 1)
+        url = self.session.get.call_args.args[0]
+        self.assertEqual(url, "https://api.example/v6/key/latest/USD")
+
+    def test_conditional_get_and_not_modified(self):
+        self.provider.get_rate("USD", "EUR")
+        self.now = 2000
+        self.session.get.return_value = _response(status=304)
+        self.assertEqual(self.provider.get_rate("USD", "EUR"), 0.9)
+
+        headers = self.session.get.call_args.kwargs["headers"]
+        self.assertEqual(headers["If-None-Match"], '"v1"')
+        table = self.provider.table("USD")
+        self.assertEqual(table.version, 1)
+        # Polled again only after the minimum interval.
+        self.now = 2059
+        self.provider.get_rate("USD", "EUR")
+        self.assertEqual(self.session.get.call_count, 2)
+
+    def test_update_applies_only_changed_entries(self):
+        self.provider.get_rate("USD", "EUR")
+        self.now = 2000
+        self.session.get.return_value = _response(
+            rates={"USD": 1, "EUR": 0.95, "GBP": 0.8, "JPY": 150},
+            last_update=2000, next_update=3000, etag='"v2"')
+
+        self.assertEqual(self.provider.get_rate("USD", "EUR"), 0.95)
+        table = self.provider.table("USD")
+        self.assertEqual(table.version, 2)
+        self.assertEqual(table.etag, '"v2"')
+        self.assertEqual(self.changes[-1], {"EUR": 0.95, "JPY": 150.0})
+
+    def test_same_upstream_timestamp_is_not_reapplied(self):
+        self.provider.get_rate("USD", "EUR")
+        self.now = 2000
+        self.session.get.return_value = _response(
+            rates={"USD": 1, "EUR": 0.5}, etag=None)
+        self.assertEqual(self.provider.get_rate("USD", "EUR"), 0.9)
+        self.assertEqual(self.provider.table("USD").version, 1)
+        self.assertEqual(len(self.changes), 1)
+
+    def test_failed_refresh_keeps_serving_old_table(self):
+        from requests.exceptions import ConnectionError
+        self.provider.get_rate("USD", "EUR")
+        self.now = 2000
+        self.session.get.side_effect = ConnectionError("down")
+        quote = self.provider.get_quote("USD", "EUR")
+        self.assertEqual(quote.rate, 0.9)
+
+    def test_api_error_result_is_not_repolled_on_every_lookup(self):
+        error = MagicMock(status_code=200, headers={})
+        error.json.return_value = {"result": "error", "error-type": "quota-reached"}
+        self.session.get.return_value = error
+        for _ in range(3):
+            self.assertEqual(self.provider.get_quote("USD", "EUR").error, "quota-reached")
+        self.assertEqual(self.session.get.call_count, 1)
+
+        self.now += 60
+        self.session.get.return_value = _response(rates={"USD": 1, "EUR": 0.9})
+        self.assertEqual(self.provider.get_rate("USD", "EUR"), 0.9)
+
+        # With a table held, an error result keeps it and waits as well.
+        self.now = 2000
+        self.session.get.return_value = error
+        for _ in range(3):
+            self.assertEqual(self.provider.get_rate("USD", "EUR"), 0.9)
+        self.assertEqual(self.session.get.call_count, 3)
+
+    def test_cache_hits_log_at_debug(self):
+        self.provider.get_rate("USD", "EUR")
+        with self.assertLogs("rate_table", "DEBUG") as logs:
+            self.provider.get_rate("USD", "EUR")
+        self.assertTrue(all(line.startswith("DEBUG:") for line in logs.output))
+
+    def test_unknown_code(self):
+        quote = self.provider.get_quote("USD", "ZZZ")
+        self.assertEqual(quote.error, "unsupported-code")
+
+
+if __name__ == "__main__":
+    unittest.main()
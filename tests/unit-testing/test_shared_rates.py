@@ -0,0 +1,126 @@
+"""Unit tests for the shared-memory rate table."""
+
+import multiprocessing
+import os
+import time
+import unittest
+
+from rate_providers import FallbackRateProvider, StaticRateProvider
+from shared_rates import (
+    SharedMemoryRateProvider, SharedRatePublisher, SharedRateReader
+)
+
+CODES = ("USD", "EUR", "GBP", "JPY")
+
+
+def _read_in_child(name, queue):
+    reader = SharedRateReader(name, codes=CODES)
+    queue.put((reader.version, reader.get_rate("EUR", "JPY")))
+    reader.close()
+
+
+class TestSharedRates(unittest.TestCase):
+
+    def setUp(self):
+        self.name = f"test_rates_{os.getpid()}_{id(self)}"
+        self.publisher = SharedRatePublisher(self.name, codes=CODES)
+        self.addCleanup(self.publisher.close)
+        self.reader = SharedRateReader(self.name, codes=CODES)
+        self.addCleanup(self.reader.close)
+
+    def test_nothing_published_yet(self):
+        self.assertEqual(self.reader.version, 0)
+        self.assertIsNone(self.reader.get_rate("USD", "EUR"))
+        quote = SharedMemoryRateProvider(self.reader).get_quote("USD", "EUR")
+        self.assertEqual(quote.error, "not-published")
+
+    def test_cross_rates_and_refresh(self):
+        self.publisher.publish("USD", {"EUR": 0.5, "JPY": 100.0, "XXX": 3.0})
+        self.assertEqual(self.reader.version, 1)
+        self.assertAlmostEqual(self.reader.get_rate("EUR", "JPY"), 200.0)
+        self.assertIsNone(self.reader.get_rate("USD", "GBP"))  # never quoted
+
+        self.publisher.publish("EUR", {"USD": 4.0, "GBP": 1.0}, 1234)
+        version, base, rates, last_update = self.reader.snapshot()
+        self.assertEqual((version, base, last_update), (2, "EUR", 1234))
+        self.assertAlmostEqual(self.reader.get_rate("USD", "GBP"), 0.25)
+        self.assertEqual(len(rates), len(CODES))
+
+    def test_rates_view_is_zero_copy_and_read_only(self):
+        view = self.reader.rates
+        self.publisher.publish("USD", {"EUR": 0.5})
+        self.assertEqual(view[1], 0.5)
+        with self.assertRaises(ValueError):
+            view[1] = 1.0
+        del view
+
+    def test_registry_mismatch_is_rejected(self):
+        with self.assertRaises(ValueError):
+            SharedRateReader(self.name, codes=("USD", "EUR"))
+
+    def test_visible_from_another_process(self):
+        self.publisher.publish("USD", {"EUR": 0.5, "JPY": 100.0})
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        child = context.Process(target=_read_in_child, args=(self.name, queue))
+        child.start()
+        version, rate = queue.get(timeout=30)
+        child.join(timeout=30)
+        self.assertEqual(version, 1)
+        self.assertAlmostEqual(rate, 200.0)
+
+
+class TestPublisherLiveness(unittest.TestCase):
+
+    def setUp(self):
+        self.name = f"test_live_{os.getpid()}_{id(self)}"
+        self.publisher = self.publish({"EUR": 0.5})
+
+    def publish(self, rates, **options):
+        publisher = SharedRatePublisher(self.name, codes=CODES, **options)
+        self.addCleanup(publisher.close)
+        publisher.publish("USD", rates)
+        return publisher
+
+    def reader(self, max_age):
+        reader = SharedRateReader(self.name, codes=CODES, max_age=max_age)
+        self.addCleanup(reader.close)
+        return reader
+
+    def test_old_table_falls_through_to_the_next_provider(self):
+        reader = self.reader(max_age=0.05)
+        self.assertTrue(reader.fresh())
+        time.sleep(0.1)
+        self.assertFalse(reader.fresh())
+        shared = SharedMemoryRateProvider(reader)
+        self.assertEqual(shared.get_quote("USD", "EUR").error, "stale")
+        chain = FallbackRateProvider(shared, StaticRateProvider("USD", {"EUR": 0.9}))
+        self.assertEqual(chain.get_quote("USD", "EUR").rate, 0.9)
+
+    def test_heartbeat_keeps_an_unchanged_table_fresh(self):
+        self.publisher.close()
+        self.publisher = self.publish({"EUR": 0.5}, heartbeat_interval=0.02)
+        reader = self.reader(max_age=0.1)
+        time.sleep(0.3)
+        self.assertTrue(reader.fresh())
+
+    def test_restarted_publisher_is_picked_up(self):
+        reader = self.reader(max_age=60)
+        self.publisher.close()
+        self.assertFalse(reader.fresh())  # retired, nothing to attach to yet
+        self.publish({"EUR": 0.25})
+        reader._next_reattach = 0.0
+        self.assertTrue(reader.fresh())
+        self.assertEqual(reader.get_rate("USD", "EUR"), 0.25)
+
+    def test_publisher_taking_over_a_crashed_segment(self):
+        reader = self.reader(max_age=60)
+        self.publisher.close(unlink=False)  # died without cleaning up
+        self.assertTrue(reader.fresh())
+        self.publish({"EUR": 0.25})
+        self.assertTrue(reader.fresh())
+        self.assertEqual(reader.get_rate("USD", "EUR"), 0.25)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,212 @@
+"""Unit tests for span tracing, sampling, propagation and Chrome export."""
+
+import asyncio
+import json
+import logging
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import config
+import currency_utils
+import tracing
+from rate_providers import ExchangeRateApiProvider, HedgedRateProvider, StaticRateProvider
+
+
+def _spans(tracer):
+    """name -> (trace_id, lane, start, duration) for every recorded span."""
+    return {event[0]: (event[5], event[4], event[2], event[3]) for event in tracer.events}
+
+
+class _SpanProvider(StaticRateProvider):
+
+    def get_quote(self, from_currency, to_currency):
+        with tracing.span(self.name):
+            return super().get_quote(from_currency, to_currency)
+
+
+class TestSpans(unittest.TestCase):
+
+    def setUp(self):
+        self.addCleanup(tracing.configure)  # back to disabled
+        self.tracer = tracing.configure(sample_rate=1.0)
+
+    def test_disabled_tracing_records_nothing(self):
+        tracer = tracing.configure(sample_rate=0.0)
+        self.assertIs(tracing.span("x"), tracing.NOOP_SPAN)
+        with tracing.span("x") as current:
+            current.set(ignored=True)
+        self.assertEqual(len(tracer.events), 0)
+
+    def test_nested_spans_share_a_trace(self):
+        with tracing.span("outer", "test", size=1):
+            with tracing.span("inner", "test"):
+                pass
+        with tracing.span("second"):
+            pass
+        spans = _spans(self.tracer)
+        self.assertEqual(spans["outer"][0], spans["inner"][0])
+        self.assertNotEqual(spans["outer"][0], spans["second"][0])
+        self.assertGreaterEqual(spans["inner"][2], spans["outer"][2])
+        self.assertLessEqual(spans["inner"][3], spans["outer"][3])
+
+    def test_sampling_is_decided_once_per_trace(self):
+        tracer = tracing.configure(sample_rate=0.5)
+        with patch("tracing.random.random", return_value=0.9):
+            with tracing.span("dropped"):
+                with tracing.span("dropped.child"):
+                    pass
+        with patch("tracing.random.random", return_value=0.1):
+            with tracing.span("kept"):
+                with tracing.span("kept.child"):
+                    pass
+        self.assertEqual(set(_spans(tracer)), {"kept", "kept.child"})
+
+    def test_exceptions_are_recorded_and_propagate(self):
+        with self.assertRaises(KeyError):
+            with tracing.span("failing"):
+                raise KeyError("x")
+        self.assertEqual(self.tracer.events[-1][6]["error"], "KeyError")
+
+    def test_traced_decorator(self):
+        @tracing.traced(cat="test")
+        def add(a, b):
+            return a + b
+
+        @tracing.traced("async.double")
+        async def double(x):
+            return x * 2
+
+        self.assertEqual(add(1, 2), 3)
+        self.assertEqual(asyncio.run(double(4)), 8)
+        self.assertIn("TestSpans.test_traced_decorator.<locals>.add", _spans(self.tracer))
+        self.assertIn("async.double", _spans(self.tracer))
+
+
+class TestSettingsTracer(unittest.TestCase):
+
+    def setUp(self):
+        state = patch.multiple(tracing, _tracer=None, _sample_rate=None, _configured=False)
+        state.start()
+        self.addCleanup(state.stop)
+        self.addCleanup(config.reset_settings)
+
+    def test_sample_rate_is_read_once_until_settings_reset(self):
+        with patch.dict("os.environ", {"TRACE_SAMPLE_RATE": "0"}):
+            config.reset_settings()
+            with patch("config.get_settings", wraps=config.get_settings) as settings:
+                for _ in range(3):
+                    self.assertIs(tracing.span("x"), tracing.NOOP_SPAN)
+            self.assertEqual(settings.call_count, 1)
+
+        with patch.dict("os.environ", {"TRACE_SAMPLE_RATE": "1"}):
+            config.reset_settings()
+            self.assertIsInstance(tracing.span("sampled"), tracing.Span)
+
+
+class TestPropagation(unittest.TestCase):
+
+    def setUp(self):
+        self.addCleanup(tracing.configure)
+        self.tracer = tracing.configure(sample_rate=1.0)
+
+    def test_propagate_carries_the_span_into_threads(self):
+        def work(name):
+            with tracing.span(name):
+                pass
+
+        with tracing.span("parent"):
+            threads = [threading.Thread(target=tracing.propagate(work), args=("joined",)),
+                       threading.Thread(target=work, args=("detached",))]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        spans = _spans(self.tracer)
+        self.assertEqual(spans["joined"][0], spans["parent"][0])
+        self.assertNotEqual(spans["detached"][0], spans["parent"][0])
+        self.assertNotEqual(spans["joined"][1], spans["parent"][1])
+
+    def test_asyncio_tasks_inherit_and_get_their_own_lanes(self):
+        async def step(name):
+            with tracing.span(name):
+                await asyncio.sleep(0.01)
+
+        async def main():
+            with tracing.span("gather"):
+                await asyncio.gather(step("a"), step("b"))
+
+        asyncio.run(main())
+        spans = _spans(self.tracer)
+        self.assertEqual({spans["a"][0], spans["b"][0]}, {spans["gather"][0]})
+        self.assertEqual(len({spans["a"][1], spans["b"][1], spans["gather"][1]}), 3)
+
+    def test_hedged_requests_stay_in_the_callers_trace(self):
+        primary = _SpanProvider("USD", {"EUR": 0.5}, name="primary")
+        hedged = HedgedRateProvider(primary, primary, hedge_after=1)
+        with tracing.span("lookup"):
+            self.assertEqual(hedged.get_rate("USD", "EUR"), 0.5)
+        spans = _spans(self.tracer)
+        self.assertEqual(spans["primary"][0], spans["lookup"][0])
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.addCleanup(tracing.configure)
+        self.tracer = tracing.configure(sample_rate=1.0)
+
+    def test_pipeline_stages_are_spans(self):
+        response = MagicMock(status_code=200)
+        response.json.return_value = {"result": "success", "conversion_rate": 2.0}
+        session = MagicMock()
+        session.get.return_value = response
+        provider = ExchangeRateApiProvider("http://api.test", "key",
+                                           session_factory=lambda: session)
+        currency_utils.set_rate_provider(provider)
+        self.addCleanup(currency_utils.set_rate_provider, None)
+
+        self.assertEqual(currency_utils.convert_currency(10, "usd", "eur"), 20.0)
+        spans = _spans(self.tracer)
+        for name in ("convert_currency", "validate.amount", "get_exchange_quote",
+                     "validate.codes", "rate.lookup", "http.get", "json.parse",
+                     "log.conversion"):
+            self.assertIn(name, spans)
+        self.assertEqual(len({trace_id for trace_id, *_ in spans.values()}), 1)
+
+    def test_logging_handlers_are_timed(self):
+        handler = tracing.trace_handler(logging.NullHandler())
+        record = logging.LogRecord("x", logging.INFO, __file__, 1, "msg", None, None)
+        with tracing.span("log"):
+            handler.handle(record)
+        self.assertIn("log.NullHandler", _spans(self.tracer))
+
+
+class TestChromeExport(unittest.TestCase):
+
+    def setUp(self):
+        self.addCleanup(tracing.configure)
+
+    def test_export_is_chrome_trace_json(self):
+        tracer = tracing.configure(sample_rate=1.0, max_events=2)
+        for name in ("one", "two", "three"):
+            with tracing.span(name, "test", n=name):
+                pass
+        with tempfile.TemporaryDirectory() as tmp:
+            path = tracing.export_chrome_trace(Path(tmp) / "out" / "trace.json")
+            document = json.loads(path.read_text(encoding="utf-8"))
+        events = document["traceEvents"]
+        complete = [event for event in events if event["ph"] == "X"]
+        # The buffer is bounded: the oldest span was dropped.
+        self.assertEqual([event["name"] for event in complete], ["two", "three"])
+        self.assertEqual(complete[0]["args"]["n"], "two")
+        self.assertTrue(all(event["dur"] >= 0 for event in complete))
+        names = {event["args"]["name"] for event in events if event["ph"] == "M"}
+        self.assertIn(threading.current_thread().name, names)
+        self.assertEqual(len(tracer.events), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+"""Unit tests for the decayed traffic profile and start-up rate warm-up."""
+
+import dataclasses
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import config
+import currency_utils
+from rate_providers import RateProvider, RateQuote, StaticRateProvider
+from traffic_profile import TrafficProfile
+
+HOUR = 3600.0
+
+
+class FakeClock:
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTrafficProfile(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.profile = TrafficProfile(half_life=HOUR, capacity=4, clock=self.clock)
+
+    def test_counts_decay_with_half_life(self):
+        for _ in range(8):
+            self.profile.record("USD", "EUR")
+        self.clock.now += HOUR
+        self.profile.record("GBP", "USD")
+        counts = self.profile.counts()
+        self.assertAlmostEqual(counts[("USD", "EUR")], 4.0)
+        self.assertAlmostEqual(counts[("GBP", "USD")], 1.0)
+        self.clock.now += 3 * HOUR
+        self.profile.record("GBP", "USD")
+        self.profile.record("GBP", "USD")
+        # Recent traffic now outweighs the older burst.
+        self.assertEqual(self.profile.top_pairs(1), [("GBP", "USD")])
+
+    def test_rescale_keeps_counts(self):
+        self.profile.record("USD", "EUR")
+        self.clock.now += 100 * HOUR
+        self.profile.record("USD", "EUR")
+        self.assertAlmostEqual(self.profile.counts()[("USD", "EUR")], 1.0)
+        self.assertEqual(self.profile._landmark, self.clock.now)
+
+    def test_only_heaviest_pairs_are_kept(self):
+        for i, code in enumerate(["AUD", "CAD", "CHF", "EUR", "GBP", "JPY", "NZD", "SEK"]):
+            for _ in range(i + 1):
+                self.profile.record("USD", code)
+        self.profile.record("USD", "NOK")  # the ninth pair triggers a prune
+        self.assertEqual(len(self.profile), 4)
+        self.assertEqual(self.profile.top_pairs(2), [("USD", "SEK"), ("USD", "NZD")])
+
+    def test_top_bases_sum_over_pairs(self):
+        for _ in range(3):
+            self.profile.record("USD", "EUR")
+        for target in ("USD", "JPY"):
+            for _ in range(2):
+                self.profile.record("EUR", target)
+        self.assertEqual(self.profile.top_bases(5), ["EUR", "USD"])
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "nested" / "profile.json"
+            self.profile.record("USD", "EUR")
+            self.profile.record("USD", "EUR")
+            self.profile.save(path)
+            self.clock.now += HOUR
+            loaded = TrafficProfile.load(path, half_life=HOUR, clock=self.clock)
+            self.assertAlmostEqual(loaded.counts()[("USD", "EUR")], 1.0)
+            self.assertEqual(list(path.parent.iterdir()), [path])
+
+    def test_missing_or_corrupt_file_gives_empty_profile(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertEqual(len(TrafficProfile.load(Path(tmp) / "none.json")), 0)
+            for content in ("{not json", "[1, 2]", '{"version": 1, "pairs": 3}'):
+                path = Path(tmp) / "bad.json"
+                path.write_text(content, encoding="utf-8")
+                with self.assertLogs("traffic_profile", "WARNING"):
+                    self.assertEqual(len(TrafficProfile.load(path)), 0)
+
+
+class CountingProvider(RateProvider):
+
+    name = "counting"
+
+    def __init__(self, blocked: bool = False):
+        self.calls: list[tuple[str, str]] = []
+        self.release = threading.Event()
+        if not blocked:
+            self.release.set()
+        self._lock = threading.Lock()
+
+    def get_quote(self, from_currency, to_currency):
+        with self._lock:
+            self.calls.append((from_currency, to_currency))
+        self.release.wait(5)
+        return RateQuote(1.5, self.name, 0.0)
+
+
+class TestWarmRateCache(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "profile.json"
+        self.settings = dataclasses.replace(config.get_settings(),
+                                            traffic_profile_file=str(self.path),
+                                            rate_source="pair", warmup_top_k=2)
+        patcher = patch("currency_utils.get_settings", return_value=self.settings)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(setattr, currency_utils, "_traffic", None)
+        currency_utils._traffic = None
+        patcher = patch.object(currency_utils, "_traffic_enabled_path", "")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(currency_utils.set_rate_provider, None)
+
+    def record(self, *pairs):
+        for from_code, to_code, times in pairs:
+            for _ in range(times):
+                currency_utils.get_traffic_profile().record(from_code, to_code)
+
+    def test_lookups_are_profiled_and_saved(self):
+        currency_utils.set_rate_provider(StaticRateProvider("USD", {"EUR": 0.5}))
+        currency_utils.convert_currency(10, "usd", "eur")
+        self.assertEqual(currency_utils.get_traffic_profile().top_pairs(5), [("USD", "EUR")])
+        currency_utils.save_traffic_profile()
+        self.assertIn("USD/EUR", self.path.read_text(encoding="utf-8"))
+
+    def test_prefetches_top_pairs_without_counting_them(self):
+        self.record(("USD", "EUR", 5), ("EUR", "USD", 3), ("USD", "JPY", 4))
+        provider = CountingProvider()
+        currency_utils.set_rate_provider(provider)
+        self.assertEqual(currency_utils.warm_rate_cache(), 2)
+        self.assertEqual(sorted(provider.calls), [("USD", "EUR"), ("USD", "JPY")])
+        self.assertAlmostEqual(currency_utils.get_traffic_profile().counts()[("USD", "EUR")], 5,
+                               places=3)
+
+    def test_latest_source_prefetches_one_pair_per_base(self):
+        self.settings = dataclasses.replace(self.settings, rate_source="latest")
+        currency_utils.get_settings.return_value = self.settings
+        self.record(("USD", "EUR", 5), ("USD", "JPY", 4), ("GBP", "USD", 3), ("CHF", "EUR", 1))
+        provider = CountingProvider()
+        currency_utils.set_rate_provider(provider)
+        self.assertEqual(currency_utils.warm_rate_cache(), 2)
+        self.assertEqual(sorted(provider.calls), [("GBP", "USD"), ("USD", "EUR")])
+
+    def test_budget_bounds_the_warm_up(self):
+        self.record(("USD", "EUR", 1))
+        provider = CountingProvider(blocked=True)
+        self.addCleanup(provider.release.set)
+        currency_utils.set_rate_provider(provider)
+        with self.assertLogs("currency_utils", "INFO") as logs:
+            self.assertEqual(currency_utils.warm_rate_cache(budget=0.05), 0)
+        self.assertIn("still pending", logs.output[-1])
+
+    def test_disabled_without_a_profile(self):
+        self.settings = dataclasses.replace(self.settings, traffic_profile_file="")
+        currency_utils.get_settings.return_value = self.settings
+        self.assertIsNone(currency_utils.get_traffic_profile())
+        self.assertEqual(currency_utils.warm_rate_cache(), 0)
+
+    def test_off_for_library_callers_until_enabled(self):
+        with patch.dict(os.environ):
+            os.environ.pop("TRAFFIC_PROFILE_FILE", None)
+            self.assertEqual(config.load_settings().traffic_profile_file, "")
+        self.settings = dataclasses.replace(self.settings, traffic_profile_file="",
+                                            log_dir=self.path.parent)
+        currency_utils.get_settings.return_value = self.settings
+        currency_utils.set_rate_provider(StaticRateProvider("USD", {"EUR": 0.5}))
+        currency_utils.convert_currency(10, "USD", "EUR")
+        self.assertIsNone(currency_utils._traffic)
+
+        currency_utils.enable_traffic_profile()
+        currency_utils.convert_currency(10, "USD", "EUR")
+        currency_utils.save_traffic_profile()
+        self.assertTrue((self.path.parent / "traffic_profile.json").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""Unit tests for the vectorized amount parser."""
+
+import unittest
+
+import numpy as np
+
+from validators import AmountFormat, get_valid_amount, parse_amount_chunks, parse_amounts
+
+
+class TestParseAmounts(unittest.TestCase):
+
+    def assertParsed(self, values, expected, fmt="en", **options):
+        amounts, valid = parse_amounts(values, fmt, **options)
+        self.assertEqual(valid.tolist(), [e is not None for e in expected])
+        for amount, want in zip(amounts.tolist(), expected):
+            if want is None:
+                self.assertTrue(np.isnan(amount) if isinstance(amount, float) else amount == 0)
+            else:
+                self.assertEqual(amount, want)
+
+    def test_english_format(self):
+        self.assertParsed(["1,234.50", " $12 ", "+5", ".5", "12,345,678.9", "1234", "€ 7"],
+                          [1234.5, 12.0, 5.0, 0.5, 12345678.9, 1234.0, 7.0])
+
+    def test_rejects_what_get_valid_amount_rejects(self):
+        values = ["abc", "", "0", "-3", "1.2.3", "5+1"]
+        self.assertEqual([get_valid_amount(v) for v in values], [None] * len(values))
+        # float() also accepts these; partner files never contain them.
+        self.assertParsed(values + ["1e3", "nan", "inf"], [None] * (len(values) + 3))
+
+    def test_grouping(self):
+        self.assertParsed(["1,2,3", "12,34,567", "1234,567", "1,,234", "1,234,", ",123"],
+                          [None] * 6)
+        lenient = AmountFormat(strict_grouping=False)
+        self.assertParsed(["12,34,567"], [1234567.0], fmt=lenient)
+        self.assertParsed(["1,234"], [None], fmt="plain")
+
+    def test_locales(self):
+        self.assertParsed(["1.234,56", "1,5", "1.5", "1 234,5"], [1234.56, 1.5, None, None],
+                          fmt="de")
+        self.assertParsed(["1 234,5", "1 234,50 €", "1 000", "1.5", "12 34,5"],
+                          [1234.5, 1234.5, 1000.0, None, None], fmt="fr")
+        # Spaces before the number or after a symbol are not separators.
+        self.assertParsed([" 12", "€ 12", "\u00a01\u00a0234,50", "\u202f€\u00a01 000 ", "12 €"],
+                          [12.0, 12.0, 1234.5, 1000.0, 12.0], fmt="fr")
+        self.assertParsed(["1'234.5", "CHF 1’000"], [1234.5, 1000.0],
+                          fmt=AmountFormat(thousands=("'", "’"), symbols=("CHF",)))
+
+    def test_floats_match_float(self):
+        values = [f"{x:.6f}" for x in np.random.default_rng(1).uniform(0, 1e6, 1000)]
+        amounts, valid = parse_amounts(values)
+        self.assertTrue(valid.all())
+        self.assertEqual(amounts.tolist(), [float(v) for v in values])
+
+    def test_long_mantissas_match_float(self):
+        rng = np.random.default_rng(2)
+        values = [f"{m}.{str(f).zfill(d - len(str(m)))}"
+                  for d in (16, 17, 18)
+                  for m, f in zip(rng.integers(1, 10 ** 6, 2000),
+                                  rng.integers(0, 10 ** 12, 2000))]
+        values += ["9007199254740993", "0.9007199254740993", "123456789012345678"]
+        amounts, valid = parse_amounts(values)
+        self.assertTrue(valid.all())
+        self.assertEqual(amounts.tolist(), [float(v) for v in values])
+
+    def test_minor_units(self):
+        self.assertParsed(["1,234.5", "12", "0.01", "1.005", "99999999999999999"],
+                          [123450, 1200, 1, None, None], minor_digits=2)
+        amounts, _ = parse_amounts(["7"], minor_digits=0)
+        self.assertEqual(amounts.dtype, np.int64)
+
+    def test_inputs(self):
+        amounts, valid = parse_amounts([])
+        self.assertEqual((len(amounts), len(valid)), (0, 0))
+        amounts, valid = parse_amounts(str(n) for n in (1, 2))
+        self.assertEqual(amounts.tolist(), [1.0, 2.0])
+        self.assertParsed(["1" * 70], [None])
+
+    def test_chunks(self):
+        chunks = [["1", "x"], ["2,000"]]
+        with self.assertLogs("validators", "WARNING") as logs:
+            results = list(parse_amount_chunks(chunks))
+        self.assertEqual(len(logs.output), 1)  # one warning per chunk, not per row
+        self.assertEqual([r[1].tolist() for r in results], [[True, False], [True]])
+        self.assertEqual(results[1][0].tolist(), [2000.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
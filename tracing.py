@@ -0,0 +1,310 @@
+"""Span tracing of the conversion pipeline, exported as Chrome trace JSON.
+
+    from tracing import span, traced
+
+    with span("rate.lookup", "rate", provider=name):
+        ...
+
+    @traced("validate.currency", "validation")
+    def is_valid_currency(code): ...
+
+The current span lives in a contextvars.ContextVar, so nesting follows
+the code: asyncio tasks inherit their creator's span automatically, and
+work handed to another thread keeps it when wrapped with propagate(fn)
+(the rate providers and convert_batch do this for their pools).
+
+Sampling is decided once per root span (TRACE_SAMPLE_RATE, 0 to 1) and
+inherited by every span under it, so a trace is either recorded whole or
+not at all. At the default of 0, span() returns a shared no-op object
+without touching the context, so the instrumentation can stay in place in
+production. Recorded spans are kept in a bounded buffer (TRACE_MAX_EVENTS,
+oldest dropped first) and written to TRACE_FILE when the process exits, or
+on demand with export_chrome_trace(). Open the file in chrome://tracing or
+https://ui.perfetto.dev.
+"""
+
+import atexit
+import functools
+import inspect
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar, copy_context
+from pathlib import Path
+from typing import Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_EVENTS = 100_000
+
+F = TypeVar("F", bound=Callable)
+
+
+class _NoopSpan:
+
+    """Returned when nothing is being recorded."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+    def set(self, **attrs) -> None:
+        return None
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _UnsampledRoot(_NoopSpan):
+
+    """A root that lost the sampling draw. It is made current so the spans
+    under it see the decision instead of drawing again."""
+
+    __slots__ = ("_token",)
+
+    def __enter__(self) -> "_UnsampledRoot":
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        _current.reset(self._token)
+
+
+class Span:
+
+    """One timed, recorded operation. Use through span() or traced()."""
+
+    __slots__ = ("name", "cat", "args", "trace_id", "lane", "start_ns", "_tracer", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, cat: str, args: dict, trace_id: int):
+        self._tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.trace_id = trace_id
+
+    def set(self, **attrs) -> None:
+        """Attach attributes, shown as the event's args in the viewer."""
+        self.args.update(attrs)
+
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        self.lane = self._tracer._lane()
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        end_ns = time.perf_counter_ns()
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self._tracer._record(self, end_ns)
+
+
+_current: ContextVar[Span | _UnsampledRoot | None] = ContextVar("trace_span", default=None)
+
+
+class Tracer:
+
+    """Sampling decision, buffer of finished spans and the exporter."""
+
+    def __init__(self, sample_rate: float = 0.0, max_events: int = DEFAULT_MAX_EVENTS,
+                 export_path: Path | str | None = None):
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self.export_path = Path(export_path) if export_path else None
+        self.events: deque = deque(maxlen=max_events)
+        self._trace_ids = itertools.count(1)
+        self._lanes: dict[tuple[int, int], tuple[int, str]] = {}
+        self._lanes_lock = threading.Lock()
+        self._exit_hook = False
+
+    def span(self, name: str, cat: str, args: dict):
+        parent = _current.get()
+        if parent is None:
+            if random.random() >= self.sample_rate:
+                return _UnsampledRoot()
+            return Span(self, name, cat, args, next(self._trace_ids))
+        if isinstance(parent, _UnsampledRoot):
+            return NOOP_SPAN
+        return Span(self, name, cat, args, parent.trace_id)
+
+    def _lane(self) -> int:
+        # One lane (Chrome "tid") per thread, and per asyncio task within a
+        # thread, so concurrent tasks do not overlap on one timeline.
+        thread = threading.current_thread()
+        task = None
+        if "asyncio" in sys.modules:
+            try:
+                task = sys.modules["asyncio"].current_task()
+            except RuntimeError:  # no running event loop in this thread
+                pass
+        key = (thread.ident, id(task) if task is not None else 0)
+        lane = self._lanes.get(key)
+        if lane is None:
+            with self._lanes_lock:
+                lane = self._lanes.get(key)
+                if lane is None:
+                    name = thread.name if task is None else f"{thread.name} / {task.get_name()}"
+                    lane = self._lanes[key] = (len(self._lanes) + 1, name)
+        return lane[0]
+
+    def _record(self, span: Span, end_ns: int) -> None:
+        self.events.append((span.name, span.cat, span.start_ns, end_ns - span.start_ns,
+                            span.lane, span.trace_id, span.args))
+        if self.export_path is not None and not self._exit_hook:
+            self._exit_hook = True
+            atexit.register(self._export_at_exit)
+
+    def chrome_trace(self) -> dict:
+        """The recorded spans as a Chrome Trace Event Format document."""
+        pid = os.getpid()
+        trace_events = [{"name": "process_name", "ph": "M", "pid": pid,
+                         "args": {"name": f"currency-converter ({pid})"}}]
+        with self._lanes_lock:
+            lanes = list(self._lanes.values())
+        trace_events.extend({"name": "thread_name", "ph": "M", "pid": pid, "tid": lane,
+                             "args": {"name": name}} for lane, name in lanes)
+        for name, cat, start_ns, duration_ns, lane, trace_id, args in list(self.events):
+            trace_events.append({"name": name, "cat": cat, "ph": "X",
+                                 "ts": start_ns / 1000, "dur": duration_ns / 1000,
+                                 "pid": pid, "tid": lane,
+                                 "args": {"trace_id": trace_id, **args}})
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def export(self, path: Path | str | None = None) -> Path:
+        """Write chrome_trace() to path (default: the configured TRACE_FILE)."""
+        path = Path(path or self.export_path or "trace.json")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix(path.suffix + ".tmp")
+        with partial.open("w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f, default=str)
+        os.replace(partial, path)
+        return path
+
+    def _export_at_exit(self) -> None:
+        try:
+            path = self.export(self.export_path)
+            logger.info(f"Wrote {len(self.events)} trace spans to {path}")
+        except OSError as e:
+            logger.error(f"Could not write the trace file: {e}")
+
+
+_tracer: Tracer | None = None
+_tracer_lock = threading.Lock()
+# The tracer's sample rate, so span() decides "off" with one global read;
+# None until a tracer exists. _configured: installed by configure(), not
+# built from settings, so reset() leaves it alone.
+_sample_rate: float | None = None
+_configured = False
+
+
+def get_tracer() -> Tracer:
+    """The process-wide tracer, configured from settings on first use."""
+    global _tracer, _sample_rate
+    tracer = _tracer
+    if tracer is None:
+        with _tracer_lock:
+            tracer = _tracer
+            if tracer is None:
+                try:
+                    from config import get_settings
+                    settings = get_settings()
+                    tracer = Tracer(settings.trace_sample_rate, settings.trace_max_events,
+                                    settings.trace_file)
+                except Exception as e:
+                    # Tracing must never break the code it observes.
+                    logger.warning(f"Tracing disabled, could not read its settings: {e}")
+                    tracer = Tracer()
+                _tracer, _sample_rate = tracer, tracer.sample_rate
+    return tracer
+
+
+def configure(sample_rate: float = 0.0, max_events: int = DEFAULT_MAX_EVENTS,
+              export_path: Path | str | None = None) -> Tracer:
+    """Replace the process-wide tracer (e.g. to turn tracing on in a test
+    or a one-off script). Spans already recorded are discarded."""
+    global _tracer, _sample_rate, _configured
+    tracer = Tracer(sample_rate, max_events, export_path)
+    with _tracer_lock:
+        _tracer, _sample_rate, _configured = tracer, tracer.sample_rate, True
+    return tracer
+
+
+def reset() -> None:
+    """Forget a tracer built from settings, so the next span re-reads them
+    (called by config.reset_settings()). A configure()d tracer is kept."""
+    global _tracer, _sample_rate
+    with _tracer_lock:
+        if not _configured:
+            _tracer = _sample_rate = None
+
+
+def span(name: str, cat: str = "app", **args):
+    """Context manager timing the enclosed block as a span."""
+    if _sample_rate == 0.0:
+        return NOOP_SPAN
+    tracer = _tracer or get_tracer()
+    if tracer.sample_rate <= 0:
+        return NOOP_SPAN
+    return tracer.span(name, cat, args)
+
+
+def traced(name: str | None = None, cat: str = "app") -> Callable[[F], F]:
+    """Decorator: run every call of the function in a span (named after the
+    function by default). Works on coroutine functions too."""
+    def decorate(fn: F) -> F:
+        span_name = name or fn.__qualname__
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, cat):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name, cat):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def propagate(fn: F) -> F:
+    """Bind fn to the caller's context, so spans it opens on another thread
+    are children of the caller's current span."""
+    if _current.get() is None:
+        return fn  # nothing to carry over
+    context = copy_context()
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+    return wrapper
+
+
+def trace_handler(handler: logging.Handler) -> logging.Handler:
+    """Time a logging handler's work (filters, formatting, I/O) as a
+    'log.<HandlerClass>' span."""
+    handle = handler.handle
+    span_name = f"log.{type(handler).__name__}"
+
+    @functools.wraps(handle)
+    def traced_handle(record):
+        with span(span_name, "logging"):
+            return handle(record)
+    handler.handle = traced_handle
+    return handler
+
+
+def export_chrome_trace(path: Path | str | None = None) -> Path:
+    return get_tracer().export(path)
@@ -0,0 +1,132 @@
+"""Decayed frequency profile of requested currency pairs, for cache warm-up.
+
+currency_utils records every rate lookup here and persists the profile to
+TRAFFIC_PROFILE_FILE, so that a freshly started process can prefetch the
+pairs (or, with RATE_SOURCE=latest, the base tables) it is most likely to
+be asked for before it serves traffic (see currency_utils.warm_rate_cache).
+
+Counts decay with a half-life (TRAFFIC_HALF_LIFE_HOURS), so an old
+traffic mix fades out instead of pinning the warm-up list forever. The
+decay is "forward": a hit at time t adds 2 ** ((t - landmark) / half_life)
+rather than every count being shrunk, so record() is one dict update;
+the weights are rescaled to a new landmark before they grow too large.
+Only the `capacity` heaviest pairs are kept, pruned whenever the table
+doubles, which is all warm-up ever reads.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+# Rescale once a hit weighs 2**64 times one at the landmark.
+MAX_EXPONENT = 64.0
+
+
+class TrafficProfile:
+
+    """Top pairs by exponentially decayed request count. Thread-safe."""
+
+    def __init__(self, half_life: float = 86_400.0, capacity: int = 256,
+                 clock: Callable[[], float] = time.time):
+        self.half_life = half_life
+        self.capacity = capacity
+        self._clock = clock
+        self._landmark = clock()
+        self._weights: dict[tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._weights)
+
+    def record(self, from_currency: str, to_currency: str) -> None:
+        """Count one request for the pair (codes already upper-case)."""
+        pair = (from_currency, to_currency)
+        with self._lock:
+            exponent = (self._clock() - self._landmark) / self.half_life
+            if exponent > MAX_EXPONENT:
+                self._rescale()
+                exponent = 0.0
+            self._weights[pair] = self._weights.get(pair, 0.0) + 2.0 ** exponent
+            if len(self._weights) > 2 * self.capacity:
+                self._prune()
+
+    def _rescale(self) -> None:
+        now = self._clock()
+        factor = 2.0 ** (-(now - self._landmark) / self.half_life)
+        self._weights = {pair: w * factor for pair, w in self._weights.items()
+                         if w * factor > 1e-9}
+        self._landmark = now
+
+    def _prune(self) -> None:
+        ranked = sorted(self._weights.items(), key=lambda item: item[1], reverse=True)
+        self._weights = dict(ranked[:self.capacity])
+
+    def counts(self) -> dict[tuple[str, str], float]:
+        """Decayed request counts as of now, heaviest first."""
+        with self._lock:
+            factor = 2.0 ** (-(self._clock() - self._landmark) / self.half_life)
+            ranked = sorted(self._weights.items(), key=lambda item: (-item[1], item[0]))
+        return {pair: weight * factor for pair, weight in ranked}
+
+    def top_pairs(self, k: int) -> list[tuple[str, str]]:
+        return list(self.counts())[:k]
+
+    def top_bases(self, k: int) -> list[str]:
+        """The k most requested source currencies, summed over their pairs."""
+        bases: dict[str, float] = {}
+        for (base, _), count in self.counts().items():
+            bases[base] = bases.get(base, 0.0) + count
+        return sorted(bases, key=lambda base: (-bases[base], base))[:k]
+
+    def save(self, path: Path | str) -> None:
+        """Write the profile atomically (a reader never sees half a file)."""
+        path = Path(path)
+        with self._lock:
+            document = {
+                "version": FORMAT_VERSION,
+                "half_life": self.half_life,
+                "landmark": self._landmark,
+                "pairs": {f"{a}/{b}": w for (a, b), w in self._weights.items()},
+            }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(document), encoding="utf-8")
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path | str, half_life: float = 86_400.0, capacity: int = 256,
+             clock: Callable[[], float] = time.time) -> "TrafficProfile":
+        """The profile saved at path, or an empty one if there is none yet."""
+        profile = cls(half_life, capacity, clock)
+        try:
+            document = json.loads(Path(path).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return profile
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable traffic profile {path}: {e}")
+            return profile
+        version = document.get("version") if isinstance(document, dict) else None
+        if version != FORMAT_VERSION:
+            logger.warning(f"Ignoring traffic profile {path} (format version {version})")
+            return profile
+        try:
+            weights = {tuple(key.split("/")): float(weight)
+                       for key, weight in document["pairs"].items()}
+            landmark = float(document["landmark"])
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            logger.warning(f"Ignoring malformed traffic profile {path}: {e}")
+            return profile
+        with profile._lock:
+            profile._weights = {pair: w for pair, w in weights.items() if len(pair) == 2}
+            profile._landmark = landmark
+            profile._rescale()  # re-anchor the saved weights at now
+            if len(profile._weights) > capacity:
+                profile._prune()
+        return profile
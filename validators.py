@@ -1,13 +1,23 @@
-from data.valid_currencies import valid_currencies_dict
-from modular_logger.root_logger import logger
-from typing import Optional
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from data.currency_registry import get_currency_registry
+from tracing import traced
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
 
+if TYPE_CHECKING:  # imported lazily: the interactive prompt never needs numpy
+    import numpy as np
 
+# Per-module logger: invalid input can be sampled via LOG_SAMPLING=validators=...
+logger = logging.getLogger(__name__)
+
+
+@traced("validate.currency", "validation")
 def is_valid_currency(code: str) -> bool:
     """Return True if code is a valid 3-letter currency code."""
     code = code.upper()
     return (code.isalpha() and len(code) == 3
-            and code in valid_currencies_dict.values())
+            and code in get_currency_registry())
 
 
 def exit_on_interrupt(message: str = "Input cancelled by user. Exiting.",
@@ -16,6 +26,7 @@ def exit_on_interrupt(message: str = "Input cancelled by user. Exiting.",
     exit(code)
 
 
+@traced("validate.amount", "validation")
 def get_valid_amount(user_input: str) -> Optional[float]:
     """Validate a single user input string as a positive float."""
     try:
@@ -28,6 +39,184 @@ def get_valid_amount(user_input: str) -> Optional[float]:
         return None
 
 
+@dataclass(frozen=True)
+class AmountFormat:
+
+    """How amounts are written in a partner file.
+
+    thousands lists every grouping separator in use (partner files mix
+    spaces and no-break spaces); symbols may appear before or after the
+    number (single characters, or longer ones such as "CHF" anywhere).
+    With strict_grouping, separators must fall between groups of three
+    digits, so "1,2,3" is rejected rather than read as 123.
+    """
+
+    decimal: str = "."
+    thousands: tuple[str, ...] = (",",)
+    symbols: tuple[str, ...] = ("$", "€", "£", "¥")
+    strict_grouping: bool = True
+
+
+AMOUNT_FORMATS = {
+    "en": AmountFormat(),
+    "de": AmountFormat(decimal=",", thousands=(".",)),
+    "fr": AmountFormat(decimal=",", thousands=(" ", "\u00a0", "\u202f")),
+    "ch": AmountFormat(thousands=("'", "\u2019")),
+    "plain": AmountFormat(thousands=()),
+}
+
+_MAX_DIGITS = 18  # every int64 mantissa with this many digits is exact
+# Mantissas below this are exact float64s, so one division by an (exact)
+# power of ten is correctly rounded; longer ones are divided in Python.
+_EXACT_MANTISSA = 2 ** 53
+_MAX_WIDTH = 64  # longer strings are rejected without being scanned
+_WHITESPACE = " \t\n\r\f\v\u00a0\u202f"
+
+# Character classes for the column scan in parse_amounts.
+_OTHER, _DIGIT, _POINT, _SEPARATOR, _SPACE_SEPARATOR, _FILLER, _PLUS = range(7)
+
+
+@lru_cache(maxsize=None)
+def _character_classes(fmt: AmountFormat) -> "np.ndarray":
+    """Lookup table from code point (BMP) to character class for fmt."""
+    import numpy as np
+    table = np.full(0x10000, _OTHER, dtype=np.uint8)
+    table[0] = _FILLER  # padding of the fixed-width string array
+    for char in _WHITESPACE + "".join(s for s in fmt.symbols if len(s) == 1):
+        table[ord(char)] = _FILLER
+    table[ord("+")] = _PLUS
+    for char in fmt.thousands:
+        # Whitespace is a separator only between digits; elsewhere (around
+        # the number, or after a symbol) it is just whitespace.
+        table[ord(char)] = _SPACE_SEPARATOR if table[ord(char)] == _FILLER else _SEPARATOR
+    table[ord(fmt.decimal)] = _POINT
+    table[ord("0"):ord("9") + 1] = _DIGIT
+    table[0xFFFF] = _OTHER  # everything outside the BMP is clipped to here
+    return table
+
+
+def parse_amounts(values: Iterable[str], fmt: AmountFormat | str = "en",
+                  minor_digits: Optional[int] = None) -> tuple["np.ndarray", "np.ndarray"]:
+    """Parse a column of amount strings in one vectorized pass.
+
+    Returns (amounts, valid). amounts is float64, or int64 minor units
+    (e.g. cents for minor_digits=2) when minor_digits is given; valid is a
+    bool mask with the same rule as get_valid_amount (a positive number),
+    plus the format's: symbols and whitespace only around the number, a
+    single decimal mark, grouping as configured, at most 18 digits and, for
+    minor units, no more decimals than minor_digits. Invalid rows hold NaN
+    (float) or 0 (minor units) and are reported in one warning per call
+    rather than one log line each.
+
+    The strings are viewed as a matrix of code points and scanned one
+    character position at a time across every row, so the Python-level
+    cost grows with the longest string, not with the number of rows.
+    """
+    import numpy as np
+    if isinstance(fmt, str):
+        fmt = AMOUNT_FORMATS[fmt]
+    if not hasattr(values, "__len__"):
+        values = list(values)
+    raw = np.asarray(values, dtype=np.str_).reshape(-1)
+    rows = len(raw)
+    int_out = minor_digits is not None
+    if not rows:
+        return (np.empty(0, dtype=np.int64 if int_out else np.float64),
+                np.empty(0, dtype=bool))
+
+    text = raw
+    for symbol in fmt.symbols:
+        if len(symbol) > 1:  # e.g. "CHF"; single characters are classified below
+            text = np.strings.replace(text, symbol, "")
+    valid = np.strings.str_len(text) <= _MAX_WIDTH
+    # One row per character position, so each step of the scan is contiguous.
+    chars = np.ascontiguousarray(text).view(np.uint32).reshape(rows, -1)[:, :_MAX_WIDTH]
+    chars = np.ascontiguousarray(chars.T)
+    classes = _character_classes(fmt)[np.minimum(chars, 0xFFFF)]
+
+    started = np.zeros(rows, dtype=bool)
+    ended = np.zeros(rows, dtype=bool)
+    fractional = np.zeros(rows, dtype=bool)
+    signed = np.zeros(rows, dtype=bool)
+    after_digit = np.zeros(rows, dtype=bool)
+    mantissa = np.zeros(rows, dtype=np.int64)
+    # Counters never exceed _MAX_WIDTH, so int8 keeps each step cheap.
+    digits = np.zeros(rows, dtype=np.int8)
+    frac_digits = np.zeros(rows, dtype=np.int8)
+    group = np.zeros(rows, dtype=np.int8)
+    separators = np.zeros(rows, dtype=np.int8)
+    strict = fmt.strict_grouping
+
+    for position, cls in enumerate(classes):
+        if position + 1 < len(classes):
+            next_digit = classes[position + 1] == _DIGIT
+        else:
+            next_digit = np.zeros(rows, dtype=bool)
+        is_digit = cls == _DIGIT
+        is_point = cls == _POINT
+        spaced = cls == _SPACE_SEPARATOR
+        spaced_separator = spaced & next_digit & (digits > 0)
+        is_separator = ((cls == _SEPARATOR) & next_digit) | spaced_separator
+        is_filler = (cls == _FILLER) | (spaced & ~spaced_separator)
+
+        bad = (cls == _OTHER) | ((cls == _SEPARATOR) & ~next_digit)
+        bad |= (is_digit | is_point | is_separator) & ended
+        bad |= is_point & fractional
+        bad |= is_separator & (fractional | ~after_digit)
+        bad |= (cls == _PLUS) & (started | signed)
+        if strict:
+            # Groups after the first separator are exactly three digits.
+            bad |= is_separator & (group > 3)
+            bad |= (is_separator | is_point) & (separators > 0) & (group != 3)
+        valid &= ~bad
+
+        mantissa = np.where(is_digit, mantissa * 10 + (chars[position] - ord("0")), mantissa)
+        digits += is_digit
+        frac_digits += is_digit & fractional
+        group = np.where(is_separator, np.int8(0), group + (is_digit & ~fractional))
+        separators += is_separator
+        signed |= cls == _PLUS
+        fractional |= is_point
+        ended |= is_filler & started
+        started |= is_digit | is_point
+        after_digit = is_digit
+
+    if strict:
+        valid &= fractional | (separators == 0) | (group == 3)
+    valid &= (digits > 0) & (digits <= _MAX_DIGITS) & (mantissa > 0)
+
+    powers = np.power(10, np.arange(_MAX_DIGITS + 1), dtype=np.int64)
+    if int_out:
+        valid &= frac_digits <= minor_digits
+        valid &= digits - frac_digits + minor_digits <= _MAX_DIGITS
+        scale = powers[(minor_digits - frac_digits).clip(0, _MAX_DIGITS)]
+        amounts = np.where(valid, mantissa * scale, 0)
+    else:
+        # One correctly rounded division: equals float() of the same digits.
+        divisor = powers[frac_digits.clip(0, _MAX_DIGITS)].astype(np.float64)
+        amounts = np.where(valid, mantissa / divisor, np.nan)
+        # 16+ significant digits lose precision as a float64 mantissa;
+        # Python's int / int is correctly rounded, and such rows are rare.
+        long = np.flatnonzero(valid & (mantissa >= _EXACT_MANTISSA))
+        if len(long):
+            amounts[long] = [m / 10 ** f for m, f in zip(mantissa[long].tolist(),
+                                                         frac_digits[long].tolist())]
+
+    invalid = rows - int(valid.sum())
+    if invalid:
+        logger.warning(f"{invalid} of {rows} amounts could not be parsed "
+                       f"(first: '{raw[np.argmin(valid)]}')")
+    return amounts, valid
+
+
+def parse_amount_chunks(chunks: Iterable[Iterable[str]], fmt: AmountFormat | str = "en",
+                        minor_digits: Optional[int] = None
+                        ) -> Iterator[tuple["np.ndarray", "np.ndarray"]]:
+    """parse_amounts over each chunk, e.g. pd.read_csv(..., chunksize=...)[col]."""
+    for chunk in chunks:
+        yield parse_amounts(chunk, fmt, minor_digits)
+
+
 def get_currency_input(label: str) -> str:
     """Continuously prompt for a valid 3-letter currency code."""
     while True:
@@ -36,7 +225,7 @@ def get_currency_input(label: str) -> str:
             if is_valid_currency(code):
                 return code
             print(f"❌ Invalid currency. "
-                  f"Choose one of: {', '.join(sorted(valid_currencies_dict))}")
+                  f"Choose one of: {', '.join(sorted(get_currency_registry().codes))}")
         except KeyboardInterrupt:
             exit_on_interrupt()
         except EOFError: